@@ -8,13 +8,19 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import copy
+import time
 import flask
 import logging
+import threading
 import superdesk
 
+from collections import OrderedDict
 from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 from flask import request, current_app as app, session
 from eve.auth import TokenAuth
+from superdesk.cache import document_tag, get_tags_version
 from superdesk.resource import Resource
 from superdesk.errors import SuperdeskApiError
 from superdesk import (
@@ -70,6 +76,119 @@ class AuthResource(Resource):
 
 superdesk.intrinsic_privilege("auth", method=["DELETE"])
 
+_auth_cache_lock = threading.Lock()
+_session_activity_lock = threading.Lock()
+
+
+def _get_endpoints(source: str) -> List[str]:
+    """Get names of all endpoints using given mongo collection."""
+    return [
+        name
+        for name, resource_config in app.config["DOMAIN"].items()
+        if (resource_config.get("datasource") or {}).get("source", name) == source
+    ]
+
+
+def _get_auth_tags(auth_token, user) -> List[str]:
+    tags = [document_tag(endpoint, auth_token["_id"]) for endpoint in _get_endpoints("auth")]
+    tags.extend(document_tag(endpoint, user["_id"]) for endpoint in _get_endpoints("users"))
+    if user.get("role"):
+        tags.extend(document_tag(endpoint, user["role"]) for endpoint in _get_endpoints("roles"))
+    return tags
+
+
+def get_auth_data(token) -> Optional[Tuple[Dict, Optional[Dict], Optional[Dict]]]:
+    """Get session, user and role for given token.
+
+    Results are kept in memory for ``AUTH_CACHE_SECONDS`` and invalidated when
+    session, user or role is changed or removed. User has ``active_privileges`` set.
+
+    :param token: auth token
+    :return: ``(auth_token, user, role)`` or ``None`` if token is not valid
+    """
+    ttl = app.config.get("AUTH_CACHE_SECONDS", 0)
+    auth_cache = app.extensions.setdefault("superdesk_auth_cache", OrderedDict())
+    if ttl:
+        with _auth_cache_lock:
+            cached = auth_cache.get(token)
+        if cached is not None:
+            expires, tags, version, data = cached
+            if expires > time.monotonic() and get_tags_version(tags) == version:
+                return copy.deepcopy(data)
+            with _auth_cache_lock:
+                auth_cache.pop(token, None)
+
+    auth_token = get_resource_service("auth").find_one(token=token, req=None)
+    if not auth_token:
+        return None
+    user_service = get_resource_service("users")
+    user = user_service.find_one(req=None, _id=str(auth_token["user"]))
+    role = user_service.get_role(user)
+    if user:
+        user_service.set_privileges(user, role)
+    data = (auth_token, user, role)
+
+    if ttl and user:
+        tags = _get_auth_tags(auth_token, user)
+        entry = (time.monotonic() + ttl, tags, get_tags_version(tags), copy.deepcopy(data))
+        with _auth_cache_lock:
+            auth_cache[token] = entry
+            auth_cache.move_to_end(token)
+            while len(auth_cache) > app.config.get("AUTH_CACHE_SIZE", 1000):
+                auth_cache.popitem(last=False)
+    return data
+
+
+def add_session_activity(session_id, force=False):
+    """Mark session as being used.
+
+    Activity of sessions is saved for all sessions together at most every ``SESSION_UPDATE_SECONDS``,
+    see :meth:`apps.auth.service.AuthService.update_sessions_activity`. Pending sessions are saved
+    by a timer thread when there is no other activity till then.
+
+    :param session_id: session id
+    :param force: save pending sessions right away
+    """
+    activity = app.extensions.setdefault(
+        "superdesk_session_activity", {"sessions": set(), "saved": None, "timer": None}
+    )
+    with _session_activity_lock:
+        activity["sessions"].add(session_id)
+        if activity["saved"] and not force:
+            remaining = app.config["SESSION_UPDATE_SECONDS"] - (time.monotonic() - activity["saved"])
+            if remaining > 0:
+                if activity["timer"] is None:
+                    timer = threading.Timer(remaining, _flush_session_activity, args=(app._get_current_object(),))
+                    timer.daemon = True
+                    activity["timer"] = timer
+                    timer.start()
+                return
+    flush_session_activity()
+
+
+def flush_session_activity():
+    """Save activity of all pending sessions."""
+    activity = app.extensions.get("superdesk_session_activity")
+    if not activity:
+        return
+    with _session_activity_lock:
+        session_ids = list(activity["sessions"])
+        activity["sessions"] = set()
+        activity["saved"] = time.monotonic()
+        timer, activity["timer"] = activity["timer"], None
+    if timer is not None:
+        timer.cancel()
+    if session_ids:
+        get_resource_service("auth").update_sessions_activity(session_ids)
+
+
+def _flush_session_activity(flask_app):
+    with flask_app.app_context():
+        try:
+            flush_session_activity()
+        except Exception:
+            logger.exception("Failed to save session activity")
+
 
 class SuperdeskTokenAuth(TokenAuth):
     """Superdesk Token Auth"""
@@ -101,7 +220,8 @@ class SuperdeskTokenAuth(TokenAuth):
             return True
 
         # Step 2: Get User's Privileges
-        get_resource_service("users").set_privileges(user, flask.g.role)
+        if "active_privileges" not in user:
+            get_resource_service("users").set_privileges(user, flask.g.role)
 
         try:
             resource_privileges = get_resource_privileges(resource).get(method, None)
@@ -142,30 +262,21 @@ class SuperdeskTokenAuth(TokenAuth):
 
         If token is valid it updates session and checks permissions.
         """
-        auth_service = get_resource_service("auth")
-        user_service = get_resource_service("users")
-        auth_token = auth_service.find_one(token=token, req=None)
-        if auth_token:
+        auth_data = get_auth_data(token)
+        if auth_data:
+            auth_token, flask.g.user, flask.g.role = auth_data
             if session.get("session_token") != token:
                 session["session_token"] = token
-            user_id = str(auth_token["user"])
-            flask.g.user = user_service.find_one(req=None, _id=user_id)
-            flask.g.role = user_service.get_role(flask.g.user)
             flask.g.auth = auth_token
             flask.g.auth_value = auth_token["user"]
             if method in ("POST", "PUT", "PATCH") or method == "GET" and not request.args.get("auto"):
-                now = utcnow()
-                auth_updated = False
-                if (
+                if not flask.g.user.get("last_activity_at"):
+                    add_session_activity(auth_token["_id"], force=True)
+                elif (
                     auth_token[app.config["LAST_UPDATED"]] + timedelta(seconds=app.config["SESSION_UPDATE_SECONDS"])
-                    < now
+                    < utcnow()
                 ):
-                    auth_service.update_session({app.config["LAST_UPDATED"]: now})
-                    auth_updated = True
-                if not flask.g.user.get("last_activity_at") or auth_updated:
-                    user_service.system_update(
-                        flask.g.user["_id"], {"last_activity_at": now, "_updated": now}, flask.g.user
-                    )
+                    add_session_activity(auth_token["_id"])
 
             return self.check_permissions(resource, method, flask.g.user)
 
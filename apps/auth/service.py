@@ -13,7 +13,9 @@ from flask import request, current_app as app
 from flask_babel import _
 from eve.utils import config
 
-from superdesk import utils as utils, get_resource_service, get_resource_privileges
+from superdesk import utils as utils, get_resource_service, get_resource_privileges, get_backend
+from superdesk.cache import invalidate_cache
+from superdesk.notification import push_notification
 from superdesk.services import BaseService
 from superdesk.errors import SuperdeskApiError
 from superdesk.users.errors import UserInactiveError
@@ -66,6 +68,34 @@ class AuthService(BaseService):
         doc["token"] = utils.get_random_string(40)
         doc.pop("password", None)
 
+    def update_sessions_activity(self, session_ids):
+        """Update sessions and last activity of their users using single update per collection.
+
+        :param session_ids: ids of sessions being used
+        """
+        if not session_ids:
+            return
+        now = utcnow()
+        sessions = app.data.get_mongo_collection("auth")
+        sessions.update_many({config.ID_FIELD: {"$in": session_ids}}, {"$set": {config.LAST_UPDATED: now}})
+        invalidate_cache("auth", ids=session_ids, fields=[config.LAST_UPDATED])
+
+        # sessions could be removed meanwhile, so update only users with active sessions
+        user_ids = list(
+            {session["user"] for session in sessions.find({config.ID_FIELD: {"$in": session_ids}}, {"user": 1})}
+        )
+        if not user_ids:
+            return
+        app.data.get_mongo_collection("users").update_many(
+            {config.ID_FIELD: {"$in": user_ids}}, {"$set": {"last_activity_at": now, config.LAST_UPDATED: now}}
+        )
+        invalidate_cache("users", ids=user_ids, fields=["last_activity_at", config.LAST_UPDATED])
+        if get_backend().notify_on_change("users"):
+            for user_id in user_ids:
+                push_notification(
+                    "resource:updated", resource="users", _id=str(user_id), fields={"last_activity_at": 1}
+                )
+
     def update_session(self, updates=None):
         """Update current session with given data.
 
@@ -11,6 +11,7 @@
 import flask
 import logging
 
+from typing import Any, Dict, Hashable, List, Optional
 from superdesk.services import CacheableService
 from eve.utils import ParsedRequest
 from superdesk.errors import SuperdeskApiError
@@ -220,22 +221,29 @@ class ContentFilterService(CacheableService):
 
     def _does_filter_condition_match(self, content_filter, article, filters, expression, cache=True) -> bool:
         filter_condition_service = get_resource_service("filter_conditions")
+        filter_conditions = []
         for f in expression["expression"]["fc"]:
             cache_id = _cache_id("filter-condition-match", f, article)
-            if not cache or not hasattr(flask.g, cache_id):
-                fc = (
-                    filters.get("filter_conditions", {}).get(f, {}).get("fc")
-                    if filters
-                    else filter_condition_service.get_cached_by_id(f)
-                )
-                if not fc:
-                    logger.error("Missing filter condition %s in content filter %s", f, content_filter.get("name"))
+            if cache and hasattr(flask.g, cache_id):
+                if not getattr(flask.g, cache_id):
                     return False
-                filter_condition = FilterCondition.parse(fc)
-                if not cache:
-                    return filter_condition.does_match(article)
-                setattr(flask.g, cache_id, filter_condition.does_match(article))
-            if not getattr(flask.g, cache_id):
+                continue
+            fc = (
+                filters.get("filter_conditions", {}).get(f, {}).get("fc")
+                if filters
+                else filter_condition_service.get_cached_by_id(f)
+            )
+            if not fc:
+                logger.error("Missing filter condition %s in content filter %s", f, content_filter.get("name"))
+                return False
+            filter_conditions.append((cache_id, FilterCondition.get_compiled(fc)))
+
+        # check cheap conditions first, expensive ones are skipped if those don't match
+        for cache_id, filter_condition in sorted(filter_conditions, key=lambda item: item[1].cost):
+            does_match = filter_condition.does_match(article)
+            if cache:
+                setattr(flask.g, cache_id, does_match)
+            if not does_match:
                 return False
         return True
 
@@ -247,12 +255,28 @@ class ContentFilterService(CacheableService):
                     filters.get("content_filters", {}).get(f, {}).get("cf") if filters else self.get_cached_by_id(f)
                 )
                 if not cache:
-                    return self.does_match(current_filter, article, filters=filters, cache=cache)
+                    if not self.does_match(current_filter, article, filters=filters, cache=cache):
+                        return False
+                    continue
                 setattr(flask.g, cache_id, self.does_match(current_filter, article, filters=filters, cache=cache))
             if not getattr(flask.g, cache_id):
                 return False
         return True
 
+    def does_match_filters(self, content_filters, article, filters=None) -> Dict[str, bool]:
+        """Test article against multiple content filters in single pass.
+
+        Each filter condition and content filter is evaluated only once,
+        see :class:`ContentFilterMatcher`.
+
+        :param list content_filters: content filters to test
+        :param dict article: article to test
+        :param dict filters: optional preloaded filters, see ``EnqueueService.get_filters``
+        :return: match result per content filter id
+        """
+        matcher = ContentFilterMatcher(article, filters)
+        return {content_filter.get("_id"): matcher.does_match(content_filter) for content_filter in content_filters}
+
     def get_api_blocking_filters(self):
         cached = self.get_cached()
         return [f for f in cached if f.get("api_block")]
@@ -260,3 +284,75 @@ class ContentFilterService(CacheableService):
 
 def _cache_id(prefix, _id, article) -> str:
     return "-".join([prefix, str(_id), str(article.get("_id") or article.get("guid"))])
+
+
+class ContentFilterMatcher:
+    """Match single article against multiple content filters.
+
+    Results of filter conditions and content filters are kept by id,
+    so conditions shared by multiple filters are evaluated once per article.
+
+    :param dict article: article to test
+    :param dict filters: optional preloaded filters, see ``EnqueueService.get_filters``
+    """
+
+    def __init__(self, article, filters=None):
+        self.article = article
+        self.filters = filters
+        self.condition_results: Dict[Hashable, bool] = {}
+        self.filter_results: Dict[Hashable, bool] = {}
+
+    def does_match(self, content_filter) -> bool:
+        if not content_filter:
+            return True  # a non-existing filter matches every thing
+        key = content_filter.get("_id") or content_filter.get("name")
+        if key not in self.filter_results:
+            self.filter_results[key] = self._does_match(content_filter)
+        return self.filter_results[key]
+
+    def _does_match(self, content_filter) -> bool:
+        for index, expression in enumerate(content_filter.get("content_filter", [])):
+            if not expression.get("expression"):
+                raise SuperdeskApiError.badRequestError(
+                    _("Filter statement {index} does not have a filter condition").format(index=index + 1)
+                )
+            if "fc" in expression["expression"]:
+                if not self._does_filter_conditions_match(content_filter, expression["expression"]["fc"]):
+                    continue
+            if "pf" in expression["expression"]:
+                if not all(self.does_match(self._get_content_filter(f)) for f in expression["expression"]["pf"]):
+                    continue
+            return True
+        return False
+
+    def _does_filter_conditions_match(self, content_filter, condition_ids: List[Hashable]) -> bool:
+        filter_conditions = []
+        for condition_id in condition_ids:
+            if condition_id in self.condition_results:
+                if not self.condition_results[condition_id]:
+                    return False
+                continue
+            fc = self._get_filter_condition(condition_id)
+            if not fc:
+                logger.error(
+                    "Missing filter condition %s in content filter %s", condition_id, content_filter.get("name")
+                )
+                return False
+            filter_conditions.append((condition_id, FilterCondition.get_compiled(fc)))
+
+        # check cheap conditions first, expensive ones are skipped if those don't match
+        for condition_id, filter_condition in sorted(filter_conditions, key=lambda item: item[1].cost):
+            does_match = self.condition_results[condition_id] = filter_condition.does_match(self.article)
+            if not does_match:
+                return False
+        return True
+
+    def _get_filter_condition(self, condition_id) -> Optional[Dict[str, Any]]:
+        if self.filters:
+            return self.filters.get("filter_conditions", {}).get(condition_id, {}).get("fc")
+        return get_resource_service("filter_conditions").get_cached_by_id(condition_id)
+
+    def _get_content_filter(self, filter_id) -> Optional[Dict[str, Any]]:
+        if self.filters:
+            return self.filters.get("content_filters", {}).get(filter_id, {}).get("cf")
+        return get_resource_service("content_filters").get_cached_by_id(filter_id)
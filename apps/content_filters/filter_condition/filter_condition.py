@@ -7,7 +7,7 @@
 # For the full copyright and license information, please see the
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
-from apps.content_filters.filter_condition.filter_condition_field import FilterConditionField
+from apps.content_filters.filter_condition.filter_condition_field import FilterConditionField, get_field_type_map
 from apps.content_filters.filter_condition.filter_condition_value import FilterConditionValue
 from apps.content_filters.filter_condition.filter_condition_operator import (
     FilterConditionOperator,
@@ -17,7 +17,9 @@ from apps.content_filters.filter_condition.filter_condition_operator import (
     FilterConditionOperatorsEnum,
     ComparisonOperator,
     ExistsOperator,
+    RegexOperator,
 )
+from functools import lru_cache
 import json
 
 
@@ -26,11 +28,49 @@ class FilterCondition:
         self.field = FilterConditionField.factory(field)
         self.operator = FilterConditionOperator.factory(operator)
         self.value = FilterConditionValue(self.operator, value)
+        self._filter_value = None
+        self._has_filter_value = False
 
     @staticmethod
     def parse(filter_condition):
         return FilterCondition(filter_condition["field"], filter_condition["operator"], filter_condition["value"])
 
+    @staticmethod
+    def get_compiled(filter_condition) -> "FilterCondition":
+        """Get parsed filter condition ready for matching.
+
+        It's shared for all filter conditions with same field, operator and value,
+        so the filter value is processed only once and there is nothing
+        to invalidate when a filter condition is modified.
+
+        :param dict filter_condition: filter condition
+        """
+        field = filter_condition["field"]
+        return _get_compiled(
+            field,
+            filter_condition["operator"],
+            str(filter_condition["value"]),
+            get_field_type_map().get(field),
+        )
+
+    @property
+    def cost(self) -> int:
+        """Relative cost of matching, cheap conditions are checked first."""
+        cost = 1
+        if type(self.field).get_value is FilterConditionField.get_value:
+            cost += 1  # field value is parsed as html
+            if self.field.get_entity_name() == "body_html":
+                cost += 1
+        if isinstance(self.operator, (RegexOperator, NotLikeOperator)):
+            cost += 1
+        return cost
+
+    def get_filter_value(self):
+        if not self._has_filter_value:
+            self._filter_value = self.operator.compile_value(self.value.get_value(self.field, self.operator))
+            self._has_filter_value = True
+        return self._filter_value
+
     def get_mongo_query(self):
         try:
             return self.field.get_mongo_query()
@@ -64,5 +104,11 @@ class FilterCondition:
             )
 
         article_value = self.field.get_value(article)
-        filter_value = self.value.get_value(self.field, self.operator)
-        return self.operator.does_match(article_value, filter_value)
+        return self.operator.does_match(article_value, self.get_filter_value())
+
+
+@lru_cache(maxsize=1000)
+def _get_compiled(field, operator, value, field_type) -> FilterCondition:
+    # field_type is only part of the cache key, custom field is parsed
+    # differently when its vocabulary field type changes
+    return FilterCondition(field, operator, value)
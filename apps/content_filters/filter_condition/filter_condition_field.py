@@ -16,7 +16,7 @@ from superdesk.text_utils import get_text
 from superdesk.utc import utcnow
 from superdesk import get_resource_service
 from superdesk.errors import SuperdeskApiError
-from superdesk.cache import cache
+from superdesk.cache import cache, query_tags
 from flask_babel import _
 
 
@@ -44,7 +44,7 @@ class FilterConditionFieldsEnum(Enum):
     languages = 21
 
 
-@cache(ttl=3600, tags=("vocabularies",))
+@cache(ttl=3600, tags=query_tags("vocabularies", ["field_type"]))
 def _get_field_type_map() -> Dict[str, str]:
     field_type_map = {}
     cvs = get_resource_service("vocabularies").get_from_mongo(req=None, lookup=None, projection={"field_type": 1})
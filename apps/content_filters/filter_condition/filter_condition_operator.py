@@ -9,6 +9,7 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 from enum import Enum
+from typing import FrozenSet
 import operator
 
 
@@ -73,34 +74,53 @@ class FilterConditionOperator:
     def does_match(self, article_value, filter_value):
         raise NotImplementedError()
 
+    def compile_value(self, filter_value):
+        """Prepare filter value for matching, it's done once per filter condition."""
+        return filter_value
+
     def get_lower_case(self, value):
         return str(value).lower()
 
+    def get_lower_case_set(self, filter_value) -> FrozenSet[str]:
+        if isinstance(filter_value, frozenset):
+            return filter_value
+        return frozenset(map(self.get_lower_case, filter_value))
+
+
+class SetOperator(FilterConditionOperator):
+    """
+    Base for operators testing article values against set of filter values
+    """
+
+    def compile_value(self, filter_value):
+        return self.get_lower_case_set(filter_value)
+
+    def is_in(self, article_value, filter_value):
+        filter_values = self.get_lower_case_set(filter_value)
+        if isinstance(article_value, list):
+            return any(self.get_lower_case(v) in filter_values for v in article_value)
+        else:
+            return self.get_lower_case(article_value) in filter_values
+
 
-class InOperator(FilterConditionOperator):
+class InOperator(SetOperator):
     def __init__(self, operator):
         self.operator = FilterConditionOperatorsEnum[operator + "_"]
         self.mongo_operator = "$in"
         self.elastic_operator = "terms"
 
     def does_match(self, article_value, filter_value):
-        if isinstance(article_value, list):
-            return any([self.get_lower_case(v) in map(self.get_lower_case, filter_value) for v in article_value])
-        else:
-            return self.get_lower_case(article_value) in map(self.get_lower_case, filter_value)
+        return self.is_in(article_value, filter_value)
 
 
-class NotInOperator(FilterConditionOperator):
+class NotInOperator(SetOperator):
     def __init__(self, operator):
         self.operator = FilterConditionOperatorsEnum[operator]
         self.mongo_operator = self._get_default_mongo_operator()
         self.elastic_operator = "terms"
 
     def does_match(self, article_value, filter_value):
-        if isinstance(article_value, list):
-            return all([self.get_lower_case(v) not in map(self.get_lower_case, filter_value) for v in article_value])
-        else:
-            return self.get_lower_case(article_value) not in map(self.get_lower_case, filter_value)
+        return not self.is_in(article_value, filter_value)
 
     def contains_not(self):
         return True
@@ -181,17 +201,14 @@ class RegexOperator(FilterConditionOperator):
         return filter_value.search(article_value) is not None
 
 
-class MatchOperator(FilterConditionOperator):
+class MatchOperator(SetOperator):
     def __init__(self, operator):
         self.operator = FilterConditionOperatorsEnum[operator]
         self.mongo_operator = "$in"
         self.elastic_operator = '{{"query_string": {{"{}":"{}"}}}}'
 
     def does_match(self, article_value, filter_value):
-        if isinstance(article_value, list):
-            return any([self.get_lower_case(v) in map(self.get_lower_case, filter_value) for v in article_value])
-        else:
-            return self.get_lower_case(article_value) in map(self.get_lower_case, filter_value)
+        return self.is_in(article_value, filter_value)
 
 
 class ExistsOperator(FilterConditionOperator):
@@ -13,10 +13,14 @@ import re
 import logging
 import collections
 
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
 from flask import json, current_app as app, request
 from simplejson.errors import JSONDecodeError
 from eve.utils import config
 
+from superdesk.cache import get_tags_version, query_tags
 from superdesk.errors import SuperdeskApiError
 from superdesk.services import BaseService
 from superdesk.notification import push_notification
@@ -26,6 +30,9 @@ from flask_babel import _
 
 FILE_ID = "_file_id"
 
+#: fields used to build dictionary model, model is rebuilt when any of these is changed
+MODEL_FIELDS = ("content", FILE_ID, "language_id", "is_active", "type")
+
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +105,53 @@ def fetch_dict(doc):
     return {}
 
 
+class DictionaryModel:
+    """Words with their counts, read only.
+
+    Words are kept utf-8 encoded in a sorted list with counts in an array,
+    which takes less than half of the memory used by a dict of words.
+    It supports ``in`` and ``get`` like a dict, words are found using binary search.
+
+    :param words: dict of words with counts
+    """
+
+    def __init__(self, words: Dict[str, int]):
+        encoded = sorted((word.encode("utf-8"), count) for word, count in words.items())
+        self._words = [word for word, _count in encoded]  # type: List[bytes]
+        self._counts = array("q", (int(count) for _word, count in encoded))
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word) -> bool:
+        return self._find(word) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (word.decode("utf-8") for word in self._words)
+
+    def get(self, word, default=None):
+        index = self._find(word)
+        return self._counts[index] if index is not None else default
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return ((word.decode("utf-8"), count) for word, count in zip(self._words, self._counts))
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Test if there is any word starting with given prefix."""
+        key = prefix.encode("utf-8")
+        index = bisect_left(self._words, key)
+        return index < len(self._words) and self._words[index].startswith(key)
+
+    def _find(self, word) -> Optional[int]:
+        if not isinstance(word, str):
+            return None
+        key = word.encode("utf-8")
+        index = bisect_left(self._words, key)
+        if index < len(self._words) and self._words[index] == key:
+            return index
+        return None
+
+
 def store_dict(updates, original):
     """Store dictionary content.
 
@@ -237,16 +291,26 @@ class DictionaryService(BaseService):
         """Get model for given language.
 
         It will use all active dictionaries for given language combined.
+        Models are kept in process memory and rebuilt once any dictionary is changed.
 
         :param lang: language code
+        :return DictionaryModel: words with counts
         """
-        model = {}
+        version = get_tags_version(query_tags("dictionaries", MODEL_FIELDS))
+        models = app.extensions.setdefault("superdesk_dictionary_models", {})
+        cached = models.get(lang)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        words = {}  # type: Dict[str, int]
         dicts = self.get_dictionaries(lang)
 
         for _dict in dicts:
             content = fetch_dict(_dict)
             for word, count in content.items():
-                add_word(model, word, count)
+                add_word(words, word, count)
+        model = DictionaryModel(words)
+        models[lang] = (version, model)
         return model
 
     def on_update(self, updates, original):
@@ -11,6 +11,8 @@
 import logging
 import json
 
+from typing import Any, Dict, Optional, Set
+
 from bson.objectid import ObjectId
 
 import superdesk
@@ -49,6 +51,10 @@ class LegalArchiveImport:
         "{{'_id': {_id}, 'unique_name': {unique_name}, 'version': {_current_version}, " "'expired_on': {expiry}}}."
     )
 
+    def __init__(self):
+        # names of users, desks and stages used for de-normalization by resource and str(_id)
+        self._names = {"users": {}, "desks": {}, "stages": {}}  # type: Dict[str, Dict[str, Optional[str]]]
+
     def upsert_into_legal_archive(self, item_id):
         """Once publish actions are performed on the article do the below:
 
@@ -118,48 +124,31 @@ class LegalArchiveImport:
                 self._set_moved_to_legal(doc)
                 return
 
-            # Step 2 - De-normalizing the legal archive doc
-            self._denormalize_user_desk(legal_archive_doc, log_msg)
-            logger.info("De-normalized article {}".format(log_msg))
-
-            # Step 3 - Upserting Legal Archive
-            logger.info("Upserting Legal Archive Repo with article {}".format(log_msg))
-
-            if article_in_legal_archive:
-                legal_archive_service.put(legal_archive_doc[config.ID_FIELD], legal_archive_doc)
-            else:
-                legal_archive_service.post([legal_archive_doc])
-
-            # Step 4 - Get Versions and De-normalize and Inserting Legal Archive Versions
+            # Get Versions and History missing in Legal Archive
             lookup = {version_id_field: legal_archive_doc[config.ID_FIELD]}
             versions = list(get_resource_service("archive_versions").get(req=None, lookup=lookup))
-            legal_versions = list(legal_archive_versions_service.get(req=None, lookup=lookup))
+            legal_versions = {
+                legal_version[config.VERSION]
+                for legal_version in legal_archive_versions_service.get_from_mongo(
+                    req=None, lookup=lookup, projection={config.VERSION: 1}
+                )
+            }
 
             logger.info("Fetched version history for article {}".format(log_msg))
-            versions_to_insert = [
-                version
-                for version in versions
-                if not any(
-                    legal_version
-                    for legal_version in legal_versions
-                    if version[config.VERSION] == legal_version[config.VERSION]
-                )
-            ]
+            versions_to_insert = [version for version in versions if version[config.VERSION] not in legal_versions]
 
-            # Step 5 - Get History and de-normalize and insert into Legal Archive History
             lookup = {"item_id": legal_archive_doc[config.ID_FIELD]}
             history_items = list(get_resource_service("archive_history").get(req=None, lookup=lookup))
-            legal_history_items = list(legal_archive_history_service.get(req=None, lookup=lookup))
+            legal_history_items = {
+                legal_history[config.ID_FIELD]
+                for legal_history in legal_archive_history_service.get_from_mongo(
+                    req=None, lookup=lookup, projection={config.ID_FIELD: 1}
+                )
+            }
 
             logger.info("Fetched history for article {}".format(log_msg))
             history_to_insert = [
-                history
-                for history in history_items
-                if not any(
-                    legal_version
-                    for legal_version in legal_history_items
-                    if history[config.ID_FIELD] == legal_version[config.ID_FIELD]
-                )
+                history for history in history_items if history[config.ID_FIELD] not in legal_history_items
             ]
 
             # This happens when user kills an article from Dusty Archive
@@ -174,6 +163,22 @@ class LegalArchiveImport:
                 versioned_doc[config.ID_FIELD] = ObjectId()
                 versions_to_insert.append(versioned_doc)
 
+            # Fetch users, desks and stages for all documents at once
+            self._load_names([legal_archive_doc] + versions_to_insert, history_to_insert)
+
+            # Step 2 - De-normalizing the legal archive doc
+            self._denormalize_user_desk(legal_archive_doc, log_msg)
+            logger.info("De-normalized article {}".format(log_msg))
+
+            # Step 3 - Upserting Legal Archive
+            logger.info("Upserting Legal Archive Repo with article {}".format(log_msg))
+
+            if article_in_legal_archive:
+                legal_archive_service.put(legal_archive_doc[config.ID_FIELD], legal_archive_doc)
+            else:
+                legal_archive_service.post([legal_archive_doc])
+
+            # Step 4 - De-normalize and Insert Legal Archive Versions
             for version_doc in versions_to_insert:
                 self._denormalize_user_desk(
                     version_doc,
@@ -190,6 +195,7 @@ class LegalArchiveImport:
                 legal_archive_versions_service.post(versions_to_insert)
                 logger.info("Inserted de-normalized versions for article {}".format(log_msg))
 
+            # Step 5 - De-normalize and insert into Legal Archive History
             for history_doc in history_to_insert:
                 self._denormalize_history(history_doc)
                 history_doc.pop(config.ETAG, None)
@@ -211,6 +217,7 @@ class LegalArchiveImport:
         De-normalizes history items
         """
         msg = "item_id: {} and version: {}".format(history_item["item_id"], history_item["version"])
+        self._load_names([], [history_item])
 
         # De-normalizing User Details
         history_item["user_id"] = self.__get_user_name(history_item.get("user_id"))
@@ -219,17 +226,17 @@ class LegalArchiveImport:
         history_update = history_item.get("update")
         if history_update:
             if history_update.get("task") and history_update.get("task").get("desk"):
-                desk = get_resource_service("desks").find_one(req=None, _id=str(history_update["task"]["desk"]))
-                if desk:
-                    history_update["task"]["desk"] = desk.get("name")
+                desk = self._names["desks"].get(str(history_update["task"]["desk"]))
+                if desk is not None:
+                    history_update["task"]["desk"] = desk
                     logger.info("De-normalized Desk Details for article history {}".format(msg))
                 else:
                     logger.info("Desk Details Not Found: {}. {}".format(history_update["task"].get("desk"), msg))
 
             if history_update.get("task") and history_update["task"].get("stage"):
-                stage = get_resource_service("stages").find_one(req=None, _id=str(history_update["task"]["stage"]))
-                if stage:
-                    history_update["task"]["stage"] = stage.get("name")
+                stage = self._names["stages"].get(str(history_update["task"]["stage"]))
+                if stage is not None:
+                    history_update["task"]["stage"] = stage
                     logger.info("De-normalized Stage Details for article {}".format(msg))
                 else:
                     logger.info("Stage Details Not Found: {}. {}".format(history_update["task"].get("stage"), msg))
@@ -243,6 +250,7 @@ class LegalArchiveImport:
         """
         De-normalizes user, desk and stage details in legal_archive_doc.
         """
+        self._load_names([legal_archive_doc])
 
         # De-normalizing User Details
         legal_archive_doc["original_creator"] = self.__get_user_name(legal_archive_doc.get("original_creator"))
@@ -253,17 +261,17 @@ class LegalArchiveImport:
         # De-normalizing Desk and Stage details
         if legal_archive_doc.get("task"):
             if legal_archive_doc["task"].get("desk"):
-                desk = get_resource_service("desks").find_one(req=None, _id=str(legal_archive_doc["task"]["desk"]))
-                if desk:
-                    legal_archive_doc["task"]["desk"] = desk.get("name")
+                desk = self._names["desks"].get(str(legal_archive_doc["task"]["desk"]))
+                if desk is not None:
+                    legal_archive_doc["task"]["desk"] = desk
                     logger.info("De-normalized Desk Details for article {}".format(log_msg))
                 else:
                     logger.info("Desk Details Not Found: {}. {}".format(legal_archive_doc["task"].get("desk"), log_msg))
 
             if legal_archive_doc["task"].get("stage"):
-                stage = get_resource_service("stages").find_one(req=None, _id=str(legal_archive_doc["task"]["stage"]))
-                if stage:
-                    legal_archive_doc["task"]["stage"] = stage.get("name")
+                stage = self._names["stages"].get(str(legal_archive_doc["task"]["stage"]))
+                if stage is not None:
+                    legal_archive_doc["task"]["stage"] = stage
                     logger.info("De-normalized Stage Details for article {}".format(log_msg))
                 else:
                     logger.info(
@@ -276,17 +284,48 @@ class LegalArchiveImport:
         """
         Retrieves display_name of the user identified by user_id
         """
-        logger.info("Get User Details for ID:{}".format(user_id))
-
         if not user_id:
             return ""
 
-        user = get_resource_service("users").find_one(req=None, _id=user_id)
+        return self._names["users"].get(str(user_id)) or ""
 
-        if not user:
-            return ""
+    def _load_names(self, docs, history_items=()):
+        """Fetch users, desks and stages referenced by documents and history items.
 
-        return get_display_name(user)
+        Only those not fetched before are fetched, using single query per resource.
+
+        :param list docs: archive documents or versions
+        :param list history_items: archive history items
+        """
+        ids = {"users": set(), "desks": set(), "stages": set()}  # type: Dict[str, Set[Any]]
+        for doc in docs:
+            ids["users"].update([doc.get("original_creator"), doc.get("version_creator")])
+            self._collect_task_ids(doc.get("task"), ids)
+        for history_item in history_items:
+            ids["users"].add(history_item.get("user_id"))
+            self._collect_task_ids((history_item.get("update") or {}).get("task"), ids)
+
+        for resource, resource_ids in ids.items():
+            names = self._names[resource]
+            missing = {_id for _id in resource_ids if _id and str(_id) not in names}
+            if not missing:
+                continue
+            logger.info("Get {} details for IDs: {}".format(resource, missing))
+            for _id in missing:
+                names[str(_id)] = None
+            for doc in get_resource_service(resource).get_from_mongo(
+                req=None, lookup={config.ID_FIELD: {"$in": list(missing)}}
+            ):
+                names[str(doc[config.ID_FIELD])] = get_display_name(doc) if resource == "users" else doc.get("name")
+
+    def _collect_task_ids(self, task, ids):
+        if not task:
+            return
+        ids["users"].add(task.get("user"))
+        if task.get("desk"):
+            ids["desks"].add(str(task["desk"]))
+        if task.get("stage"):
+            ids["stages"].add(str(task["stage"]))
 
     def _set_moved_to_legal(self, doc):
         """Set the moved to legal flag.
@@ -514,12 +553,16 @@ class ImportLegalArchiveCommand(superdesk.Command):
             expired_items = set()
             for items in self.get_expired_items(page_size):
                 for item in items:
-                    self._move_to_legal(item.get("item_id"), item.get(config.VERSION), expired_items)
+                    self._move_to_legal(
+                        item.get("item_id"), item.get(config.VERSION), expired_items, legal_archive_import
+                    )
 
             # get the invalid items from archive.
             for items in get_resource_service(ARCHIVE).get_expired_items(utcnow(), invalid_only=True):
                 for item in items:
-                    self._move_to_legal(item.get(config.ID_FIELD), item.get(config.VERSION), expired_items)
+                    self._move_to_legal(
+                        item.get(config.ID_FIELD), item.get(config.VERSION), expired_items, legal_archive_import
+                    )
 
             # if publish item is moved but publish_queue item is not.
             if len(expired_items):
@@ -543,9 +586,10 @@ class ImportLegalArchiveCommand(superdesk.Command):
         finally:
             unlock(lock_name)
 
-    def _move_to_legal(self, item_id, item_version, expired_items):
+    def _move_to_legal(self, item_id, item_version, expired_items, legal_archive_import=None):
         try:
-            legal_archive_import = LegalArchiveImport()
+            if legal_archive_import is None:
+                legal_archive_import = LegalArchiveImport()
             legal_archive_import.upsert_into_legal_archive(item_id)
             # set the flag to be set to true.
             get_resource_service("published").set_moved_to_legal(item_id, item_version, True)
@@ -114,6 +114,34 @@ class LegalService(Service):
         else:
             legal_archive_docs["_type"] = LEGAL_ARCHIVE_NAME
 
+    def _get_existing_ids(self, ids):
+        """Get set of given ids which exist in the collection as strings, using single query."""
+        ids = [_id for _id in ids if _id is not None]
+        if not ids:
+            return set()
+        return {
+            str(doc[config.ID_FIELD])
+            for doc in self.get_from_mongo(
+                req=None, lookup={config.ID_FIELD: {"$in": ids}}, projection={config.ID_FIELD: 1}
+            )
+        }
+
+    def _create_missing(self, docs, should_check):
+        """Create docs which are not in the collection yet, using single insert.
+
+        :param docs: docs to create
+        :param should_check: function returning ``True`` if doc should be checked for existence by its id
+        """
+        existing = self._get_existing_ids([doc.get(config.ID_FIELD) for doc in docs if should_check(doc)])
+        new_docs = []
+        for doc in docs:
+            if should_check(doc):
+                if str(doc[config.ID_FIELD]) in existing:
+                    continue
+                existing.add(str(doc[config.ID_FIELD]))
+            new_docs.append(doc)
+        return super().create(new_docs) if new_docs else []
+
     def _change_location_of_items_in_package(self, package):
         """
         Changes location of each item in the package to legal archive instead of archive.
@@ -150,15 +178,7 @@ class LegalPublishQueueService(LegalService):
         package expires and once when the item expires.
         """
 
-        ids = []
-        for doc in docs:
-            doc_if_exists = None
-            if doc.get(config.ID_FIELD):
-                doc_if_exists = self.find_one(req=None, _id=doc.get(config.ID_FIELD))
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        return self._create_missing(docs, lambda doc: doc.get(config.ID_FIELD))
 
 
 class LegalArchiveVersionsService(LegalService):
@@ -167,21 +187,13 @@ class LegalArchiveVersionsService(LegalService):
         Overriding this from preventing the same version again. This happens when an item is published more than once.
         """
 
-        ids = []
         for doc in docs:
-            doc_if_exists = None
-
-            if config.ID_FIELD in doc:  # This happens when inserting docs from pre-populate command
-                doc_if_exists = self.find_one(req=None, _id=doc["_id"])
-
-            # This also happens when inserting docs from pre-populate command
+            # This happens when inserting docs from pre-populate command
             if not doc.get("operation"):
                 doc["operation"] = "create"
 
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        # Checking id happens when inserting docs from pre-populate command
+        return self._create_missing(docs, lambda doc: config.ID_FIELD in doc)
 
     def get(self, req, lookup):
         """
@@ -211,12 +223,4 @@ class LegalArchiveHistoryService(LegalService):
         Overriding this from preventing the same version again. This happens when an item is published more than once.
         """
 
-        ids = []
-        for doc in docs:
-            doc_if_exists = None
-            if doc.get("item_id"):
-                doc_if_exists = self.find_one(req=None, _id=doc.get("_id"))
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        return self._create_missing(docs, lambda doc: doc.get("item_id") and doc.get(config.ID_FIELD))
@@ -14,6 +14,7 @@ import logging
 import elasticapm
 import content_api
 
+from typing import Any, Dict, Hashable, Optional
 from bson import ObjectId
 from flask import current_app as app, g
 from superdesk import get_resource_service
@@ -23,8 +24,10 @@ from superdesk.metadata.packages import GROUPS, ROOT_GROUP, GROUP_ID, REFS, RESI
 from superdesk.publish import SUBSCRIBER_TYPES
 from superdesk.publish.publish_queue import PUBLISHED_IN_PACKAGE
 from superdesk.publish.formatters import get_formatter
+from superdesk.notification import push_notification
 from apps.publish.content.utils import filter_digital, filter_non_digital
 from apps.publish.content.common import BasePublishService
+from apps.content_filters.content_filter.content_filter_service import ContentFilterMatcher
 from copy import deepcopy
 from eve.utils import config, ParsedRequest
 from apps.archive.common import get_utc_schedule
@@ -48,6 +51,8 @@ class EnqueueService:
 
     filters = None
 
+    filter_matcher: Optional[ContentFilterMatcher] = None
+
     def __init__(self, published_state=None):
         if published_state is not None:
             self.published_state = published_state
@@ -420,7 +425,8 @@ class EnqueueService:
 
         ::Important Note:: Format Type across Subscribers can repeat. But we can't have formatted item generated once
         based on the format_types configured across for all the subscribers as the formatted item must have a published
-        sequence number generated by Subscriber.
+        sequence number generated by Subscriber. Formatters which output doesn't depend on subscriber can reuse
+        rendered item via format cache, see :attr:`superdesk.publish.formatters.Formatter.format_depends_on`.
 
         :param dict doc: document to queue for transmission
         :param list subscribers: List of subscriber dict.
@@ -444,6 +450,9 @@ class EnqueueService:
                 self.resend_association_items(doc)
 
         queued = False
+        bulk_insert = app.config.get("PUBLISH_QUEUE_BULK_INSERT", False)
+        queue_items = []
+        format_cache = {}  # type: Dict[Hashable, Any]
         filtered_document = self.filter_document(doc)
         for subscriber in subscribers:
             try:
@@ -454,13 +463,8 @@ class EnqueueService:
                     # wire subscribers can get only text and preformatted stories
                     continue
 
+                destinations = []
                 for destination in self.get_destinations(subscriber):
-                    embed_package_items = doc[ITEM_TYPE] == CONTENT_TYPE.COMPOSITE and (
-                        destination.get("config") or {}
-                    ).get("packaged", False)
-                    if embed_package_items:
-                        doc = self._embed_package_items(doc)
-
                     if doc.get(PUBLISHED_IN_PACKAGE) and (destination.get("config") or {}).get("packaged", False):
                         continue
 
@@ -471,7 +475,25 @@ class EnqueueService:
                         logger.warning("Formatter not found for format: %s", destination["format"])
                         continue
 
+                    destinations.append((destination, formatter))
+
+                # reserve sequence numbers for all destinations using single update
+                sequence_numbers = (
+                    get_resource_service("subscribers").generate_sequence_numbers(subscriber, len(destinations))
+                    if destinations
+                    else []
+                )
+
+                for destination, formatter in destinations:
+                    embed_package_items = doc[ITEM_TYPE] == CONTENT_TYPE.COMPOSITE and (
+                        destination.get("config") or {}
+                    ).get("packaged", False)
+                    if embed_package_items:
+                        doc = self._embed_package_items(doc)
+
                     formatter.set_destination(destination, subscriber)
+                    formatter.set_format_cache(None if embed_package_items else format_cache)
+                    formatter.set_sequence_numbers(sequence_numbers)
                     formatted_docs = formatter.format(
                         self.filter_document(doc) if embed_package_items else filtered_document.copy(),
                         subscriber,
@@ -519,6 +541,10 @@ class EnqueueService:
                             publish_queue_item["encoded_item_id"] = app.storage.put(binary)
                         publish_queue_item.pop(ITEM_STATE, None)
 
+                        if bulk_insert:
+                            queue_items.append(publish_queue_item)
+                            continue
+
                         # content api delivery will be marked as SUCCESS in queue
                         get_resource_service("publish_queue").post([publish_queue_item])
                         queued = True
@@ -530,8 +556,80 @@ class EnqueueService:
                     )
                 )
 
+        if queue_items:
+            queued = self._post_queue_items(doc, queue_items)
+
+        return queued
+
+    def _post_queue_items(self, doc, queue_items) -> bool:
+        """Save all the queue items for given doc using a single bulk insert.
+
+        If bulk insert fails it falls back to saving items per subscriber,
+        so a single failing subscriber won't block queueing for others.
+
+        :param dict doc: document being queued
+        :param list queue_items: publish queue items for all subscribers and destinations
+        :return: True if any items were queued else False
+        """
+        try:
+            self._post_queue_items_batch(queue_items)
+            return True
+        except Exception:
+            logger.exception(
+                "Failed to queue item for id {} with headline {} for {} destinations, queueing per subscriber.".format(
+                    doc.get(config.ID_FIELD), doc.get("headline"), len(queue_items)
+                )
+            )
+
+        # items might be saved already, eg. when mongo insert worked but elastic failed
+        ids = [queue_item[config.ID_FIELD] for queue_item in queue_items if queue_item.get(config.ID_FIELD)]
+        saved = (
+            {
+                queue_item[config.ID_FIELD]
+                for queue_item in get_resource_service("publish_queue").get_from_mongo(
+                    req=None, lookup={config.ID_FIELD: {"$in": ids}}, projection={config.ID_FIELD: 1}
+                )
+            }
+            if ids
+            else set()
+        )
+
+        queue_items_by_subscriber: Dict[Hashable, list] = {}
+        for queue_item in queue_items:
+            if queue_item.get(config.ID_FIELD) in saved:
+                continue
+            queue_items_by_subscriber.setdefault(queue_item["subscriber_id"], []).append(queue_item)
+
+        queued = bool(saved)
+        if saved:
+            push_notification(
+                "publish_queue:update",
+                queue_ids=[str(_id) for _id in saved],
+                item_ids=list({queue_item.get("item_id") for queue_item in queue_items}),
+            )
+
+        for subscriber_id, subscriber_queue_items in queue_items_by_subscriber.items():
+            try:
+                self._post_queue_items_batch(subscriber_queue_items)
+                queued = True
+            except Exception:
+                logger.exception(
+                    "Failed to queue item for id {} with headline {} for subscriber {}.".format(
+                        doc.get(config.ID_FIELD), doc.get("headline"), subscriber_id
+                    )
+                )
         return queued
 
+    def _post_queue_items_batch(self, queue_items):
+        # content api delivery will be marked as SUCCESS in queue
+        ids = get_resource_service("publish_queue").post(queue_items)
+        # single notification for all items created together
+        push_notification(
+            "publish_queue:update",
+            queue_ids=[str(_id) for _id in ids],
+            item_ids=list({item.get("item_id") for item in queue_items}),
+        )
+
     def get_unique_associations(self, associated_items):
         """This method is used for the removing duplicate associate items
         :param dict associated_items: all the associate item
@@ -648,9 +746,17 @@ class EnqueueService:
             [gf["cf"] for gf in self.filters.get("content_filters", {}).values() if gf["cf"].get("is_global", True)]
         )
 
+        # global and product filters share the results of filter conditions for the doc
+        self.filter_matcher = ContentFilterMatcher(doc, self.filters)
+
         # apply global filters
         self.conforms_global_filter(global_filters, doc)
 
+        # subscribers with same products and global filters get the same result,
+        # so it's computed once per routing key and products are checked once per doc
+        routes = {}
+        product_matches = {}
+
         for subscriber in subscribers:
             if target_media_type and subscriber.get("subscriber_type", "") != SUBSCRIBER_TYPES.ALL:
                 can_send_digital = subscriber["subscriber_type"] == SUBSCRIBER_TYPES.DIGITAL
@@ -666,32 +772,33 @@ class EnqueueService:
             if not conforms:
                 continue
 
-            if not self.conforms_subscriber_global_filter(subscriber, global_filters):
+            routing_key = self._get_routing_key(subscriber)
+            if routing_key not in routes:
+                routes[routing_key] = self._route_article(
+                    doc, subscriber, global_filters, existing_products, product_matches
+                )
+            route = routes[routing_key]
+
+            if not route["conforms_global_filter"]:
                 continue
 
             product_codes = self._get_codes(subscriber)
             subscriber_added = False
             subscriber["api_enabled"] = False
             # validate against direct products
-            result, codes = self._validate_article_for_subscriber(doc, subscriber.get("products"), existing_products)
-            if result:
-                product_codes.extend(codes)
+            if route["products"]:
+                product_codes.extend(route["product_codes"])
+                filtered_subscribers.append(subscriber)
+                subscriber_added = True
+
+            # validate against api products
+            if route["api_products"]:
+                product_codes.extend(route["api_product_codes"])
+                subscriber["api_enabled"] = True
                 if not subscriber_added:
                     filtered_subscribers.append(subscriber)
                     subscriber_added = True
 
-            if content_api.is_enabled():
-                # validate against api products
-                result, codes = self._validate_article_for_subscriber(
-                    doc, subscriber.get("api_products"), existing_products
-                )
-                if result:
-                    product_codes.extend(codes)
-                    subscriber["api_enabled"] = True
-                    if not subscriber_added:
-                        filtered_subscribers.append(subscriber)
-                        subscriber_added = True
-
             if skip_filters and not subscriber_added:
                 # if targeted subscriber and has api products then send it to api.
                 if subscriber.get("api_products"):
@@ -705,12 +812,57 @@ class EnqueueService:
 
         return filtered_subscribers, subscriber_codes
 
-    def _validate_article_for_subscriber(self, doc, products, existing_products):
+    def _get_routing_key(self, subscriber):
+        """Get key for subscribers which get the same result from products and global filters.
+
+        :param dict subscriber: subscriber
+        :return tuple: routing key
+        """
+        return (
+            tuple(subscriber.get("products") or []),
+            tuple(subscriber.get("api_products") or []),
+            tuple(sorted((subscriber.get("global_filters") or {}).items())),
+        )
+
+    def _route_article(self, doc, subscriber, global_filters, existing_products, product_matches):
+        """Check global filters and products of subscriber for given doc.
+
+        :param dict doc: Document to be validated
+        :param dict subscriber: Subscriber
+        :param list global_filters: Global filters with does_match result
+        :param dict existing_products: Product lookup
+        :param dict product_matches: Product results for the doc
+        :return dict: route with products and api products results and product codes
+        """
+        route = {
+            "conforms_global_filter": self.conforms_subscriber_global_filter(subscriber, global_filters),
+            "products": False,
+            "product_codes": [],
+            "api_products": False,
+            "api_product_codes": [],
+        }
+
+        if not route["conforms_global_filter"]:
+            return route
+
+        route["products"], route["product_codes"] = self._validate_article_for_subscriber(
+            doc, subscriber.get("products"), existing_products, product_matches
+        )
+
+        if content_api.is_enabled():
+            route["api_products"], route["api_product_codes"] = self._validate_article_for_subscriber(
+                doc, subscriber.get("api_products"), existing_products, product_matches
+            )
+
+        return route
+
+    def _validate_article_for_subscriber(self, doc, products, existing_products, product_matches=None):
         """Validate the article for subscriber
 
         :param dict doc: Document to be validated
         :param list products: list of product ids
         :param dict existing_products: Product lookup
+        :param dict product_matches: Optional product results for the doc shared between subscribers
         :return tuple bool, list: Boolean flag to add subscriber or not and list of product codes.
         """
         add_subscriber, product_codes = False, []
@@ -718,6 +870,9 @@ class EnqueueService:
         if not products:
             return add_subscriber, product_codes
 
+        if product_matches is None:
+            product_matches = {}
+
         with elasticapm.capture_span("check products"):
             for product_id in products:
                 # check if the product filter conforms with the story
@@ -726,10 +881,12 @@ class EnqueueService:
                 if not product:
                     continue
 
-                if not self.conforms_product_targets(product, doc):
-                    continue
+                if product_id not in product_matches:
+                    product_matches[product_id] = self.conforms_product_targets(
+                        product, doc
+                    ) and self.conforms_content_filter(product, doc)
 
-                if self.conforms_content_filter(product, doc):
+                if product_matches[product_id]:
                     # gather the codes of products
                     product_codes.extend(self._get_codes(product))
                     add_subscriber = True
@@ -874,9 +1031,8 @@ class EnqueueService:
         if content_filter is None or "filter_id" not in content_filter or content_filter["filter_id"] is None:
             return True
 
-        service = get_resource_service("content_filters")
         filter = self.filters.get("content_filters", {}).get(content_filter["filter_id"], {}).get("cf")
-        does_match = service.does_match(filter, doc, self.filters)
+        does_match = self._get_filter_matcher(doc).does_match(filter)
 
         if does_match:
             return content_filter["filter_type"] == "permitting"
@@ -891,9 +1047,16 @@ class EnqueueService:
         :param global_filters: List of all global filters
         :param doc: Document to test the global filter against
         """
-        service = get_resource_service("content_filters")
+        matcher = self._get_filter_matcher(doc)
         for global_filter in global_filters:
-            global_filter["does_match"] = service.does_match(global_filter, doc, self.filters)
+            global_filter["does_match"] = matcher.does_match(global_filter)
+
+    def _get_filter_matcher(self, doc) -> ContentFilterMatcher:
+        """Get content filter matcher for doc, shared by global and product filters."""
+        matcher = self.filter_matcher
+        if matcher is None or matcher.article is not doc or matcher.filters is not self.filters:
+            matcher = self.filter_matcher = ContentFilterMatcher(doc, self.filters)
+        return matcher
 
     def conforms_subscriber_global_filter(self, subscriber, global_filters):
         """Check global filter for subscriber
@@ -1,17 +1,25 @@
 import superdesk
 
+from itertools import takewhile
+
 
 def norvig_suggest(word, model):
     """Norvig's simple spell check.
 
     Modified not to return only best correction, but all of them sorted.
+    If model supports ``has_prefix`` it is used to skip edits of a word part
+    which is not a prefix of any known word.
     """
     NWORDS = model
     alphabet = "abcdefghijklmnopqrstuvwxyz"
     suggestions = []
+    has_prefix = getattr(model, "has_prefix", None)
 
     def edits1(word):
         splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        if has_prefix is not None:
+            # all edits keep the first part, so only those with known prefix can be found
+            splits = list(takewhile(lambda split: has_prefix(split[0]), splits))
         deletes = [a + b[1:] for a, b in splits if b]
         transposes = [a + b[1] + b[0] + b[2:] for a, b in splits if len(b) > 1]
         replaces = [a + c + b[1:] for a, b in splits for c in alphabet if b]
@@ -27,6 +27,8 @@ def init_app(app) -> None:
     app.on_inserted += service.on_generic_inserted
     app.on_updated += service.on_generic_updated
     app.on_deleted_item += service.on_generic_deleted
+    app.teardown_request(service.on_teardown)
+    app.teardown_appcontext(service.on_teardown)
 
 
 @celery.task(soft_time_limit=600)
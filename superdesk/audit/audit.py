@@ -8,10 +8,16 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import time
 import logging
-from flask import g
+from copy import deepcopy
+from flask import g, current_app as app
+from eve.utils import config
+from superdesk import get_resource_service
+from superdesk.celery_app import celery
 from superdesk.resource import Resource
 from superdesk.services import BaseService
+from superdesk.utc import utcnow
 
 log = logging.getLogger(__name__)
 
@@ -45,6 +51,14 @@ class AuditResource(Resource):
 
 
 class AuditService(BaseService):
+    """Audit service.
+
+    Audit records created by generic hooks are kept in memory and saved together
+    when app context ends (after a request or a task), when there are ``AUDIT_BATCH_SIZE``
+    records or when the oldest one is older than ``AUDIT_FLUSH_INTERVAL`` seconds.
+    With ``AUDIT_ASYNC`` these are saved by a celery task.
+    """
+
     def on_generic_inserted(self, resource, docs):
         if resource in AuditResource.exclude:
             return
@@ -69,7 +83,7 @@ class AuditService(BaseService):
             "audit_id": self._extract_doc_id(docs[0]),
         }
 
-        self.post([audit])
+        self._add(audit)
 
     def on_generic_updated(self, resource, doc, original):
         if resource in AuditResource.exclude:
@@ -88,7 +102,7 @@ class AuditService(BaseService):
         }
         if "_id" not in doc:
             audit["extra"]["_id"] = original.get("_id", None)
-        self.post([audit])
+        self._add(audit)
 
     def on_generic_deleted(self, resource, doc):
         if resource in AuditResource.exclude:
@@ -105,7 +119,46 @@ class AuditService(BaseService):
             "extra": doc,
             "audit_id": self._extract_doc_id(doc),
         }
-        self.post([audit])
+        self._add(audit)
+
+    def flush(self):
+        """Save audit records kept in memory."""
+        audits = g.pop("audit_buffer", None)
+        g.pop("audit_buffer_time", None)
+        if not audits:
+            return
+        if app.config.get("AUDIT_ASYNC"):
+            try:
+                save_audit.delay(audits)
+                return
+            except Exception:
+                log.exception("Failed to schedule saving of %d audit records, saving these now", len(audits))
+        self.post(audits)
+
+    def on_teardown(self, exc=None):
+        """Save audit records when app context ends."""
+        try:
+            self.flush()
+        except Exception:
+            log.exception("Failed to save audit records")
+
+    def _add(self, audit):
+        batch_size = app.config.get("AUDIT_BATCH_SIZE", 1)
+        if batch_size <= 1:
+            self.post([audit])
+            return
+        now = utcnow()
+        audit[config.DATE_CREATED] = now
+        audit[config.LAST_UPDATED] = now
+        if "audit_buffer" not in g:
+            g.audit_buffer = []
+            g.audit_buffer_time = time.monotonic()
+        # docs can be modified later in the request
+        g.audit_buffer.append(deepcopy(audit))
+        if len(g.audit_buffer) >= batch_size or time.monotonic() - g.audit_buffer_time >= app.config.get(
+            "AUDIT_FLUSH_INTERVAL", 5
+        ):
+            self.flush()
 
     def _extract_doc_id(self, doc):
         """
@@ -121,3 +174,9 @@ class AuditService(BaseService):
         except Exception:
             return None
         return None
+
+
+@celery.task(soft_time_limit=300)
+def save_audit(audits):
+    """Save audit records created in another process."""
+    get_resource_service("audit").post(audits)
@@ -1,9 +1,14 @@
+import copy
+import time
 import hermes
 import hermes.backend
 import hermes.backend.redis
 import hermes.backend.memcached
 import hermes.backend.inprocess
+import threading
 
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 from urllib.parse import urlparse
 
 from flask import current_app
@@ -90,11 +95,310 @@ class SuperdeskCacheBackend(hermes.backend.AbstractBackend):
         return val
 
     def remove(self, keys):
+        keys = list(keys)
+        get_local_tags_cache().remove(keys)
         return self._backend.remove(keys)
 
     def clean(self):
+        get_local_cache().clear()
+        get_local_tags_cache().clear()
         return self._backend.clean()
 
 
+class LocalCache:
+    """Bounded in-process LRU cache with ttl.
+
+    It keeps values decoded, so these are copied on read to avoid
+    changes made by caller to leak into cache.
+
+    :param size: max number of entries
+    :param ttl: max entry time to live in seconds
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # type: OrderedDict
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                return None
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl=None):
+        if not self.size:
+            return
+        expires = time.monotonic() + min(ttl or self.ttl, self.ttl)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def remove(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_local_cache() -> LocalCache:
+    """Get in-process cache for current app configured via ``CACHE_LOCAL_SIZE`` and ``CACHE_LOCAL_TTL``."""
+    if not current_app:
+        raise RuntimeError("You can only use cache within app context.")
+    if not current_app.extensions.get("superdesk_local_cache"):
+        current_app.extensions["superdesk_local_cache"] = LocalCache(
+            current_app.config.get("CACHE_LOCAL_SIZE", 0),
+            current_app.config.get("CACHE_LOCAL_TTL", 0),
+        )
+    return current_app.extensions["superdesk_local_cache"]
+
+
+def get_local_tags_cache() -> LocalCache:
+    """Get in-process cache of tag versions configured via ``CACHE_LOCAL_SIZE`` and ``CACHE_LOCAL_TAGS_TTL``."""
+    if not current_app:
+        raise RuntimeError("You can only use cache within app context.")
+    if not current_app.extensions.get("superdesk_local_tags_cache"):
+        current_app.extensions["superdesk_local_tags_cache"] = LocalCache(
+            current_app.config.get("CACHE_LOCAL_SIZE", 0),
+            current_app.config.get("CACHE_LOCAL_TAGS_TTL", 0),
+        )
+    return current_app.extensions["superdesk_local_tags_cache"]
+
+
+class CacheStats:
+    """Cache hit/miss and invalidation counters for current process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = Counter()  # type: Counter
+        self.local_hits = Counter()  # type: Counter
+        self.misses = Counter()  # type: Counter
+        self.invalidations = Counter()  # type: Counter
+
+    def incr(self, counter: Counter, name: str, value: int = 1):
+        with self._lock:
+            counter[name] += value
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "local_hits": dict(self.local_hits),
+                "misses": dict(self.misses),
+                "invalidations": dict(self.invalidations),
+            }
+
+    def reset(self):
+        with self._lock:
+            for counter in (self.hits, self.local_hits, self.misses, self.invalidations):
+                counter.clear()
+
+
+stats = CacheStats()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Get cache statistics for current process.
+
+    ``hits``, ``local_hits`` and ``misses`` are counted per cached function,
+    ``invalidations`` per resource.
+    """
+    return stats.as_dict()
+
+
+class SuperdeskCached(hermes.Cached):
+    """Cache point using in-process cache in front of shared backend for tagged entries.
+
+    Entry key contains tag versions loaded from shared backend, so cleaning a tag
+    invalidates the entry in every process. Tag versions are kept locally
+    for ``CACHE_LOCAL_TAGS_TTL`` seconds, so cache hits don't need a round trip
+    to shared backend, while other processes see cleaned tags after that time.
+    """
+
+    def __call__(self, *args, **kwargs):
+        key = self._key(*args, **kwargs)
+        value = self._load(key)
+        if value is None:
+            with self._frontend.backend.lock(key):
+                value = self._load(key)
+                if value is None:
+                    stats.incr(stats.misses, self._stats_name)
+                    value = self._callable(*args, **kwargs)
+                    self._save(key, value)
+        return value
+
+    def _save(self, key, value):
+        ttl = self._ttl if self._ttl is not None else self._frontend.ttl
+        if self._tags:
+            key += ":" + self._frontend.mangler.hashTags(_load_tags(self._frontend, self._tags, ttl))
+        return self._frontend.backend.save({key: value}, ttl=ttl)
+
+    @property
+    def _stats_name(self):
+        return getattr(self._callable, "__qualname__", str(self._callable))
+
+    def _load(self, key):
+        if not self._tags:
+            value = super()._load(key)
+            if value is not None:
+                stats.incr(stats.hits, self._stats_name)
+            return value
+
+        tag_map = _load_local_tags(self._frontend, self._tags)
+        if len(tag_map) != len(self._tags):
+            return None
+
+        key += ":" + self._frontend.mangler.hashTags(tag_map)
+        local_cache = get_local_cache()
+        value = local_cache.get(key)
+        if value is not None:
+            stats.incr(stats.local_hits, self._stats_name)
+            return value
+        value = self._frontend.backend.load(key)
+        if value is not None:
+            stats.incr(stats.hits, self._stats_name)
+            local_cache.set(key, value, self._ttl or self._frontend.ttl)
+        return value
+
+
+#: time to live of document and query tags in seconds, it must be longer than any tagged entry
+#: otherwise such entries would be missed once the tag expires
+TAGS_TTL = 24 * 3600
+
+#: resources with entries tagged using resource name, see :func:`register_resource_tag`
+_resource_tags: Set[str] = set()
+
+
+def register_resource_tag(resource: str) -> None:
+    """Register resource which has cache entries tagged with its name.
+
+    Such entries are invalidated on any change of the resource, while entries using
+    :func:`document_tag` or :func:`query_tags` only on relevant changes. It must be registered
+    when app is initialized so every process changing the resource knows about it.
+
+    :param resource: resource name
+    """
+    _resource_tags.add(resource)
+
+
+def document_tag(resource: str, _id: Any) -> str:
+    """Get cache tag for entries using single document.
+
+    Entries with this tag are invalidated when the document is updated or removed.
+    Tags are set when creating cache point, so use it for cache points created per call::
+
+        @cache(tags=(document_tag("users", user_id),))
+        def get_user_name():
+            ...
+
+    :param resource: resource name
+    :param _id: document id
+    """
+    return "{}:{}".format(resource, _id)
+
+
+def query_tags(resource: str, fields: Iterable[str] = ()) -> List[str]:
+    """Get cache tags for entries using query on given fields.
+
+    Entries with these tags are invalidated when a document is created or removed,
+    or when any of given fields is changed in any document. Use for queries which
+    don't depend on other fields, changes to other fields won't invalidate these.
+
+    :param resource: resource name
+    :param fields: fields used by query, both in lookup and projection
+    """
+    return ["{}:query".format(resource)] + ["{}.{}".format(resource, field) for field in fields]
+
+
+def invalidate_cache(resource: str, ids: Optional[Iterable[Any]] = None, fields: Optional[Iterable[str]] = None):
+    """Invalidate cache entries affected by a change of documents.
+
+    Entries tagged with resource name are always invalidated if it was registered
+    using :func:`register_resource_tag`, entries with :func:`document_tag` only if document is in ``ids``. If ``fields`` is set
+    the change is an update of those fields, so only :func:`query_tags` entries
+    using those fields are invalidated, otherwise documents were created or removed
+    and all :func:`query_tags` entries for the resource are invalidated.
+
+    :param resource: resource name
+    :param ids: ids of changed documents
+    :param fields: fields changed by an update
+    """
+    tags = [resource] if resource in _resource_tags else []
+    if ids:
+        tags.extend(document_tag(resource, _id) for _id in ids)
+    if fields is None:
+        tags.extend(query_tags(resource))
+    else:
+        tags.extend("{}.{}".format(resource, field) for field in {field.split(".")[0] for field in fields})
+    cache.clean(tags)
+    stats.incr(stats.invalidations, resource)
+
+
+def get_tags_version(tags: Sequence[str]) -> str:
+    """Get current version of given tags.
+
+    Version changes when any of the tags is invalidated, so it can be used
+    to validate values kept in process memory which are not suitable for cache backend.
+
+    :param tags: cache tags, eg. from :func:`document_tag`
+    """
+    return cache.mangler.hashTags(_load_tags(cache, tags))
+
+
+def _load_local_tags(frontend, tags: Iterable[str]) -> Dict[str, str]:
+    """Load tag versions using local tags cache, missing tags are not created."""
+    local_tags = get_local_tags_cache()
+    tag_map = {}
+    missing_tags = []
+    for named_tag in map(frontend.mangler.nameTag, tags):
+        version = local_tags.get(named_tag)
+        if version is None:
+            missing_tags.append(named_tag)
+        else:
+            tag_map[named_tag] = version
+    if missing_tags:
+        loaded_tag_map = frontend.backend.load(missing_tags)
+        for named_tag, version in loaded_tag_map.items():
+            local_tags.set(named_tag, version)
+        tag_map.update(loaded_tag_map)
+    return tag_map
+
+
+def _load_tags(frontend, tags: Iterable[str], ttl: Optional[int] = None) -> Dict[str, str]:
+    """Load tag versions, missing tags are created.
+
+    Missing tags are saved with :data:`TAGS_TTL` so tags of removed documents expire,
+    or with ``ttl`` of the entry if it is longer.
+    """
+    named_tags = tuple(map(frontend.mangler.nameTag, tags))
+    tag_map = frontend.backend.load(named_tags)
+    missing_tags = set(named_tags) - set(tag_map.keys())
+    if missing_tags:
+        missing_tag_map = frontend.mangler.mapTags(missing_tags)
+        frontend.backend.save(mapping=missing_tag_map, ttl=max(TAGS_TTL, ttl or 0))
+        tag_map.update(missing_tag_map)
+    local_tags = get_local_tags_cache()
+    for named_tag, version in tag_map.items():
+        local_tags.set(named_tag, version)
+    return tag_map
+
+
+def cachedfactory(frontend, fn, **kwargs):
+    return SuperdeskCached(frontend, fn, **kwargs)
+
+
 cache_backend = SuperdeskCacheBackend(SuperdeskMangler())
-cache = hermes.Hermes(cache_backend, mangler=cache_backend.mangler, ttl=600)
+cache = hermes.Hermes(cache_backend, mangler=cache_backend.mangler, ttl=600, cachedfactory=cachedfactory)
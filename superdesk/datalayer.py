@@ -36,11 +36,23 @@ class SuperdeskDataLayer(DataLayer):
 
     def init_app(self, app):
         app.data = self  # app.data must be set for locks to work
+        elastic_kwargs = {}
+        if app.config.get("ENABLE_METRICS"):
+            # count backend calls, must be set before clients are created
+            from superdesk.profiling.metrics import ElasticCallCounter, register_mongo_listener
+
+            register_mongo_listener()
+            elastic_kwargs["transport_class"] = ElasticCallCounter
         self.mongo = Mongo(app)
         self.driver = self.mongo.driver
         self.storage = self.driver
         self.elastic = Elastic(
-            app, serializer=SuperdeskJSONEncoder(), skip_index_init=True, retry_on_timeout=True, max_retries=3
+            app,
+            serializer=SuperdeskJSONEncoder(),
+            skip_index_init=True,
+            retry_on_timeout=True,
+            max_retries=3,
+            **elastic_kwargs,
         )
 
     def pymongo(self, resource=None, prefix=None):
@@ -133,6 +133,30 @@ CLIENT_URL = env("SUPERDESK_CLIENT_URL", "http://localhost:9000")
 
 WEBSOCKET_EXCHANGE = "superdesk_notification"
 
+#: Max number of websocket notifications collected before sending these to broker
+#:
+#: Notifications are collected during request or celery task and sent together as a single message,
+#: repeated events for same item are merged. Set to ``1`` to send each notification right away.
+#:
+#: .. versionadded:: 2.9
+#:
+NOTIFICATION_BATCH_SIZE = int(env("NOTIFICATION_BATCH_SIZE", 100))
+
+#: Max number of seconds notifications are collected before sending these to broker
+#:
+#: .. versionadded:: 2.9
+#:
+NOTIFICATION_FLUSH_INTERVAL = float(env("NOTIFICATION_FLUSH_INTERVAL", 1))
+
+#: Max number of notification messages waiting to be sent to broker by a background thread
+#:
+#: Messages over this limit are dropped, so slow broker won't block requests.
+#: Set to ``0`` to send messages synchronously.
+#:
+#: .. versionadded:: 2.9
+#:
+NOTIFICATION_QUEUE_SIZE = int(env("NOTIFICATION_QUEUE_SIZE", 1000))
+
 SERVER_URL = env("SUPERDESK_URL", "http://localhost:5000/api")
 server_url = urlparse(SERVER_URL)
 SERVER_DOMAIN = server_url.netloc or "localhost"
@@ -274,6 +298,44 @@ CACHE_URL = env("SUPERDESK_CACHE_URL", REDIS_URL)
 #: cache type - set explicit cache type if it wouldn't get it right from url
 CACHE_TYPE = env("SUPERDESK_CACHE_TYPE")
 
+#: Max number of cache entries kept in process memory in front of the shared cache
+#:
+#: Only entries with tags are kept, set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+CACHE_LOCAL_SIZE = int(env("SUPERDESK_CACHE_LOCAL_SIZE", 1000))
+
+#: Max time in seconds to keep cache entry in process memory
+#:
+#: .. versionadded:: 2.9
+#:
+CACHE_LOCAL_TTL = int(env("SUPERDESK_CACHE_LOCAL_TTL", 300))
+
+#: Max time in seconds to keep cache tag versions in process memory
+#:
+#: Cache hits don't need to load tag versions from the shared cache,
+#: but entries invalidated by other processes can be used till then, set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+CACHE_LOCAL_TAGS_TTL = int(env("SUPERDESK_CACHE_LOCAL_TAGS_TTL", 5))
+
+#: Backend used for task locks
+#:
+#: One of ``mongo``, ``redis`` or ``memory``. ``memory`` only works
+#: within single process so use it only for tests or development.
+#:
+#: .. versionadded:: 2.9
+#:
+LOCK_BACKEND = env("LOCK_BACKEND", "mongo")
+
+#: Redis url used by ``redis`` lock backend
+#:
+#: .. versionadded:: 2.9
+#:
+LOCK_REDIS_URL = env("LOCK_REDIS_URL", REDIS_URL)
+
 #: celery broker
 BROKER_URL = env("CELERY_BROKER_URL", REDIS_URL)
 CELERY_BROKER_URL = BROKER_URL
@@ -585,6 +647,14 @@ RENDITIONS = {
 
 NINJS_COMMON_RENDITIONS = list(RENDITIONS["picture"].keys())
 
+#: Number of threads used to encode and store picture renditions
+#:
+#: Set to ``0`` to store renditions one by one.
+#:
+#: .. versionadded:: 2.9
+#:
+RENDITIONS_WORKERS = int(env("RENDITIONS_WORKERS", 0))
+
 #: BCRYPT work factor
 BCRYPT_GENSALT_WORK_FACTOR = 12
 
@@ -626,8 +696,26 @@ PASSWORD_EXPIRY_DAYS = int(env("PASSWORD_EXPIRY_DAYS", 0))
 SESSION_EXPIRY_MINUTES = int(env("SESSION_EXPIRY_MINUTES", 240))
 
 #: How often update user session/activity timestamp
+#:
+#: .. versionchanged:: 2.9
+#:    Timestamps of all sessions used in a process are updated together.
+#:
 SESSION_UPDATE_SECONDS = 30
 
+#: Number of seconds to keep session, user and role used for authentication in memory
+#:
+#: These are invalidated when session, user or role is changed, set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+AUTH_CACHE_SECONDS = int(env("AUTH_CACHE_SECONDS", 10))
+
+#: Max number of sessions kept in memory, see ``AUTH_CACHE_SECONDS``
+#:
+#: .. versionadded:: 2.9
+#:
+AUTH_CACHE_SIZE = int(env("AUTH_CACHE_SIZE", 1000))
+
 #: The number of minutes before content items are purged
 CONTENT_EXPIRY_MINUTES = int(env("CONTENT_EXPIRY_MINUTES", 0))
 
@@ -650,6 +738,27 @@ PUBLISHED_CONTENT_EXPIRY_MINUTES = int(env("PUBLISHED_CONTENT_EXPIRY_MINUTES", 0
 #:
 AUDIT_EXPIRY_MINUTES = int(env("AUDIT_EXPIRY_MINUTES", 60 * 24 * 14))
 
+#: Max number of audit records kept in memory before saving them
+#:
+#: Audit records are saved together when app context ends (after a request or a task),
+#: set to ``1`` to save every record immediately.
+#:
+#: .. versionadded:: 2.9
+#:
+AUDIT_BATCH_SIZE = int(env("AUDIT_BATCH_SIZE", 100))
+
+#: Max number of seconds audit records are kept in memory before saving them
+#:
+#: .. versionadded:: 2.9
+#:
+AUDIT_FLUSH_INTERVAL = int(env("AUDIT_FLUSH_INTERVAL", 5))
+
+#: Save audit records using celery task, outside of the request
+#:
+#: .. versionadded:: 2.9
+#:
+AUDIT_ASYNC = strtobool(env("AUDIT_ASYNC", "false"))
+
 #: The number records to be fetched for expiry.
 MAX_EXPIRY_QUERY_LIMIT = int(env("MAX_EXPIRY_QUERY_LIMIT", 100))
 
@@ -686,6 +795,34 @@ WS_PORT = env("WSPORT", "5100")
 # Used by the  Kombu Connection. Only valid for the AMQP protocol
 WS_HEART_BEAT = int(env("WS_HEARTBEAT", "0"))
 
+#: Max number of messages waiting to be sent to a websocket client
+#:
+#: Messages for slow clients over this limit are dropped, so these can't block other clients.
+#:
+#: .. versionadded:: 2.9
+#:
+WS_SEND_QUEUE_SIZE = int(env("WS_SEND_QUEUE_SIZE", 100))
+
+#: Number of seconds to wait for more events of same type for an item before sending these to websocket clients
+#:
+#: Events received during that time are merged into a single message. Set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+WS_COALESCE_INTERVAL = float(env("WS_COALESCE_INTERVAL", 0.5))
+
+#: Websocket events which can be merged, see ``WS_COALESCE_INTERVAL``
+#:
+#: .. versionadded:: 2.9
+#:
+WS_COALESCE_EVENTS = json.loads(env("WS_COALESCE_EVENTS", '["resource:updated"]'))
+
+#: Max number of messages websocket server fetches from broker before these are processed
+#:
+#: .. versionadded:: 2.9
+#:
+WS_BROKER_PREFETCH = int(env("WS_BROKER_PREFETCH", 100))
+
 #: Defines the maximum value of Publish Sequence Number after which the value will start from 1
 MAX_VALUE_OF_PUBLISH_SEQUENCE = int(env("MAX_VALUE_OF_PUBLISH_SEQUENCE", 9999))
 
@@ -740,24 +877,111 @@ TRANSMIT_RETRY_ATTEMPT_DELAY_MINUTES = int(env("TRANSMIT_RETRY_ATTEMPT_DELAY_MIN
 #: max transmit items to be fetched from mongo at once
 MAX_TRANSMIT_QUERY_LIMIT = int(env("MAX_TRANSMIT_QUERY_LIMIT", 500))
 
+#: Number of threads used to transmit items of a subscriber
+#:
+#: When set items are transmitted within the subscriber task instead of using
+#: celery task per item, set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+PUBLISH_TRANSMIT_WORKERS = int(env("PUBLISH_TRANSMIT_WORKERS", 0))
+
+#: Max number of parallel transmissions per destination by delivery type
+#:
+#: Only used for async subscribers, other subscribers transmit items
+#: to each destination in order. Delivery types not listed use ``1``.
+#:
+#: .. versionadded:: 2.9
+#:
+PUBLISH_TRANSMIT_DESTINATION_CONCURRENCY = {
+    "ftp": 2,
+    "http_push": 4,
+}
+
 #: Code profiling for performance analysis
 ENABLE_PROFILING = False
 
+#: Collect request and celery task latency histograms and mongo/elastic call counts
+#:
+#: Metrics are exported in Prometheus text format via ``/api/metrics`` endpoint.
+#:
+#: .. versionadded:: 2.9
+#:
+ENABLE_METRICS = strtobool(env("ENABLE_METRICS", "true"))
+
+#: Number of seconds between saving metrics of a process to redis
+#:
+#: .. versionadded:: 2.9
+#:
+METRICS_SAVE_INTERVAL = int(env("METRICS_SAVE_INTERVAL", 60))
+
+#: Run sampling profiler, stacks are exported via ``/api/metrics/profile`` endpoint
+#:
+#: It has much lower overhead than ``ENABLE_PROFILING`` so it can be used in production.
+#:
+#: .. versionadded:: 2.9
+#:
+ENABLE_SAMPLING_PROFILER = strtobool(env("ENABLE_SAMPLING_PROFILER", "false"))
+
+#: Number of seconds between samples taken by sampling profiler
+#:
+#: .. versionadded:: 2.9
+#:
+SAMPLING_PROFILER_INTERVAL = float(env("SAMPLING_PROFILER_INTERVAL", 0.01))
+
+#: Max number of most common stacks exported by sampling profiler per process
+#:
+#: .. versionadded:: 2.9
+#:
+SAMPLING_PROFILER_EXPORT_STACKS = int(env("SAMPLING_PROFILER_EXPORT_STACKS", 500))
+
 #: default timeout for ftp connections
 FTP_TIMEOUT = 300
 
 #: default timeout when publishing using the `http_push` transmitter
 HTTP_PUSH_TIMEOUT = (5, 30)
 
+#: Seconds to keep idle `ftp` and `http_push` transmitter connections open for reuse
+#:
+#: Set to ``0`` to open new connection for every item.
+#:
+#: .. versionadded:: 2.9
+#:
+PUBLISH_CONNECTION_IDLE_TIMEOUT = int(env("PUBLISH_CONNECTION_IDLE_TIMEOUT", 60))
+
 #: Default timeout when proxying requests through the HTTPProxy endpoint(s)
 #:
 #: ..versionadded: 1.7.0
 #:
 HTTP_PROXY_TIMEOUT = (5, 30)
 
+#: Number of threads used to update ingest providers
+#:
+#: When set providers scheduled for update are updated in parallel within single task
+#: instead of using celery task per provider, set to ``0`` to disable.
+#:
+#: .. versionadded:: 2.9
+#:
+INGEST_UPDATE_WORKERS = int(env("INGEST_UPDATE_WORKERS", 0))
+
+#: Max delay in seconds before next update of failing provider when using ``INGEST_UPDATE_WORKERS``
+#:
+#: .. versionadded:: 2.9
+#:
+INGEST_UPDATE_MAX_BACKOFF = int(env("INGEST_UPDATE_MAX_BACKOFF", 3600))
+
 #: default amount of files which can processed during one iteration of ftp ingest
 FTP_INGEST_FILES_LIST_LIMIT = 100
 
+#: Number of FTP connections used to download files in parallel during ftp ingest
+#:
+#: Files are downloaded ahead while previous files are parsed and ingested,
+#: set to ``0`` to download files one by one.
+#:
+#: .. versionadded:: 2.9
+#:
+FTP_INGEST_WORKERS = int(env("FTP_INGEST_WORKERS", 0))
+
 #: after how many minutes consider content to be too old for ingestion
 #:
 #: .. versionadded:: 1.32.2
@@ -865,6 +1089,12 @@ PUBLISH_ASSOCIATED_ITEMS = False
 #: raise error when published item is not queued to any subscriber
 PUBLISH_NOT_QUEUED_ERROR = True
 
+#: Save all publish queue items for an item using single bulk insert
+#:
+#: .. versionadded:: 2.9
+#:
+PUBLISH_QUEUE_BULK_INSERT = strtobool(env("PUBLISH_QUEUE_BULK_INSERT", "true"))
+
 # Use content profile for validation when auto-publishing
 AUTO_PUBLISH_CONTENT_PROFILE = True
 
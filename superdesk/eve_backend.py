@@ -24,7 +24,7 @@ from eve.methods.common import resolve_document_etag
 from elasticsearch.exceptions import RequestError, NotFoundError
 from superdesk.errors import SuperdeskApiError
 from superdesk.notification import push_notification as _push_notification
-from superdesk.cache import cache
+from superdesk.cache import invalidate_cache
 from superdesk.utils import get_list_chunks
 
 
@@ -166,7 +166,7 @@ class EveBackend:
             kwargs["query"] = backend._mongotize(kwargs["query"], endpoint_name)
 
         result = backend.driver.db[endpoint_name].find_and_modify(**kwargs)
-        cache.clean([endpoint_name])
+        invalidate_cache(endpoint_name, ids=[result[config.ID_FIELD]] if result else None)
         return result
 
     def create(self, endpoint_name, docs, **kwargs):
@@ -179,7 +179,7 @@ class EveBackend:
             doc.pop("_type", None)
         ids = self.create_in_mongo(endpoint_name, docs, **kwargs)
         self.create_in_search(endpoint_name, docs, **kwargs)
-        cache.clean([endpoint_name])
+        invalidate_cache(endpoint_name, ids=ids)
 
         for doc in docs:
             self._push_resource_notification("created", endpoint_name, _id=str(doc["_id"]))
@@ -297,9 +297,20 @@ class EveBackend:
                 logger.warning("Item is missing in elastic resource=%s id=%s", endpoint_name, id)
                 search_backend.insert(endpoint_name, [doc])
 
-        cache.clean([endpoint_name])
+        invalidate_cache(endpoint_name, ids=[id], fields=self._get_updated_fields(updates, change_request))
         return updates
 
+    def _get_updated_fields(self, updates, change_request=False):
+        if not change_request:
+            return list(updates.keys())
+        fields = []
+        for key, value in updates.items():
+            if key.startswith("$") and isinstance(value, dict):
+                fields.extend(value.keys())
+            else:
+                fields.append(key)
+        return fields
+
     def replace(self, endpoint_name, id, document, original):
         """Replace an item.
 
@@ -310,7 +321,7 @@ class EveBackend:
         """
         res = self.replace_in_mongo(endpoint_name, id, document, original)
         self.replace_in_search(endpoint_name, id, document, original)
-        cache.clean([endpoint_name])
+        invalidate_cache(endpoint_name, ids=[id], fields=set(document.keys()) | set(original.keys()))
         return res
 
     def update_in_mongo(self, endpoint_name, id, updates, original):
@@ -378,7 +389,7 @@ class EveBackend:
                 removed_ids = [lookup["_id"]]
             except NotFoundError:
                 pass  # not found in elastic and not in mongo
-        cache.clean([endpoint_name])
+        invalidate_cache(endpoint_name, ids=removed_ids)
         return removed_ids
 
     def delete_docs(self, endpoint_name, docs):
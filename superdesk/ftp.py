@@ -7,11 +7,10 @@ from flask import current_app as app
 from superdesk.errors import IngestFtpError
 
 
-@contextmanager
-def ftp_connect(config):
+def get_ftp_connection(config):
     """Get ftp connection for given config.
 
-    use with `with`
+    It's up to the caller to close the connection, use :func:`ftp_connect` when possible.
 
     :param config: dict with `host`, `username`, `password`, `path`, `passive` and `use_ftp`
     """
@@ -46,5 +45,17 @@ def ftp_connect(config):
         ftp.cwd(config.get("path", "").lstrip("/"))
     if config.get("passive") is False:  # only set this when not active, it's passive by default
         ftp.set_pasv(False)
+    return ftp
+
+
+@contextmanager
+def ftp_connect(config):
+    """Get ftp connection for given config.
+
+    use with `with`
+
+    :param config: dict with `host`, `username`, `password`, `path`, `passive` and `use_ftp`
+    """
+    ftp = get_ftp_connection(config)
     yield ftp
     ftp.close()
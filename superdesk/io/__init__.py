@@ -26,7 +26,7 @@ from superdesk.io.registry import get_feeding_service  # noqa
 
 from superdesk.io.commands.add_provider import AddProvider  # noqa
 from superdesk.io import importers  # noqa
-from superdesk.io.commands.update_ingest import UpdateIngest, update_provider  # noqa
+from superdesk.io.commands.update_ingest import UpdateIngest, update_provider, update_providers  # noqa
 from superdesk.io.commands.remove_expired_content import RemoveExpiredContent
 from superdesk.io.ingest_provider_model import IngestProviderResource, IngestProviderService
 
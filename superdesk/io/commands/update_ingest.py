@@ -11,7 +11,10 @@
 
 import bson
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, timezone, datetime
+from typing import Dict, List, Set, Tuple
 import pytz
 from flask import current_app as app
 from werkzeug.exceptions import HTTPException
@@ -39,6 +42,7 @@ from superdesk.metadata.item import (
 from superdesk.metadata.utils import generate_guid
 from superdesk.notification import push_notification
 from superdesk.utc import utcnow, get_expiry_date
+from superdesk.vocabularies import get_vocabulary_lookup
 from superdesk.workflow import set_default_state
 from superdesk.errors import IngestFileError
 from copy import deepcopy
@@ -253,12 +257,20 @@ class UpdateIngest(superdesk.Command):
 
     def run(self, provider_name=None, sync=False):
         lookup = {} if not provider_name else {"name": provider_name}
+        threaded = not sync and app.config.get("INGEST_UPDATE_WORKERS")
+        provider_ids = []
+        ttl = UPDATE_TTL
         for provider in superdesk.get_resource_service("ingest_providers").get(req=None, lookup=lookup):
             if (
                 not is_closed(provider)
                 and is_service_and_parser_registered(provider)
                 and (is_scheduled(provider) or sync)
             ):
+                if threaded:
+                    provider_ids.append(provider[superdesk.config.ID_FIELD])
+                    ttl = min(ttl, get_task_ttl(provider))
+                    continue
+
                 kwargs = {
                     "provider": provider,
                     "rule_set": get_provider_rule_set(provider),
@@ -271,6 +283,78 @@ class UpdateIngest(superdesk.Command):
                 else:
                     update_provider.apply_async(expires=get_task_ttl(provider), kwargs=kwargs, serializer="eve/json")
 
+        if provider_ids:
+            update_providers.apply_async(expires=ttl, kwargs={"provider_ids": provider_ids}, serializer="eve/json")
+
+
+class ProviderBackoff:
+    """Track failing providers to delay their next update.
+
+    Delay starts at provider update schedule and doubles on every following failure,
+    up to ``INGEST_UPDATE_MAX_BACKOFF`` seconds. State is kept per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = {}  # type: Dict[str, Tuple[int, datetime]]
+
+    def is_waiting(self, provider) -> bool:
+        with self._lock:
+            failure = self._failures.get(str(provider[superdesk.config.ID_FIELD]))
+        return failure is not None and failure[1] > utcnow()
+
+    def failed(self, provider):
+        key = str(provider[superdesk.config.ID_FIELD])
+        with self._lock:
+            count = self._failures.get(key, (0, None))[0] + 1
+            delay = min(get_task_ttl(provider) * 2 ** (count - 1), app.config.get("INGEST_UPDATE_MAX_BACKOFF", 3600))
+            self._failures[key] = (count, utcnow() + timedelta(seconds=delay))
+        return delay
+
+    def succeeded(self, provider):
+        with self._lock:
+            self._failures.pop(str(provider[superdesk.config.ID_FIELD]), None)
+
+
+backoff = ProviderBackoff()
+
+
+@celery.task(soft_time_limit=UPDATE_TTL)
+def update_providers(provider_ids):
+    """Update multiple ingest providers using a thread pool.
+
+    Used instead of :func:`update_provider` task per provider when ``INGEST_UPDATE_WORKERS`` is set,
+    so idle providers are polled in parallel within single task. Each provider update still
+    uses its own lock, so it won't run in parallel with another update of same provider.
+
+    :param provider_ids: ids of providers scheduled for update
+    """
+    providers = [
+        provider
+        for provider in superdesk.get_resource_service("ingest_providers").get_from_mongo(
+            req=None, lookup={superdesk.config.ID_FIELD: {"$in": provider_ids}}
+        )
+        if not is_closed(provider) and is_scheduled(provider) and not backoff.is_waiting(provider)
+    ]
+    if not providers:
+        return
+    flask_app = app._get_current_object()
+    workers = min(app.config["INGEST_UPDATE_WORKERS"], len(providers))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for provider in providers:
+            executor.submit(_update_provider_in_thread, flask_app, provider)
+
+
+def _update_provider_in_thread(flask_app, provider):
+    with flask_app.app_context():
+        try:
+            update_provider(provider, get_provider_rule_set(provider), get_provider_routing_scheme(provider))
+        except Exception:
+            delay = backoff.failed(provider)
+            logger.exception("Failed to update provider %s, next try in %d seconds", provider.get("name"), delay)
+        else:
+            backoff.succeeded(provider)
+
 
 def update_last_item_updated(update, items):
     if items:
@@ -353,24 +437,20 @@ def update_provider(provider, rule_set=None, routing_scheme=None, sync=False):
 
 def process_anpa_category(item, provider):
     try:
-        anpa_categories = superdesk.get_resource_service("vocabularies").find_one(req=None, _id="categories")
+        anpa_categories = get_vocabulary_lookup("categories")
         if anpa_categories:
             for item_category in item["anpa_category"]:
-                mapped_category = [
-                    c
-                    for c in anpa_categories["items"]
-                    if c["is_active"] is True and item_category["qcode"].lower() == c["qcode"].lower()
-                ]
+                mapped_category = anpa_categories.get(item_category["qcode"], ignore_case=True)
                 # if the category is not known to the system remove it from the item
-                if len(mapped_category) == 0:
+                if mapped_category is None:
                     item["anpa_category"].remove(item_category)
                 else:
-                    item_category["name"] = mapped_category[0]["name"]
+                    item_category["name"] = mapped_category["name"]
                     # make the case of the qcode match what we hold in our dictionary
-                    item_category["qcode"] = mapped_category[0]["qcode"]
+                    item_category["qcode"] = mapped_category["qcode"]
                     item_category["scheme"] = "categories"
-                    if mapped_category[0].get("translations"):
-                        item_category["translations"] = mapped_category[0]["translations"]
+                    if mapped_category.get("translations"):
+                        item_category["translations"] = deepcopy(mapped_category["translations"])
                         if item.get("language"):
                             set_subject_name_translation(item_category, item["language"])
 
@@ -386,13 +466,12 @@ def derive_category(item, provider):
     """
     try:
         categories = []
-        subject_map = superdesk.get_resource_service("vocabularies").find_one(req=None, _id="iptc_category_map")
+        subject_map = get_vocabulary_lookup("iptc_category_map")
         if subject_map:
-            for entry in (map_entry for map_entry in subject_map["items"] if map_entry["is_active"]):
-                for subject in item.get("subject", []):
-                    if subject["qcode"] == entry["qcode"]:
-                        if not any(c["qcode"] == entry["category"] for c in categories):
-                            categories.append({"qcode": entry["category"]})
+            subjects = [subject["qcode"] for subject in item.get("subject", [])]
+            for entry in subject_map.find(subjects):
+                if not any(c["qcode"] == entry["category"] for c in categories):
+                    categories.append({"qcode": entry["category"]})
             if len(categories):
                 item["anpa_category"] = categories
                 process_anpa_category(item, provider)
@@ -445,13 +524,10 @@ def derive_subject(item):
     :return:
     """
     try:
-        category_map = superdesk.get_resource_service("vocabularies").find_one(req=None, _id="categories")
+        category_map = get_vocabulary_lookup("categories")
         if category_map:
             for cat in item["anpa_category"]:
-                map_entry = next(
-                    (code for code in category_map["items"] if code["qcode"] == cat["qcode"] and code["is_active"]),
-                    None,
-                )
+                map_entry = category_map.get(cat["qcode"])
                 if map_entry and "subject" in map_entry:
                     item["subject"] = [
                         {"qcode": map_entry.get("subject"), "name": subject_codes[map_entry.get("subject")]}
@@ -506,12 +582,167 @@ def ingest_cancel(item, feeding_service):
         ingest_service.patch(relative["_id"], update)
 
 
+def get_profile_id(profile):
+    try:
+        return bson.ObjectId(profile)
+    except bson.errors.InvalidId:
+        return profile
+
+
+class IngestBatch:
+    """State shared by items ingested together.
+
+    Items already in ingest and content profiles are fetched for all items at once,
+    new items are collected and saved using single insert on :meth:`flush`.
+    Items referencing associations which fail to be saved are not saved either.
+
+    :param feeding_service: feeding service
+    :param items: items to be ingested, including associations
+    """
+
+    def __init__(self, feeding_service, items):
+        self.feeding_service = feeding_service
+        self.existing = {}  # type: Dict[str, Dict[str, Dict]]
+        self.fetched = {}  # type: Dict[str, Set[str]]
+        self.pending = {}  # type: Dict[str, List[Dict]]
+        self.failed_guids = set()  # type: Set[str]
+        self.failed_ids = set()  # type: Set[str]
+        self.dependencies = {}  # type: Dict[str, List[str]]
+
+        guids = {}  # type: Dict[str, Set[str]]
+        profiles = set()
+        for item in items:
+            docs = [item] + [assoc for assoc in (item.get("associations") or {}).values() if assoc]
+            for doc in docs:
+                if doc.get(GUID_FIELD):
+                    guids.setdefault(get_ingest_collection(feeding_service, doc), set()).add(doc[GUID_FIELD])
+                if doc.get("profile"):
+                    profiles.add(get_profile_id(doc["profile"]))
+
+        for ingest_collection, collection_guids in guids.items():
+            self.existing[ingest_collection] = {
+                doc[GUID_FIELD]: doc
+                for doc in superdesk.get_resource_service(ingest_collection).get_from_mongo(
+                    req=None, lookup={GUID_FIELD: {"$in": list(collection_guids)}}
+                )
+            }
+            self.fetched[ingest_collection] = collection_guids
+
+        self.profiles = (
+            {
+                profile[superdesk.config.ID_FIELD]
+                for profile in superdesk.get_resource_service("content_types").get_from_mongo(
+                    req=None, lookup={superdesk.config.ID_FIELD: {"$in": list(profiles)}}, projection={"_id": 1}
+                )
+            }
+            if profiles
+            else set()
+        )
+
+    def find_one(self, ingest_collection, guid, saved=True):
+        """Get item from ingest by guid.
+
+        :param saved: save pending items first if it's one of those
+        """
+        if saved and any(doc[GUID_FIELD] == guid for doc in self.pending.get(ingest_collection, [])):
+            self.flush()
+        existing = self.existing.setdefault(ingest_collection, {})
+        fetched = self.fetched.setdefault(ingest_collection, set())
+        if guid not in existing and guid not in fetched:
+            # not fetched in advance, eg. item from other ingest collection
+            doc = superdesk.get_resource_service(ingest_collection).find_one(req=None, guid=guid)
+            if doc:
+                existing[guid] = doc
+            fetched.add(guid)
+        return existing.get(guid)
+
+    def profile_exists(self, profile):
+        return profile in self.profiles
+
+    def add(self, ingest_collection, item, depends_on=None):
+        """Add new item to be saved on next flush.
+
+        :param depends_on: guids of pending items referenced by item, it's not saved if any of these fails
+        """
+        self.pending.setdefault(ingest_collection, []).append(item)
+        self.existing.setdefault(ingest_collection, {})[item[GUID_FIELD]] = item
+        if depends_on:
+            self.dependencies[item[superdesk.config.ID_FIELD]] = list(depends_on)
+
+    def is_pending(self, ingest_collection, guid) -> bool:
+        return any(doc[GUID_FIELD] == guid for doc in self.pending.get(ingest_collection, []))
+
+    def update(self, ingest_collection, item):
+        """Set current version of updated item."""
+        self.existing.setdefault(ingest_collection, {})[item[GUID_FIELD]] = item
+
+    def flush(self):
+        """Save all pending items.
+
+        If saving fails it checks which items were not saved and tries
+        to save these one by one, those failing again are marked as failed.
+
+        Items with associations are saved after all other items, so these are
+        marked as failed if any of their associations failed.
+        """
+        pending, self.pending = self.pending, {}
+        for ingest_collection, docs in pending.items():
+            self._save(ingest_collection, [doc for doc in docs if not self._get_dependencies(doc)])
+        for ingest_collection, docs in pending.items():
+            self._save(ingest_collection, [doc for doc in docs if self._get_dependencies(doc)])
+
+    def _save(self, ingest_collection, docs):
+        docs = [doc for doc in docs if not self._has_failed_dependency(ingest_collection, doc)]
+        if not docs:
+            return
+        service = superdesk.get_resource_service(ingest_collection)
+        try:
+            service.post_in_mongo(docs)
+            return
+        except Exception:
+            logger.exception("Failed to save %d items in %s collection at once", len(docs), ingest_collection)
+        ids = [doc[superdesk.config.ID_FIELD] for doc in docs]
+        saved = {
+            doc[superdesk.config.ID_FIELD]
+            for doc in service.get_from_mongo(
+                req=None, lookup={superdesk.config.ID_FIELD: {"$in": ids}}, projection={"_id": 1}
+            )
+        }
+        for doc in docs:
+            if doc[superdesk.config.ID_FIELD] in saved:
+                continue
+            if self._has_failed_dependency(ingest_collection, doc):
+                continue
+            try:
+                service.post_in_mongo([doc])
+            except Exception as e:
+                logger.error("Exception while persisting item in %s collection: %s", ingest_collection, e)
+                self._set_failed(ingest_collection, doc)
+
+    def _get_dependencies(self, doc) -> List[str]:
+        return self.dependencies.get(doc[superdesk.config.ID_FIELD], [])
+
+    def _has_failed_dependency(self, ingest_collection, doc) -> bool:
+        failed = [guid for guid in self._get_dependencies(doc) if guid in self.failed_guids]
+        if failed:
+            logger.error("Item %s not saved, associated items %s failed", doc[GUID_FIELD], ", ".join(failed))
+            self._set_failed(ingest_collection, doc)
+            return True
+        return False
+
+    def _set_failed(self, ingest_collection, doc):
+        self.failed_guids.add(doc[GUID_FIELD])
+        self.failed_ids.add(doc[superdesk.config.ID_FIELD])
+        self.existing[ingest_collection].pop(doc[GUID_FIELD], None)
+
+
 def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme=None):
     all_items = filter_expired_items(provider, items)
     items_dict = {doc[GUID_FIELD]: doc for doc in all_items}
     items_in_package = []
     failed_items = set()
     created_ids = []
+    batch = IngestBatch(feeding_service, all_items)
     for item in [doc for doc in all_items if doc.get(ITEM_TYPE) == CONTENT_TYPE.COMPOSITE]:
         items_in_package = [
             ref["residRef"] for group in item.get("groups", []) for ref in group.get("refs", []) if "residRef" in ref
@@ -524,11 +755,15 @@ def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme
             feeding_service,
             rule_set,
             routing_scheme=routing_scheme if not item[GUID_FIELD] in items_in_package else None,
+            batch=batch,
         )
         if ingested:
             created_ids = created_ids + ids
         else:
             failed_items.add(item[GUID_FIELD])
+    # save items before packages, so failed items are known
+    batch.flush()
+    failed_items.update(batch.failed_guids)
     for item in [doc for doc in all_items if doc.get(ITEM_TYPE) == CONTENT_TYPE.COMPOSITE]:
         for ref in [ref for group in item.get("groups", []) for ref in group.get("refs", []) if "residRef" in ref]:
             if ref["residRef"] in failed_items:
@@ -544,11 +779,14 @@ def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme
                 ref["residRef"] = items_dict.get(ref["residRef"], {}).get(superdesk.config.ID_FIELD)
         if item[GUID_FIELD] in failed_items:
             continue
-        ingested, ids = ingest_item(item, provider, feeding_service, rule_set, routing_scheme)
+        ingested, ids = ingest_item(item, provider, feeding_service, rule_set, routing_scheme, batch=batch)
         if ingested:
             created_ids = created_ids + ids
         else:
             failed_items.add(item[GUID_FIELD])
+    batch.flush()
+    failed_items.update(batch.failed_guids)
+    created_ids = [_id for _id in created_ids if _id not in batch.failed_ids]
     # sync mongo with ingest after all changes
     if len(all_items) > 0:
         ingest_collection = get_ingest_collection(feeding_service, all_items[0])
@@ -562,7 +800,12 @@ def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme
     return failed_items
 
 
-def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=None, expiry=None):
+def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=None, expiry=None, batch=None):
+    """Ingest single item.
+
+    :param batch: :class:`IngestBatch` when ingesting multiple items, new items are not saved
+        until it's flushed
+    """
     items_ids = []
     try:
         ingest_collection = get_ingest_collection(feeding_service, item)
@@ -579,7 +822,10 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
             _ingest_cancel = ingest_cancel
 
         # determine if we already have this item
-        old_item = ingest_service.find_one(guid=item[GUID_FIELD], req=None)
+        if batch is not None:
+            old_item = batch.find_one(ingest_collection, item[GUID_FIELD])
+        else:
+            old_item = ingest_service.find_one(guid=item[GUID_FIELD], req=None)
 
         if not old_item:
             item.setdefault(superdesk.config.ID_FIELD, generate_guid(type=GUID_NEWSML))
@@ -600,11 +846,11 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
         item.setdefault("uri", item[GUID_FIELD])  # keep it as original guid
 
         if item.get("profile"):
-            try:
-                item["profile"] = bson.ObjectId(item["profile"])
-            except bson.errors.InvalidId:
-                pass
-            profile = superdesk.get_resource_service("content_types").find_one(req=None, _id=item["profile"])
+            item["profile"] = get_profile_id(item["profile"])
+            if batch is not None:
+                profile = batch.profile_exists(item["profile"])
+            else:
+                profile = superdesk.get_resource_service("content_types").find_one(req=None, _id=item["profile"])
             if not profile:  # unknown profile
                 item.pop("profile")
 
@@ -627,6 +873,8 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
 
         if item.get("pubstatus", "") in [PUB_STATUS.CANCELED, "cancelled"]:  # Planning module uses "cancelled" value
             item[ITEM_STATE] = CONTENT_STATE.KILLED
+            if batch is not None:
+                batch.flush()
             _ingest_cancel(item, feeding_service)
 
         rend = item.get("renditions", {})
@@ -636,6 +884,9 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
                 href = feeding_service.prepare_href(baseImageRend["href"], rend.get("mimetype"))
                 update_renditions(item, href, old_item, feeding_service=feeding_service)
 
+        # new associations not saved yet
+        pending_associations = []
+
         # if the item has associated media
         for key, assoc in item.get("associations", {}).items():
             set_default_state(assoc, CONTENT_STATE.INGESTED)
@@ -643,7 +894,10 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
             guid = assoc.get("guid")
             assoc_name = assoc.get("headline") or assoc.get("slugline") or guid
             if guid:
-                ingested = ingest_service.find_one(req=None, guid=guid)
+                if batch is not None:
+                    ingested = batch.find_one(get_ingest_collection(feeding_service, assoc), guid)
+                else:
+                    ingested = ingest_service.find_one(req=None, guid=guid)
                 if ingested is not None:
                     logger.info("assoc ingested before %s", assoc_name)
                     assoc["_id"] = ingested["_id"]
@@ -677,11 +931,19 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
                                     name=assoc_name,
                                 ),
                             )
-                    status, ids = ingest_item(assoc, provider, feeding_service, rule_set, expiry=item["expiry"])
+                    status, ids = ingest_item(
+                        assoc, provider, feeding_service, rule_set, expiry=item["expiry"], batch=batch
+                    )
                     if status:
                         assoc["_id"] = ids[0]
                         items_ids.extend(ids)
-                        ingested = ingest_service.find_one(req=None, _id=ids[0])
+                        if batch is not None:
+                            assoc_collection = get_ingest_collection(feeding_service, assoc)
+                            if batch.is_pending(assoc_collection, guid):
+                                pending_associations.append(guid)
+                            ingested = batch.find_one(assoc_collection, guid, saved=False)
+                        else:
+                            ingested = ingest_service.find_one(req=None, _id=ids[0])
                         update_assoc_renditions(assoc, ingested)
             elif assoc.get("residRef"):
                 item["associations"][key] = resolve_ref(assoc)
@@ -691,22 +953,40 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
             new_version = _is_new_version(item, old_item)
             updates = deepcopy(item)
             if new_version:
+                if pending_associations:
+                    # existing item is updated right away, so associations must be saved first
+                    batch.flush()
+                    failed = [guid for guid in pending_associations if guid in batch.failed_guids]
+                    if failed:
+                        logger.error("Item %s not updated, associated items %s failed", item[GUID_FIELD], failed)
+                        return False, []
                 ingest_service.patch_in_mongo(old_item[superdesk.config.ID_FIELD], updates, old_item)
                 item.update(old_item)
                 item.update(updates)
                 items_ids.append(item["_id"])
+                if batch is not None:
+                    batch.update(ingest_collection, item)
             else:
                 item.update(old_item)
         else:
             if item.get("ingest_provider_sequence") is None:
                 ingest_service.set_ingest_provider_sequence(item, provider)
-            try:
-                items_ids.extend(ingest_service.post_in_mongo([item]))
-            except HTTPException as e:
-                logger.error("Exception while persisting item in %s collection: %s", ingest_collection, e)
-                raise e
+            if batch is not None:
+                batch.add(ingest_collection, item, depends_on=pending_associations)
+                items_ids.append(item[superdesk.config.ID_FIELD])
+            else:
+                try:
+                    items_ids.extend(ingest_service.post_in_mongo([item]))
+                except HTTPException as e:
+                    logger.error("Exception while persisting item in %s collection: %s", ingest_collection, e)
+                    raise e
 
         if routing_scheme and new_version:
+            if batch is not None:
+                # routing needs the item saved
+                batch.flush()
+                if item[GUID_FIELD] in batch.failed_guids:
+                    return False, []
             routed = ingest_service.find_one(_id=item[superdesk.config.ID_FIELD], req=None)
             superdesk.get_resource_service("routing_schemes").apply_routing_scheme(routed, provider, routing_scheme)
 
@@ -13,9 +13,14 @@ import os
 import ftplib
 import logging
 import tempfile
+import threading
 import lxml.etree as etree
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from typing import Deque, List
 from urllib.parse import urlparse
 
 from flask import current_app as app
@@ -24,7 +29,7 @@ from superdesk.io.feed_parsers import XMLFeedParser
 from superdesk.utc import utc, utcnow
 from superdesk.io.feeding_services import FeedingService
 from superdesk.errors import IngestFtpError
-from superdesk.ftp import ftp_connect
+from superdesk.ftp import ftp_connect, get_ftp_connection
 
 
 logger = logging.getLogger(__name__)
@@ -38,6 +43,50 @@ class EmptyFile(Exception):
     """Raised when a file is empty thus ignored"""
 
 
+class DownloadConnections:
+    """FTP connections used for downloading files, one per thread.
+
+    :param config: provider config
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # type: List[ftplib.FTP]
+
+    def get(self) -> ftplib.FTP:
+        ftp = getattr(self._local, "ftp", None)
+        if ftp is None:
+            ftp = get_ftp_connection(self.config)
+            ftp.encoding = "UTF-8"
+            self._local.ftp = ftp
+            with self._lock:
+                self._connections.append(ftp)
+        return ftp
+
+    def discard(self, ftp: ftplib.FTP):
+        """Close broken connection so next :meth:`get` in this thread opens a new one."""
+        if getattr(self._local, "ftp", None) is ftp:
+            self._local.ftp = None
+        with self._lock:
+            if ftp in self._connections:
+                self._connections.remove(ftp)
+        try:
+            ftp.close()
+        except ftplib.all_errors:
+            pass
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for ftp in connections:
+            try:
+                ftp.close()
+            except ftplib.all_errors:
+                pass
+
+
 class FTPFeedingService(FeedingService):
     """
     Feeding Service class which can read article(s) which exist in a file system and accessible using FTP.
@@ -245,29 +294,98 @@ class FTPFeedingService(FeedingService):
         self._log_msg("Sort {} files. Exec time: {:.4f} secs.".format(len(files), self._timer.stop("sort_files")))
         return files
 
-    def _retrieve_and_parse(self, ftp, config, filename, provider, registered_parser):
-        self._timer.start("retrieve_parse")
-
+    def _get_local_file_path(self, config, filename):
         if "dest_path" not in config:
             config["dest_path"] = tempfile.mkdtemp(prefix="superdesk_ingest_")
-        local_file_path = os.path.join(config["dest_path"], filename)
+        return os.path.join(config["dest_path"], filename)
 
-        with open(local_file_path, "wb") as f:
-            try:
+    def _retrieve(self, ftp, filename, local_file_path):
+        try:
+            with open(local_file_path, "wb") as f:
                 ftp.retrbinary("RETR %s" % filename, f.write)
-                self._log_msg(
-                    "Download finished. Exec time: {:.4f} secs. Size: {} bytes. File: {}.".format(
-                        self._timer.split("retrieve_parse"), os.path.getsize(local_file_path), filename
-                    )
+        except ftplib.all_errors:
+            os.remove(local_file_path)
+            raise
+
+    @contextmanager
+    def _downloads(self, config, files_to_process, workers):
+        """Download files in parallel using multiple FTP connections.
+
+        Yields iterator of download futures in the same order as files,
+        downloads run ahead of processing by up to ``2 * workers`` files.
+
+        :param config: provider config
+        :param files_to_process: list of ``(filename, file_modify)`` tuples
+        :param workers: number of connections
+        """
+        flask_app = app._get_current_object()
+        connections = DownloadConnections(config)
+        stop = threading.Event()
+
+        def download(filename, local_file_path):
+            if stop.is_set():
+                raise ftplib.Error("Download cancelled")
+            with flask_app.app_context():
+                ftp = connections.get()
+                try:
+                    self._retrieve(ftp, filename, local_file_path)
+                except ftplib.all_errors:
+                    # connection might be dead, retry once using a new one
+                    connections.discard(ftp)
+                    if stop.is_set():
+                        raise
+                    logger.warning("FTP download of %s failed, retrying with new connection", filename)
+                    ftp = connections.get()
+                    try:
+                        self._retrieve(ftp, filename, local_file_path)
+                    except ftplib.all_errors:
+                        connections.discard(ftp)
+                        raise
+
+        def futures():
+            pending = deque()  # type: Deque[Future]
+            for filename, _file_modify in files_to_process:
+                local_file_path = self._get_local_file_path(config, filename)
+                pending.append(executor.submit(download, filename, local_file_path))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft()
+            while pending:
+                yield pending.popleft()
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            yield futures()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+            connections.close()
+
+    def _retrieve_and_parse(self, ftp, config, filename, provider, registered_parser, download=None):
+        """Retrieve and parse file.
+
+        :param download: future of file download done by :meth:`_downloads`,
+            if not set file is retrieved using ``ftp`` connection
+        """
+        self._timer.start("retrieve_parse")
+        local_file_path = self._get_local_file_path(config, filename)
+
+        try:
+            if download is not None:
+                download.result()
+            else:
+                self._retrieve(ftp, filename, local_file_path)
+            self._log_msg(
+                "Download finished. Exec time: {:.4f} secs. Size: {} bytes. File: {}.".format(
+                    self._timer.split("retrieve_parse"), os.path.getsize(local_file_path), filename
                 )
-            except ftplib.all_errors:
-                self._log_msg(
-                    "Download failed. Exec time: {:.4f} secs. File: {}.".format(
-                        self._timer.stop("retrieve_parse"), filename
-                    )
+            )
+        except ftplib.all_errors:
+            self._log_msg(
+                "Download failed. Exec time: {:.4f} secs. File: {}.".format(
+                    self._timer.stop("retrieve_parse"), filename
                 )
-                os.remove(local_file_path)
-                raise Exception("Exception retrieving file from FTP server ({filename})".format(filename=filename))
+            )
+            raise Exception("Exception retrieving file from FTP server ({filename})".format(filename=filename))
 
         if self._is_empty(local_file_path):
             logger.info("ignoring empty file {filename}".format(filename=filename))
@@ -350,22 +468,33 @@ class FTPFeedingService(FeedingService):
 
                 # process files
                 self._timer.start("start_processing")
-                for filename, file_modify in files_to_process:
-                    try:
-                        update["private"] = {"last_processed_file_modify": file_modify}
-                        failed = yield self._retrieve_and_parse(ftp, config, filename, provider, registered_parser)
-
-                        if do_move:
-                            move_dest_file_path = os.path.join(move_path if not failed else move_path_error, filename)
-                            self._move(ftp, filename, move_dest_file_path, file_modify, failed=failed)
-                    except EmptyFile:
-                        continue
-                    except Exception as e:
-                        logger.error("Error while parsing {filename}: {msg}".format(filename=filename, msg=e))
-
-                        if do_move:
-                            move_dest_file_path_error = os.path.join(move_path_error, filename)
-                            self._move(ftp, filename, move_dest_file_path_error, file_modify, failed=True)
+                workers = app.config.get("FTP_INGEST_WORKERS", 0)
+                if workers and len(files_to_process) > 1:
+                    downloads = self._downloads(config, files_to_process, workers)
+                else:
+                    downloads = nullcontext()
+                with downloads as futures:
+                    for filename, file_modify in files_to_process:
+                        download = next(futures) if futures is not None else None
+                        try:
+                            update["private"] = {"last_processed_file_modify": file_modify}
+                            failed = yield self._retrieve_and_parse(
+                                ftp, config, filename, provider, registered_parser, download=download
+                            )
+
+                            if do_move:
+                                move_dest_file_path = os.path.join(
+                                    move_path if not failed else move_path_error, filename
+                                )
+                                self._move(ftp, filename, move_dest_file_path, file_modify, failed=failed)
+                        except EmptyFile:
+                            continue
+                        except Exception as e:
+                            logger.error("Error while parsing {filename}: {msg}".format(filename=filename, msg=e))
+
+                            if do_move:
+                                move_dest_file_path_error = os.path.join(move_path_error, filename)
+                                self._move(ftp, filename, move_dest_file_path_error, file_modify, failed=True)
 
                 self._log_msg(
                     "Processing finished. Exec time: {:.4f} secs.".format(self._timer.stop("start_processing"))
@@ -10,6 +10,7 @@
 
 from typing import List, Dict, Optional, Tuple, Any
 from io import BytesIO
+from copy import deepcopy
 import traceback
 import requests
 from superdesk.errors import IngestApiError, SuperdeskIngestError
@@ -56,6 +57,9 @@ class HTTPFeedingServiceBase(FeedingService):
     ``get_url`` method do a HTTP Get request. url can be ommited in which case HTTP_URL will be used.
     Authentication parameters are set automatically, and errors are catched appropriately.
     Extra arguments are used directly in *requests* call.
+    With ``conditional=True`` the ``ETag`` and ``Last-Modified`` headers of response are stored
+    in provider ``private`` data and sent on next request to same url, use ``is_not_modified``
+    to check if response has no content because it was not modified since.
 
     """
 
@@ -114,6 +118,7 @@ class HTTPFeedingServiceBase(FeedingService):
         super().__init__()
         self.token = None
         self.session = requests.Session()
+        self._provider_update = None
 
     @property
     def auth_info(self):
@@ -151,15 +156,19 @@ class HTTPFeedingServiceBase(FeedingService):
     def get_request_kwargs(self) -> Dict[str, Any]:
         return {}
 
-    def get_url(self, url=None, **kwargs):
+    def get_url(self, url=None, conditional=False, **kwargs):
         """Do an HTTP Get on URL
 
         :param string url: url to use (None to use self.HTTP_URL)
+        :param bool conditional: send validators of previous response and store new ones
         :param **kwargs: extra parameter for requests
         :return requests.Response: response
         """
         if not url:
             url = self.HTTP_URL
+        if conditional:
+            headers = kwargs.get("headers") or {}
+            kwargs["headers"] = dict(headers, **self._get_conditional_headers(url))
         config = self.config
         user = config.get("username")
         password = config.get("password")
@@ -216,8 +225,36 @@ class HTTPFeedingServiceBase(FeedingService):
             else:
                 raise IngestApiError.apiGeneralError(exc, self.provider)
 
+        if conditional and not self.is_not_modified(response):
+            self._set_validators(url, response)
+
         return response
 
+    def is_not_modified(self, response) -> bool:
+        """Test if response to conditional request is ``304 Not Modified``."""
+        return response.status_code == requests.codes.not_modified
+
+    def _get_conditional_headers(self, url) -> Dict[str, str]:
+        validators = (self.provider.get("private") or {}).get("http_validators", {}).get(url) or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _set_validators(self, url, response):
+        if self._provider_update is None:
+            return
+        private = self._provider_update.setdefault("private", deepcopy(self.provider.get("private") or {}))
+        validators = private.setdefault("http_validators", {})
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            validators[url] = {"etag": etag, "last_modified": last_modified}
+        else:
+            validators.pop(url, None)
+
     def download_file(self, url: str, **kwargs: Dict[str, Any]) -> Tuple[BytesIO, str, str]:
         request_kwargs = self.get_request_kwargs()
         request_kwargs.update(kwargs)
@@ -226,5 +263,6 @@ class HTTPFeedingServiceBase(FeedingService):
 
     def update(self, provider, update):
         self.provider = provider
+        self._provider_update = update
         self.validate_config()
         return super().update(provider, update)
@@ -165,7 +165,10 @@ class RSSFeedingService(HTTPFeedingServiceBase):
         :raises IngestApiError: if data retrieval error occurs
         :raises ParserError: if retrieved RSS data cannot be parsed
         """
-        xml_data = self._fetch_data()
+        xml_data = self._fetch_data(conditional=True)
+        if xml_data is None:
+            # feed was not modified since last update
+            return []
 
         try:
             data = feedparser.parse(xml_data)
@@ -209,10 +212,11 @@ class RSSFeedingService(HTTPFeedingServiceBase):
 
         return [new_items]
 
-    def _fetch_data(self):
+    def _fetch_data(self, conditional=False):
         """Fetch the latest feed data.
 
-        :return: fetched RSS data
+        :param bool conditional: use conditional request
+        :return: fetched RSS data or ``None`` if feed was not modified
         :rtype: str
 
         :raises IngestApiError: if fetching data fails for any reason
@@ -220,7 +224,9 @@ class RSSFeedingService(HTTPFeedingServiceBase):
         """
         url = self.config["url"]
 
-        response = self.get_url(url)
+        response = self.get_url(url, conditional=conditional)
+        if conditional and self.is_not_modified(response):
+            return None
 
         return response.content
 
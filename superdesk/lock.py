@@ -1,12 +1,18 @@
 import os
 import re
+import time
+import redis
 import socket
 import logging
+import threading
 
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 from mongolock import MongoLock, MongoLockException
+from pymongo import ReturnDocument
 from werkzeug.local import LocalProxy
 from flask import current_app as app
+from superdesk import signals
 from superdesk.logging import logger
 from superdesk.utc import utcnow
 
@@ -18,6 +24,9 @@ _lock_resource_settings = {
 
 logger = logging.getLogger(__name__)
 
+#: monotonic time when lock was acquired by this process, used to report hold time
+_acquired: Dict[Tuple[str, str], float] = {}
+
 
 class SuperdeskMongoLock(MongoLock):
     """Superdesk MongoLock
@@ -38,17 +47,189 @@ class SuperdeskMongoLock(MongoLock):
         This should not happen in general, locks should be released.
         Consider increasing lock time.
         """
-        lock_info = self.get_lock_info(key)
-        locked = super()._try_get_lock(key, owner, expire)
-        if locked and lock_info and lock_info["locked"]:
+        now = datetime.utcnow()
+        previous = self.collection.find_one_and_update(
+            {"_id": key, "$or": [{"locked": False}, {"expire": {"$lt": now}}]},
+            {"$set": {"locked": True, "owner": owner, "created": now, "expire": expire}},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if previous and previous["locked"]:
             logger.warning("Lock %s expired", key)
-        return locked
+        return previous is not None
+
+
+class LockBackend:
+    """Base class for lock backends.
+
+    Implement :meth:`_try_lock` which should try to get lock once without waiting,
+    :meth:`lock` will retry it until it gets the lock or timeout is reached.
+    """
+
+    #: time in seconds between attempts to get lock when waiting for it
+    retry_step = 0.1
+
+    def lock(self, key: str, owner: str, expire: Optional[float] = None, timeout: Optional[float] = None) -> bool:
+        started = time.monotonic()
+        while True:
+            if self._try_lock(key, owner, expire):
+                return True
+            if not timeout or time.monotonic() - started >= timeout:
+                return False
+            time.sleep(self.retry_step)
+
+    def _try_lock(self, key: str, owner: str, expire: Optional[float]) -> bool:
+        raise NotImplementedError()
+
+    def release(self, key: str, owner: str, remove: bool = True):
+        raise NotImplementedError()
+
+    def touch(self, key: str, owner: str, expire: float) -> bool:
+        """Extend lock expiry, return ``False`` if lock is not owned by owner."""
+        raise NotImplementedError()
+
+    def is_locked(self, key: str) -> bool:
+        raise NotImplementedError()
+
+    def remove_unused(self, patterns) -> int:
+        """Remove released locks with keys matching any of given patterns."""
+        return 0
+
+
+class MongoLockBackend(LockBackend):
+    """Lock backend storing locks in ``_lock`` mongo collection."""
+
+    def __init__(self, mongolock: SuperdeskMongoLock):
+        self.mongolock = mongolock
+
+    def _try_lock(self, key, owner, expire):
+        return self.mongolock.lock(key, owner, expire=expire)
+
+    def release(self, key, owner, remove=True):
+        return self.mongolock.release(key, owner, remove)
+
+    def touch(self, key, owner, expire):
+        try:
+            self.mongolock.touch(key, owner, expire)
+            return True
+        except MongoLockException:
+            return False
+
+    def is_locked(self, key):
+        lock_info = self.mongolock.get_lock_info(key)
+        return not (
+            not lock_info
+            or not lock_info["locked"]
+            or (lock_info["expire"] is not None and lock_info["expire"] < utcnow())
+        )
+
+    def remove_unused(self, patterns):
+        result = self.mongolock.collection.delete_many(
+            {"$or": [{"_id": re.compile(pattern), "locked": False} for pattern in patterns]}
+        )
+        return result.deleted_count
+
+
+class RedisLockBackend(LockBackend):
+    """Lock backend using redis ``SET NX PX``.
 
+    Release and touch are done using lua scripts, so these only
+    affect lock if it's still owned by the owner.
+    """
+
+    key_prefix = "superdesk:lock:"
+
+    release_script = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+    touch_script = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._release = client.register_script(self.release_script)
+        self._touch = client.register_script(self.touch_script)
+
+    def _try_lock(self, key, owner, expire):
+        px = int(expire * 1000) if expire else None
+        return bool(self.client.set(self.key_prefix + key, owner, nx=True, px=px))
+
+    def release(self, key, owner, remove=True):
+        return self._release(keys=[self.key_prefix + key], args=[owner])
+
+    def touch(self, key, owner, expire):
+        return bool(self._touch(keys=[self.key_prefix + key], args=[owner, int(expire * 1000)]))
+
+    def is_locked(self, key):
+        return bool(self.client.exists(self.key_prefix + key))
+
+
+class MemoryLockBackend(LockBackend):
+    """Lock backend working only within single process, useful for tests and development."""
 
-def _get_lock():
-    """Get mongolock instance using app mongodb."""
-    app.register_resource("_lock", _lock_resource_settings)  # setup dummy resource for locks
-    return SuperdeskMongoLock(client=app.data.mongo.pymongo("_lock").db)
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._locks: Dict[str, Tuple[str, Optional[float]]] = {}
+
+    def _get_owner(self, key):
+        try:
+            owner, expire_at = self._locks[key]
+        except KeyError:
+            return None
+        if expire_at is not None and expire_at < time.monotonic():
+            del self._locks[key]
+            return None
+        return owner
+
+    def _try_lock(self, key, owner, expire):
+        with self._mutex:
+            if self._get_owner(key) is not None:
+                return False
+            self._locks[key] = (owner, time.monotonic() + expire if expire else None)
+            return True
+
+    def release(self, key, owner, remove=True):
+        with self._mutex:
+            if self._get_owner(key) == owner:
+                del self._locks[key]
+
+    def touch(self, key, owner, expire):
+        with self._mutex:
+            if self._get_owner(key) != owner:
+                return False
+            if self._locks[key][1] is not None:
+                self._locks[key] = (owner, time.monotonic() + expire)
+            return True
+
+    def is_locked(self, key):
+        with self._mutex:
+            return self._get_owner(key) is not None
+
+
+def _get_lock() -> LockBackend:
+    """Get lock backend configured via ``LOCK_BACKEND``."""
+    if not app.extensions.get("superdesk_lock"):
+        backend = app.config.get("LOCK_BACKEND") or "mongo"
+        if backend == "redis":
+            client = redis.Redis.from_url(app.config.get("LOCK_REDIS_URL") or app.config["REDIS_URL"])
+            app.extensions["superdesk_lock"] = RedisLockBackend(client)
+        elif backend == "memory":
+            app.extensions["superdesk_lock"] = MemoryLockBackend()
+        elif backend == "mongo":
+            app.register_resource("_lock", _lock_resource_settings)  # setup dummy resource for locks
+            mongolock = SuperdeskMongoLock(client=app.data.mongo.pymongo("_lock").db)
+            app.extensions["superdesk_lock"] = MongoLockBackend(mongolock)
+        else:
+            raise ValueError("Unknown lock backend {}".format(backend))
+        logger.info("using %s lock backend", backend)
+    return app.extensions["superdesk_lock"]
 
 
 _lock = LocalProxy(_get_lock)
@@ -68,11 +249,17 @@ def lock(task, host=None, expire=300, timeout=None):
     """
     if not host:
         host = get_host()
-    got_lock = _lock.lock(task, host, expire=expire, timeout=timeout)
+    backend = _lock._get_current_object()
+    started = time.monotonic()
+    got_lock = backend.lock(task, host, expire=expire, timeout=timeout)
+    now = time.monotonic()
     if got_lock:
+        if signals.lock_release.receivers:
+            _acquired[(task, host)] = now
         logger.debug("got lock task=%s host=%s" % (task, host))
     else:
         logger.debug("task locked already task=%s host=%s" % (task, host))
+    signals.lock_acquire.send(backend, task=task, host=host, acquired=got_lock, waited=now - started)
     return got_lock
 
 
@@ -88,7 +275,13 @@ def unlock(task, host=None, remove=True):
     if not host:
         host = get_host()
     logger.debug("releasing lock task=%s host=%s" % (task, host))
-    return _lock.release(task, host, remove)
+    backend = _lock._get_current_object()
+    result = backend.release(task, host, remove)
+    acquired = _acquired.pop((task, host), None)
+    signals.lock_release.send(
+        backend, task=task, host=host, held=time.monotonic() - acquired if acquired is not None else None
+    )
+    return result
 
 
 def remove_locks():
@@ -96,23 +289,13 @@ def remove_locks():
     Removes item related locks that are not in use
     :return:
     """
-    result = _lock.collection.delete_many(
-        {
-            "$or": [
-                {"_id": re.compile("^item_move"), "locked": False},
-                {"_id": re.compile("^item_lock"), "locked": False},
-            ]
-        }
-    )
-    logger.info("unused item locks deleted count={}".format(result.deleted_count))
+    deleted_count = _lock.remove_unused(["^item_move", "^item_lock"])
+    logger.info("unused item locks deleted count={}".format(deleted_count))
 
 
 def is_locked(task):
     """Get info if task is locked."""
-    lock_info = _lock.get_lock_info(task)
-    return not (
-        not lock_info or not lock_info["locked"] or (lock_info["expire"] is not None and lock_info["expire"] < utcnow())
-    )
+    return _lock.is_locked(task)
 
 
 def touch(task, host=None, expire=1):
@@ -122,8 +305,4 @@ def touch(task, host=None, expire=1):
     """
     if not host:
         host = get_host()
-    try:
-        _lock.touch(task, host, expire)
-        return True
-    except MongoLockException:
-        return False
+    return _lock.touch(task, host, expire)
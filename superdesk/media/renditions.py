@@ -13,14 +13,15 @@ from typing import Dict, Optional, Tuple, Any
 from PIL import Image
 from io import BytesIO
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
 from flask import current_app as app
 from .media_operations import process_file_from_stream
-from .media_operations import crop_image
+from .media_operations import _get_cropping_data
 from .media_operations import download_file_from_url
 from .media_operations import process_file
 from .media_operations import guess_media_extension
-from .image import fix_orientation
 from eve.utils import config
 from superdesk import get_resource_service
 from superdesk.filemeta import set_filemeta
@@ -43,6 +44,10 @@ def generate_renditions(
 ):
     """Generate system renditions for given media file id.
 
+    Original is decoded only once, renditions are created from the decoded image
+    (or from ``baseImage`` rendition once it is generated) and then encoded and stored,
+    in parallel if ``RENDITIONS_WORKERS`` is set.
+
     :param BytesIO original: original image byte stream
     :param str media_id: media id
     :param list inserted: list of media ids inserted
@@ -61,7 +66,7 @@ def generate_renditions(
     if file_type != "image":
         return renditions
 
-    original = fix_orientation(original)
+    original.seek(0)
     img = Image.open(original)
     width, height = img.size
     rend.update({"width": width})
@@ -92,31 +97,55 @@ def generate_renditions(
     specs = list(rendition_config.items())
     if base_image:
         specs.insert(0, ("baseImage", base_image))
-    base = original
-    for rendition, rsize in specs:
-        cropping_data = {}
-        # reset
-        base.seek(0)
-        # create the rendition (can be based on ratio or pixels)
-        if rsize.get("width") and rsize.get("height") and rendition not in config.RENDITIONS["picture"]:  # custom crop
-            resized, width, height, cropping_data = _crop_image_center(base, ext, rsize["width"], rsize["height"])
-            # we need crop data for original size image
-            cropping_data = _get_center_crop(original, rsize["width"], rsize["height"])
-        elif rsize.get("width") or rsize.get("height"):
-            resized, width, height = _resize_image(base, (rsize.get("width"), rsize.get("height")), ext)
-        elif rsize.get("ratio"):
-            resized, width, height, cropping_data = _crop_image(base, ext, rsize.get("ratio"))
-        rend_content_type = "image/%s" % ext
-        file_name, rend_content_type, metadata = process_file_from_stream(resized, content_type=rend_content_type)
-        resized.seek(0)
-        folder = "temp" if temporary else None
-        _id = app.media.put(
-            resized,
-            filename=file_name,
-            content_type=rend_content_type,
-            folder=folder,
-            metadata=metadata if insert_metadata else None,
-        )
+        if not _is_custom_crop("baseImage", base_image) and (base_image.get("width") or base_image.get("height")):
+            base_image_size = _get_resize_size(img.size, (base_image.get("width"), base_image.get("height")))
+            if base_image_size[0] < width and base_image_size[1] < height:
+                # other renditions are created from baseImage, so there is no need
+                # to decode jpeg in full size, it can be scaled down while decoding
+                img.draft(img.mode, base_image_size)
+    img.load()
+
+    folder = "temp" if temporary else None
+    generated = []
+    with _renditions_executor() as executor:
+        base = img
+        # size of the original, decoded image can be smaller if it was scaled down
+        base_size = (rend["width"], rend["height"])
+        for rendition, rsize in specs:
+            cropping_data = {}
+            # create the rendition (can be based on ratio or pixels)
+            if _is_custom_crop(rendition, rsize):
+                resized, width, height = _crop_image_center(base, rsize["width"], rsize["height"])
+                # we need crop data for original size image
+                cropping_data = _get_center_crop(rend["width"], rend["height"], rsize["width"], rsize["height"])
+                save_options = {}
+            elif rsize.get("width") or rsize.get("height"):
+                width, height = _get_resize_size(base_size, (rsize.get("width"), rsize.get("height")))
+                resized = base.resize((width, height), Image.LANCZOS)
+                save_options = {"quality": 85}
+            elif rsize.get("ratio"):
+                cropping_data = _get_ratio_crop(base.size[0], base.size[1], rsize.get("ratio"))
+                resized = base.crop(_get_cropping_data(cropping_data))
+                width, height = resized.size
+                save_options = {}
+            future = _submit(
+                executor, _store_rendition, resized, ext, save_options, folder, insert_metadata=insert_metadata
+            )
+            generated.append((rendition, future, width, height, cropping_data))
+
+            # use baseImage for other renditions once we have it
+            if rendition == "baseImage" and width < rend["width"] and height < rend["height"]:
+                base = resized
+                base_size = resized.size
+
+    error = None
+    for rendition, future, width, height, cropping_data in generated:
+        try:
+            _id, rend_content_type = future.result()
+        except Exception as ex:
+            # keep collecting stored renditions so all of them can be removed
+            error = error or ex
+            continue
         inserted.append(_id)
         renditions[rendition] = {
             "href": url_for_media(_id, rend_content_type),
@@ -127,13 +156,72 @@ def generate_renditions(
         }
         # add the cropping data if exist
         renditions[rendition].update(cropping_data)
-
-        # use baseImage for other renditions once we have it
-        if rendition == "baseImage" and width < img.size[0] and height < img.size[1]:
-            base = resized
+    if error is not None:
+        raise error
     return renditions
 
 
+def _is_custom_crop(rendition, rsize):
+    return bool(rsize.get("width") and rsize.get("height") and rendition not in config.RENDITIONS["picture"])
+
+
+@contextmanager
+def _renditions_executor():
+    """Get executor for storing renditions, ``None`` if it should be done synchronously."""
+    workers = app.config.get("RENDITIONS_WORKERS", 0)
+    if not workers:
+        yield None
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield executor
+
+
+def _submit(executor, func, *args, **kwargs) -> Future:
+    if executor is None:
+        future = Future()  # type: Future
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+    flask_app = app._get_current_object()
+
+    def run():
+        with flask_app.app_context():
+            return func(*args, **kwargs)
+
+    return executor.submit(run)
+
+
+def _save_image(image, format, **options):
+    out = BytesIO()
+    try:
+        image.save(out, format, **options)
+    except IOError:
+        out = BytesIO()
+        image.convert("RGB").save(out, format, **options)
+    out.seek(0)
+    return out
+
+
+def _store_rendition(image, ext, save_options, folder, insert_metadata=True):
+    """Encode rendition image and put it into media storage.
+
+    :return: tuple of media id and content type
+    """
+    out = _save_image(image, ext, **save_options)
+    file_name, rend_content_type, metadata = process_file_from_stream(out, content_type="image/%s" % ext)
+    out.seek(0)
+    _id = app.media.put(
+        out,
+        filename=file_name,
+        content_type=rend_content_type,
+        folder=folder,
+        metadata=metadata if insert_metadata else None,
+    )
+    return _id, rend_content_type
+
+
 def can_generate_custom_crop_from_original(width, height, crop):
     """Checks whether custom crop can be generated or not
 
@@ -174,20 +262,18 @@ def delete_file_on_error(doc, file_id):
     app.media.delete(file_id)
 
 
-def _crop_image(content, format, ratio):
-    """Crop the image given as a binary stream
+def _get_ratio_crop(width, height, ratio):
+    """Get cropping data for center crop of given ratio.
 
-    @param content: stream
-        The binary stream containing the image
-    @param format: str
-        The format of the resized image (e.g. png, jpg etc.)
+    @param width: int
+        Width of the image
+    @param height: int
+        Height of the image
     @param ratio: string, int or float
         Ratio to apply. '16:9', '1:1' etc...
-    @return: stream
-        Returns the resized image as a binary stream.
+    @return: dict
+        Returns the cropping data.
     """
-    img = Image.open(content)
-    width, height = img.size
     if type(ratio) not in [float, int]:
         ratio = ratio.split(":")
         ratio = int(ratio[0]) / int(ratio[1])
@@ -209,22 +295,20 @@ def _crop_image(content, format, ratio):
             "CropTop": 0,
             "CropBottom": new_height,
         }
-    crop, out = crop_image(content, file_name="crop.for.rendition", cropping_data=cropping_data, image_format=format)
-    return out, new_width, new_height, cropping_data
+    return cropping_data
 
 
-def _get_center_crop(original, width, height):
-    image = Image.open(original)
+def _get_center_crop(original_width, original_height, width, height):
     width = int(width)
     height = int(height)
 
-    width_ratio = image.size[0] / width
-    height_ratio = image.size[1] / height
+    width_ratio = original_width / width
+    height_ratio = original_height / height
 
     if width_ratio >= height_ratio:
         dest_width = int(width * height_ratio)
-        dest_height = image.size[1]
-        offset = int((image.size[0] - dest_width) / 2)
+        dest_height = original_height
+        offset = int((original_width - dest_width) / 2)
         cropping_data = {
             "CropLeft": offset,
             "CropRight": offset + dest_width,
@@ -232,9 +316,9 @@ def _get_center_crop(original, width, height):
             "CropBottom": dest_height,
         }
     else:
-        dest_width = image.size[0]
+        dest_width = original_width
         dest_height = int(height * width_ratio)
-        offset = int((image.size[1] - dest_height) / 2)
+        offset = int((original_height - dest_height) / 2)
         cropping_data = {
             "CropLeft": 0,
             "CropRight": dest_width,
@@ -245,19 +329,10 @@ def _get_center_crop(original, width, height):
     return cropping_data
 
 
-def _crop_image_center(content, format, width, height):
-    cropping_data = _get_center_crop(content, width, height)
-    crop, out = crop_image(
-        content,
-        file_name="crop.for.rendition",
-        cropping_data=cropping_data,
-        exact_size={
-            "width": width,
-            "height": height,
-        },
-        image_format=format,
-    )
-    return out, width, height, cropping_data
+def _crop_image_center(img, width, height):
+    cropping_data = _get_center_crop(img.size[0], img.size[1], width, height)
+    cropped = img.crop(_get_cropping_data(cropping_data)).resize((int(width), int(height)), Image.LANCZOS)
+    return cropped, width, height
 
 
 def to_int(x):
@@ -268,27 +343,20 @@ def to_int(x):
         return x
 
 
-def _resize_image(content, size, format=None, keepProportions=True):
-    """Resize the image given as a binary stream
+def _get_resize_size(size, new_size, keepProportions=True):
+    """Get size of the image resized to given width and/or height.
 
-    @param content: stream
-        The binary stream containing the image
-    @param format: str
-        The format of the resized image (e.g. png, jpg etc.)
     @param size: tuple
-        A tuple of width, height
+        A tuple of width, height of the image
+    @param new_size: tuple
+        A tuple of requested width, height
     @param keepProportions: boolean
-        If true keep image proportions; it will adjust the resized
-        image size.
-    @return: stream
-        Returns the resized image as a binary stream.
+        If true keep image proportions
+    @return: tuple
+        Returns width, height of the resized image.
     """
-    assert isinstance(size, tuple)
-    img = Image.open(content)
-    if not format:
-        format = img.format
-    width, height = img.size
-    new_width, new_height = [to_int(x) for x in size]
+    width, height = size
+    new_width, new_height = [to_int(x) for x in new_size]
     if keepProportions:
         if new_width is None and new_height is None:
             raise Exception("size parameter requires at least width or height value")
@@ -308,15 +376,31 @@ def _resize_image(content, size, format=None, keepProportions=True):
                 new_height = int(int(new_width) / original_ratio)
             else:
                 new_width = int(new_height * original_ratio)
+    return new_width, new_height
+
+
+def _resize_image(content, size, format=None, keepProportions=True):
+    """Resize the image given as a binary stream
+
+    @param content: stream
+        The binary stream containing the image
+    @param format: str
+        The format of the resized image (e.g. png, jpg etc.)
+    @param size: tuple
+        A tuple of width, height
+    @param keepProportions: boolean
+        If true keep image proportions; it will adjust the resized
+        image size.
+    @return: stream
+        Returns the resized image as a binary stream.
+    """
+    assert isinstance(size, tuple)
+    img = Image.open(content)
+    if not format:
+        format = img.format
+    new_width, new_height = _get_resize_size(img.size, size, keepProportions)
     resized = img.resize((new_width, new_height), Image.LANCZOS)
-    out = BytesIO()
-    try:
-        resized.save(out, format, quality=85)
-    except IOError:
-        out = BytesIO()
-        resized = resized.convert("RGB")
-        resized.save(out, format, quality=85)
-    out.seek(0)
+    out = _save_image(resized, format, quality=85)
     return out, new_width, new_height
 
 
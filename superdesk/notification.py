@@ -10,13 +10,18 @@
 
 """Superdesk push notifications"""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+import atexit
 import logging
 import os
 import json
+import queue
+import threading
+import time
+import weakref
 
 from datetime import datetime
-from flask import current_app as app
+from flask import g, current_app as app
 from superdesk.utils import json_serialize_datetime_objectId
 from superdesk.websockets_comms import SocketMessageProducer
 from superdesk.types import WebsocketMessageData, WebsocketMessageFilterConditions
@@ -24,6 +29,7 @@ from superdesk.types import WebsocketMessageData, WebsocketMessageFilterConditio
 
 logger = logging.getLogger(__name__)
 exchange_name = "socket_notification"
+send_lock = threading.Lock()
 
 
 class ClosedSocket:
@@ -36,6 +42,146 @@ class ClosedSocket:
         pass
 
 
+class NotificationQueue:
+    """Send notifications to broker from a background thread.
+
+    Queue is bounded, if broker is too slow the messages over ``size`` are dropped
+    instead of blocking the request.
+
+    :param app: app instance
+    :param size: max number of messages waiting to be sent
+    """
+
+    def __init__(self, app, size: int):
+        self.app = app
+        self.size = size
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=size)
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, message: str):
+        self._start()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Notification queue is full, dropping message (dropped total %d)", self.dropped)
+
+    def close(self, timeout: float = 5):
+        """Stop the thread once queued messages are sent."""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked process, thread and queue are not usable
+                self._pid = os.getpid()
+                self._queue = queue.Queue(maxsize=self.size)
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="superdesk-notifications", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            try:
+                with self.app.app_context():
+                    _send_message(message)
+            except Exception:
+                logger.exception("Failed to send notification")
+
+
+class NotificationBuffer:
+    """Notifications collected during request or app context."""
+
+    def __init__(self):
+        self.created = time.monotonic()
+        self._messages: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def add(self, message_data: Dict[str, Any]):
+        with self._lock:
+            _add_to_buffer(self._messages, message_data)
+
+    def age(self) -> float:
+        return time.monotonic() - self.created
+
+    def pop(self) -> List[Dict[str, Any]]:
+        """Return collected messages and clear the buffer."""
+        with self._lock:
+            messages = list(self._messages.values())
+            self._messages = {}
+            self.created = time.monotonic()
+        return messages
+
+
+class NotificationFlusher:
+    """Send buffered notifications from a background thread once ``interval`` passes.
+
+    Without it notifications collected in long running app context like celery task
+    or command would wait for next push or for the context to end.
+
+    :param app: app instance
+    :param interval: max number of seconds notifications are buffered
+    """
+
+    def __init__(self, app, interval: float):
+        self.app = app
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._buffers: weakref.WeakSet = weakref.WeakSet()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, buffer: NotificationBuffer):
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked process, thread is not running
+                self._pid = os.getpid()
+                self._buffers = weakref.WeakSet()
+                self._thread = None
+            self._buffers.add(buffer)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="superdesk-notifications-flush", daemon=True)
+                self._thread.start()
+
+    def discard(self, buffer: NotificationBuffer):
+        with self._lock:
+            self._buffers.discard(buffer)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                buffers = list(self._buffers)
+            for buffer in buffers:
+                if buffer.age() < self.interval:
+                    continue
+                messages = buffer.pop()
+                if not messages:
+                    continue
+                try:
+                    with self.app.app_context():
+                        _publish(messages)
+                except Exception:
+                    logger.exception("Failed to send notifications")
+
+
 def init_app(app) -> None:
     try:
         app.notification_client = SocketMessageProducer(app.config["BROKER_URL"], app.config["WEBSOCKET_EXCHANGE"])
@@ -43,17 +189,36 @@ def init_app(app) -> None:
         # not working now, but we can try later when actually sending something
         app.notification_client = ClosedSocket()
 
+    if "superdesk_notification_queue" not in app.extensions:
+        size = app.config.get("NOTIFICATION_QUEUE_SIZE")
+        notification_queue = NotificationQueue(app, size) if size else None
+        app.extensions["superdesk_notification_queue"] = notification_queue
+        if notification_queue is not None:
+            atexit.register(notification_queue.close)
+        interval = app.config.get("NOTIFICATION_FLUSH_INTERVAL")
+        app.extensions["superdesk_notification_flusher"] = NotificationFlusher(app, interval) if interval else None
+        app.teardown_request(on_teardown)
+        app.teardown_appcontext(on_teardown)
+
 
 def _create_socket_message(**kwargs) -> str:
     """Send out all kwargs as json string."""
+    return json.dumps(_create_message_data(**kwargs), default=json_serialize_datetime_objectId)
+
+
+def _create_message_data(**kwargs) -> Dict[str, Any]:
     kwargs.setdefault("_created", datetime.utcnow().isoformat())
     kwargs.setdefault("_process", os.getpid())
-    return json.dumps(kwargs, default=json_serialize_datetime_objectId)
+    return kwargs
 
 
 def push_notification(name, filters: Optional[WebsocketMessageFilterConditions] = None, **kwargs):
     """Push notification to broker.
 
+    Notifications are collected during request/app context and sent as a single message
+    when it ends, see ``NOTIFICATION_BATCH_SIZE``. Collected notifications are also sent
+    by a background thread after ``NOTIFICATION_FLUSH_INTERVAL``.
+
     In case connection is closed it will try to reconnect.
 
     :param name: event name
@@ -66,14 +231,6 @@ def push_notification(name, filters: Optional[WebsocketMessageFilterConditions]
         # this could be the case for content/production api
         return
 
-    if not app.notification_client.open:
-        app.notification_client.close()
-        init_app(app)
-
-    if not app.notification_client.open:
-        logger.warning("No connection to broker. Dropping event %s" % name)
-        return
-
     try:
         msg_kwargs = WebsocketMessageData(
             event=name,
@@ -82,8 +239,81 @@ def push_notification(name, filters: Optional[WebsocketMessageFilterConditions]
         if filters:
             msg_kwargs["filters"] = filters
 
-        message = _create_socket_message(**msg_kwargs)
-        logger.debug("Sending the message: {} to the broker.".format(message))
-        app.notification_client.send(message)
+        message_data = _create_message_data(**msg_kwargs)
+        batch_size = app.config.get("NOTIFICATION_BATCH_SIZE", 1)
+        if batch_size <= 1:
+            _publish([message_data])
+            return
+
+        buffer = g.get("notification_buffer")
+        if buffer is None:
+            buffer = g.notification_buffer = NotificationBuffer()
+            flusher = app.extensions.get("superdesk_notification_flusher")
+            if flusher is not None:
+                flusher.add(buffer)
+        buffer.add(message_data)
+        if len(buffer) >= batch_size or buffer.age() >= app.config.get("NOTIFICATION_FLUSH_INTERVAL", 1):
+            flush()
     except Exception as err:
         logger.exception(err)
+
+
+def _add_to_buffer(buffer: Dict[Tuple, Dict[str, Any]], message_data: Dict[str, Any]):
+    """Add message to buffer, merging it with previous message for same event and item."""
+    extra = message_data.get("extra") or {}
+    if message_data.get("filters") or not extra.get("_id"):
+        buffer[(len(buffer),)] = message_data
+        return
+    key = (message_data["event"], extra.get("resource"), str(extra["_id"]))
+    previous = buffer.get(key)
+    if previous is not None:
+        previous_fields = previous["extra"].get("fields")
+        fields = extra.get("fields")
+        if isinstance(previous_fields, dict) and isinstance(fields, dict):
+            extra["fields"] = {**previous_fields, **fields}
+    buffer[key] = message_data  # existing key keeps position of the first event
+
+
+def flush():
+    """Send notifications collected so far."""
+    buffer = g.pop("notification_buffer", None)
+    if buffer is None:
+        return
+    flusher = app.extensions.get("superdesk_notification_flusher")
+    if flusher is not None:
+        flusher.discard(buffer)
+    messages = buffer.pop()
+    if messages:
+        _publish(messages)
+
+
+def on_teardown(exc=None):
+    """Send notifications when request or app context ends."""
+    try:
+        flush()
+    except Exception:
+        logger.exception("Failed to send notifications")
+
+
+def _publish(messages: List[Dict[str, Any]]):
+    # send single message as it was, multiple messages as a list
+    message = json.dumps(messages[0] if len(messages) == 1 else messages, default=json_serialize_datetime_objectId)
+    logger.debug("Sending the message: {} to the broker.".format(message))
+    notification_queue = app.extensions.get("superdesk_notification_queue")
+    if notification_queue is not None:
+        notification_queue.put(message)
+    else:
+        _send_message(message)
+
+
+def _send_message(message: str):
+    if not app.notification_client.open:
+        app.notification_client.close()
+        init_app(app)
+
+    if not app.notification_client.open:
+        logger.warning("No connection to broker. Dropping message")
+        return
+
+    with send_lock:  # client is shared with background threads
+        app.notification_client.send(message)
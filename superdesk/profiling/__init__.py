@@ -19,6 +19,7 @@ import superdesk
 
 from flask import current_app as app
 
+from superdesk.profiling import metrics
 from superdesk.profiling.resource import ProfilingResource
 from superdesk.profiling.service import ProfilingService, profile
 
@@ -27,6 +28,9 @@ logger = logging.getLogger(__name__)
 
 
 def init_app(app) -> None:
+    if app.config.get("ENABLE_METRICS"):
+        metrics.init_app(app)
+
     if app.config.get("ENABLE_PROFILING"):
         endpoint_name = "profiling"
         service = ProfilingService(endpoint_name, backend=superdesk.get_backend())
@@ -0,0 +1,333 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2024 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Request and celery task metrics.
+
+Latency histograms and number of mongo/elastic calls are aggregated in memory
+and periodically saved to redis, so ``/metrics`` endpoint can export metrics
+of all api and celery processes in Prometheus text format.
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import flask
+import superdesk
+
+from celery import signals
+from elasticsearch import Transport
+from pymongo import monitoring
+from superdesk.auth.decorator import blueprint_auth
+from superdesk.profiling.sampler import sampler
+
+
+logger = logging.getLogger(__name__)
+
+bp = superdesk.Blueprint("metrics", __name__)
+
+#: histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REDIS_KEY = "superdesk:metrics"
+
+#: start time and backend calls of current request or task
+_current: ContextVar[Optional[Tuple[float, Dict[str, int]]]] = ContextVar("superdesk_metrics", default=None)
+_task_tokens: Dict[str, Any] = {}
+
+
+class Histogram:
+    """Latency histogram using fixed :data:`BUCKETS`, last count is for values over the last bucket."""
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self, counts: Optional[List[int]] = None, total: float = 0.0):
+        self.counts = counts or [0] * (len(BUCKETS) + 1)
+        self.total = total
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+
+class Metrics:
+    """In memory metrics.
+
+    Both histograms and calls are keyed by kind (``request`` or ``task``) and name
+    (``method endpoint`` for requests, task name for celery tasks).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.calls: Dict[Tuple[str, str, str], int] = {}
+        self.saved = time.monotonic()
+
+    def observe(self, kind: str, name: str, duration: float, calls: Optional[Dict[str, int]] = None):
+        with self.lock:
+            key = (kind, name)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(duration)
+            for backend, count in (calls or {}).items():
+                calls_key = (kind, name, backend)
+                self.calls[calls_key] = self.calls.get(calls_key, 0) + count
+
+    def merge(self, other: "Metrics"):
+        for key, histogram in other.histograms.items():
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].merge(histogram)
+        for calls_key, count in other.calls.items():
+            self.calls[calls_key] = self.calls.get(calls_key, 0) + count
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "histograms": [[kind, name, h.counts, h.total] for (kind, name), h in self.histograms.items()],
+                "calls": [[kind, name, backend, count] for (kind, name, backend), count in self.calls.items()],
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Metrics":
+        metrics = cls()
+        for kind, name, counts, total in data.get("histograms") or []:
+            if len(counts) == len(BUCKETS) + 1:
+                metrics.histograms[(kind, name)] = Histogram(counts, total)
+        for kind, name, backend, count in data.get("calls") or []:
+            metrics.calls[(kind, name, backend)] = count
+        return metrics
+
+
+metrics = Metrics()
+
+
+class MongoCallCounter(monitoring.CommandListener):
+    """Count mongo commands sent during request or task."""
+
+    def started(self, event):
+        count_call("mongo")
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class ElasticCallCounter(Transport):
+    """Elastic transport counting requests sent during request or task."""
+
+    def perform_request(self, *args, **kwargs):
+        count_call("elastic")
+        return super().perform_request(*args, **kwargs)
+
+
+_mongo_listener: Optional[MongoCallCounter] = None
+
+
+def register_mongo_listener():
+    """Register mongo listener, it must be done before mongo client is created."""
+    global _mongo_listener
+    if _mongo_listener is None:
+        _mongo_listener = MongoCallCounter()
+        monitoring.register(_mongo_listener)
+
+
+def count_call(backend: str):
+    current = _current.get()
+    if current is not None:
+        current[1][backend] = current[1].get(backend, 0) + 1
+
+
+def start_timer():
+    """Start measuring current request or task.
+
+    :return: token for :func:`stop_timer`
+    """
+    return _current.set((time.perf_counter(), {}))
+
+
+def stop_timer(kind: str, name: str, token):
+    current = _current.get()
+    try:
+        _current.reset(token)
+    except ValueError:
+        # token created in other context
+        _current.set(None)
+    if current is not None:
+        metrics.observe(kind, name, time.perf_counter() - current[0], current[1])
+
+
+def get_process_key() -> str:
+    return "{}:{}".format(socket.gethostname(), os.getpid())
+
+
+def _get_process_data(app) -> str:
+    data = metrics.to_dict()
+    data["time"] = time.time()
+    data["stacks"] = sampler.get_stacks(app.config.get("SAMPLING_PROFILER_EXPORT_STACKS", 500))
+    return json.dumps(data)
+
+
+def save_metrics(app, force=False):
+    """Save metrics of this process to redis.
+
+    It only saves once per ``METRICS_SAVE_INTERVAL`` unless ``force`` is set.
+    """
+    if not force and time.monotonic() - metrics.saved < app.config.get("METRICS_SAVE_INTERVAL", 60):
+        return
+    metrics.saved = time.monotonic()
+    if not getattr(app, "redis", None):
+        return
+    try:
+        app.redis.hset(REDIS_KEY, get_process_key(), _get_process_data(app))
+    except Exception:
+        logger.warning("Failed to save metrics to redis", exc_info=True)
+
+
+def load_metrics(app) -> Tuple[Metrics, Dict[str, int]]:
+    """Load metrics and profiler stacks of all processes.
+
+    Data of processes which didn't save metrics for a while are removed.
+    """
+    save_metrics(app, force=True)
+    try:
+        processes = app.redis.hgetall(REDIS_KEY)
+    except Exception:
+        logger.warning("Failed to load metrics from redis", exc_info=True)
+        processes = {}
+    if not processes:
+        # use local metrics if there is no redis
+        processes = {get_process_key(): _get_process_data(app)}
+
+    expired = time.time() - app.config.get("METRICS_SAVE_INTERVAL", 60) * 5
+    merged = Metrics()
+    stacks: Dict[str, int] = {}
+    for process, value in processes.items():
+        data = json.loads(value)
+        if data.get("time", 0) < expired:
+            app.redis.hdel(REDIS_KEY, process)
+            continue
+        merged.merge(Metrics.from_dict(data))
+        for stack, count in data.get("stacks") or []:
+            stacks[stack] = stacks.get(stack, 0) + count
+    return merged, stacks
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bucket(value: float) -> str:
+    return "{:g}".format(value)
+
+
+def render_prometheus(data: Metrics) -> str:
+    """Render metrics in Prometheus text format."""
+    lines: List[str] = []
+    for kind, label in (("request", "endpoint"), ("task", "task")):
+        histograms = sorted((name, h) for (_kind, name), h in data.histograms.items() if _kind == kind)
+        metric = "superdesk_{}_duration_seconds".format(kind)
+        lines.append("# HELP {} {} duration in seconds".format(metric, kind.capitalize()))
+        lines.append("# TYPE {} histogram".format(metric))
+        for name, histogram in histograms:
+            labels = '{}="{}"'.format(label, _escape(name))
+            cumulative = 0
+            for bucket, count in zip([_format_bucket(b) for b in BUCKETS] + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(metric, labels, bucket, cumulative))
+            lines.append("{}_sum{{{}}} {}".format(metric, labels, histogram.total))
+            lines.append("{}_count{{{}}} {}".format(metric, labels, cumulative))
+
+        calls = sorted((name, backend, count) for (_kind, name, backend), count in data.calls.items() if _kind == kind)
+        metric = "superdesk_{}_backend_calls_total".format(kind)
+        lines.append("# HELP {} Number of mongo and elastic calls made by {}".format(metric, kind))
+        lines.append("# TYPE {} counter".format(metric))
+        for name, backend, count in calls:
+            lines.append('{}{{{}="{}",backend="{}"}} {}'.format(metric, label, _escape(name), backend, count))
+    return "\n".join(lines) + "\n"
+
+
+def render_stacks(stacks: Dict[str, int]) -> str:
+    """Render profiler stacks in collapsed format."""
+    stacks_by_count = sorted(stacks.items(), key=lambda stack: stack[1], reverse=True)
+    return "".join("{} {}\n".format(stack, count) for stack, count in stacks_by_count)
+
+
+def _get_request_name() -> str:
+    request = flask.request
+    return "{} {}".format(request.method, request.endpoint if request.url_rule else "not_found")
+
+
+def _on_request_started():
+    flask.g.metrics_token = start_timer()
+
+
+def _on_request_finished(exc=None):
+    token = flask.g.pop("metrics_token", None)
+    if token is None:
+        return
+    stop_timer("request", _get_request_name(), token)
+    save_metrics(flask.current_app)
+
+
+def _on_task_prerun(task_id=None, task=None, **kwargs):
+    _task_tokens[task_id] = start_timer()
+
+
+def _on_task_postrun(task_id=None, task=None, **kwargs):
+    token = _task_tokens.pop(task_id, None)
+    if token is None:
+        return
+    stop_timer("task", task.name, token)
+    if superdesk.app:
+        save_metrics(superdesk.app)
+
+
+@bp.route("/metrics", methods=["GET"])
+@blueprint_auth("metrics")
+def metrics_view():
+    data, _stacks = load_metrics(flask.current_app)
+    return flask.Response(render_prometheus(data), mimetype="text/plain; version=0.0.4")
+
+
+@bp.route("/metrics/profile", methods=["GET"])
+@blueprint_auth("metrics")
+def profile_view():
+    _data, stacks = load_metrics(flask.current_app)
+    return flask.Response(render_stacks(stacks), mimetype="text/plain")
+
+
+def init_app(app) -> None:
+    app.before_request(_on_request_started)
+    app.teardown_request(_on_request_finished)
+    signals.task_prerun.connect(_on_task_prerun, weak=False)
+    signals.task_postrun.connect(_on_task_postrun, weak=False)
+    superdesk.blueprint(bp, app)
+
+    if app.config.get("ENABLE_SAMPLING_PROFILER"):
+        sampler.interval = app.config.get("SAMPLING_PROFILER_INTERVAL", 0.01)
+        sampler.start()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2024 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import os
+import sys
+import logging
+import threading
+
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Statistical profiler.
+
+    Background thread takes stack of every other thread each ``interval`` seconds
+    and counts how many times each stack was seen. Unlike ``cProfile`` it doesn't
+    slow down the profiled code, the overhead is given by ``interval`` and ``max_depth``.
+
+    Stacks are stored in collapsed format (``caller;callee``) used by flame graph tools.
+
+    :param interval: seconds between samples
+    :param max_depth: max number of frames per stack
+    :param max_stacks: max number of different stacks kept in memory, samples of other stacks are dropped
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 50, max_stacks: int = 5000):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._registered_fork = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        if not self._registered_fork and hasattr(os, "register_at_fork"):
+            # threads are not copied to forked process (eg. celery workers)
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._registered_fork = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="superdesk-sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self.stacks = {}
+            self.samples = 0
+            self.dropped = 0
+
+    def get_stacks(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Get most common stacks.
+
+        :param limit: max number of stacks
+        """
+        with self._lock:
+            stacks = sorted(self.stacks.items(), key=lambda stack: stack[1], reverse=True)
+        return stacks[:limit] if limit else stacks
+
+    def sample(self):
+        """Take a sample of all threads."""
+        own_id = threading.get_ident()
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append("{}:{}".format(frame.f_globals.get("__name__", "?"), frame.f_code.co_name))
+                frame = frame.f_back
+            stacks.append(";".join(reversed(stack)))
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                if stack in self.stacks:
+                    self.stacks[stack] += 1
+                elif len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] = 1
+                else:
+                    self.dropped += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Failed to sample stacks")
+
+    def _after_fork(self):
+        was_running = self._thread is not None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.reset()
+        if was_running:
+            self.start()
+
+
+sampler = SamplingProfiler()
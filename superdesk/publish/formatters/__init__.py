@@ -8,10 +8,13 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import json
 import logging
+import superdesk
 
 from lxml import etree
-from typing import List, Optional, Type
+from eve.utils import config
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Type, TypeVar
 from superdesk.metadata.item import ITEM_TYPE, CONTENT_TYPE, FORMATS, FORMAT
 from superdesk.etree import parse_html
 from superdesk.text_utils import get_text
@@ -20,6 +23,11 @@ formatters = []  # type: List[Type[Formatter]]
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+#: Format inputs which make the output specific to a single subscriber.
+SUBSCRIBER_DEPENDENCIES = frozenset(["subscriber", "codes", "published_seq_num"])
+
 
 class Formatter:
     """Base Formatter class for all types of Formatters like News ML 1.2, News ML G2, NITF, etc."""
@@ -31,6 +39,24 @@ class Formatter:
     # extended later and shouldn't be used on its own.
     name: Optional[str]
 
+    #: Inputs other than the article the formatted output depends on.
+    #:
+    #: Can contain ``subscriber``, ``codes``, ``published_seq_num`` and ``destination``.
+    #: If there is no subscriber specific input the rendered output is cached
+    #: during enqueue and reused for all subscribers with same destination config,
+    #: only ``published_seq_num`` is generated for each of them.
+    #:
+    #: It is not inherited, subclasses must declare it again to enable caching.
+    #:
+    #: .. versionadded:: 2.9
+    format_depends_on: FrozenSet[str] = frozenset(["subscriber", "codes", "published_seq_num", "destination"])
+
+    #: Cache shared by formatters during single enqueue, set via :meth:`set_format_cache`.
+    format_cache: Optional[Dict[Hashable, Any]] = None
+
+    #: Published sequence numbers reserved for current subscriber, set via :meth:`set_sequence_numbers`.
+    sequence_numbers: Optional[List[int]] = None
+
     def __init__(self) -> None:
         self.can_preview = False
         self.can_export = False
@@ -135,6 +161,53 @@ class Formatter:
         self.destination = destination
         self.subscriber = subscriber
 
+    def set_format_cache(self, cache: Optional[Dict[Hashable, Any]]) -> None:
+        self.format_cache = cache
+
+    def set_sequence_numbers(self, sequence_numbers: Optional[List[int]]) -> None:
+        """Set published sequence numbers reserved for current subscriber.
+
+        The list is shared by formatters of all subscriber destinations, used numbers are removed from it.
+        """
+        self.sequence_numbers = sequence_numbers
+
+    def generate_sequence_number(self, subscriber) -> int:
+        """Get published sequence number for subscriber.
+
+        Uses numbers reserved via :meth:`set_sequence_numbers`, generates a new one when there are none left.
+        """
+        if self.sequence_numbers:
+            return self.sequence_numbers.pop(0)
+        return superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
+
+    def get_format_cache_key(self, article) -> Optional[Hashable]:
+        """Get key for caching rendered article, ``None`` if the output can't be cached."""
+        # subclass might add subscriber dependency to inherited rendering, use it only if declared there
+        format_depends_on = type(self).__dict__.get("format_depends_on", Formatter.format_depends_on)
+        if self.format_cache is None or format_depends_on & SUBSCRIBER_DEPENDENCIES:
+            return None
+        key = [self.__class__.__name__, str(article.get(config.ID_FIELD)), article.get(config.VERSION)]
+        if "destination" in format_depends_on:
+            destination_config = self.destination.get("config") if self.destination else None
+            key.append(json.dumps(destination_config or {}, sort_keys=True, default=str))
+        return tuple(key)
+
+    def render_cached(self, article, render: Callable[[], T]) -> T:
+        """Get rendered article from format cache or render it and store it there.
+
+        :param article: article to render
+        :param render: callback doing the subscriber independent part of formatting
+        """
+        key = self.get_format_cache_key(article)
+        if key is None:
+            return render()
+        assert self.format_cache is not None
+        try:
+            return self.format_cache[key]
+        except KeyError:
+            rendered = self.format_cache[key] = render()
+            return rendered
+
 
 def get_formatter(format_type: str, article):
     for formatter_instance in get_all_formatters():
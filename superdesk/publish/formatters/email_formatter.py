@@ -57,7 +57,7 @@ class EmailFormatter(Formatter):
     def format(self, article, subscriber, codes=None):
         formatted_article = deepcopy(article)
         remove_all_embeds(formatted_article)
-        pub_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
+        pub_seq_num = self.generate_sequence_number(subscriber)
         doc = {}
         try:
             if formatted_article.get(FORMAT) == FORMATS.HTML:
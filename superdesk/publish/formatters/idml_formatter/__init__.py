@@ -25,7 +25,7 @@ class IDMLFormatter(Formatter):
 
     def format(self, article, subscriber, codes=None):
         try:
-            publish_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
+            publish_seq_num = self.generate_sequence_number(subscriber)
             idml_bytes = Converter().create_idml(article)
         except Exception as e:
             raise FormatterError.IDMLFormatterError(e, subscriber)
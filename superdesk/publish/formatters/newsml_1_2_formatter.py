@@ -59,7 +59,7 @@ class NewsML12Formatter(Formatter):
         :raises FormatterError: if the formatter fails to format an article
         """
         try:
-            pub_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
+            pub_seq_num = self.generate_sequence_number(subscriber)
             self.now = utcnow()
             self.string_now = self.now.strftime("%Y%m%dT%H%M%S+0000")
 
@@ -12,6 +12,7 @@
 
 import superdesk
 
+from copy import deepcopy
 from lxml import etree
 from lxml.etree import SubElement
 from flask import current_app as app
@@ -52,6 +53,8 @@ class NewsMLG2Formatter(Formatter):
     name = "NewsML G2"
     type = "newsmlg2"
 
+    format_depends_on = frozenset(["destination"])
+
     _message_nsmap = {
         None: "http://iptc.org/std/nar/2006-10-01/",
         "x": "http://www.w3.org/1999/xhtml",
@@ -80,23 +83,13 @@ class NewsMLG2Formatter(Formatter):
         """
         try:
             self.subscriber = subscriber
-            pub_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
-            is_package = self._is_package(article)
+            pub_seq_num = self.generate_sequence_number(subscriber)
             news_message = etree.Element("newsMessage", attrib=self._debug_message_extra, nsmap=self._message_nsmap)
             self._format_header(article, news_message, pub_seq_num)
-            item_set = self._format_item(news_message)
-            if is_package:
-                item = self._format_item_set(article, item_set, "packageItem")
-                self._format_groupset(article, item)
-            elif article[ITEM_TYPE] in {CONTENT_TYPE.PICTURE, CONTENT_TYPE.AUDIO, CONTENT_TYPE.VIDEO}:
-                item = self._format_item_set(article, item_set, "newsItem")
-                self._format_contentset(article, item)
-            else:
-                nitfFormater = NITFFormatter()
-                nitf = nitfFormater.get_nitf(article, subscriber, pub_seq_num)
-                newsItem = self._format_item_set(article, item_set, "newsItem")
-                self._format_content(article, newsItem, nitf)
-
+            item_set = self.render_cached(
+                article, lambda: self._format_article_item_set(article, subscriber, pub_seq_num)
+            )
+            news_message.append(deepcopy(item_set))
             sd_etree.fix_html_void_elements(news_message)
             return [
                 (
@@ -108,6 +101,31 @@ class NewsMLG2Formatter(Formatter):
         except Exception as ex:
             raise FormatterError.newmsmlG2FormatterError(ex, subscriber)
 
+    def _format_article_item_set(self, article, subscriber, pub_seq_num):
+        """Create the itemSet element with article content.
+
+        It's created outside of the newsMessage so it can be reused for other subscribers.
+
+        :param dict article:
+        :param dict subscriber:
+        :param int pub_seq_num:
+        :return Element: itemSet element
+        """
+        news_message = etree.Element("newsMessage", attrib=self._debug_message_extra, nsmap=self._message_nsmap)
+        item_set = self._format_item(news_message)
+        if self._is_package(article):
+            item = self._format_item_set(article, item_set, "packageItem")
+            self._format_groupset(article, item)
+        elif article[ITEM_TYPE] in {CONTENT_TYPE.PICTURE, CONTENT_TYPE.AUDIO, CONTENT_TYPE.VIDEO}:
+            item = self._format_item_set(article, item_set, "newsItem")
+            self._format_contentset(article, item)
+        else:
+            nitfFormater = NITFFormatter()
+            nitf = nitfFormater.get_nitf(article, subscriber, pub_seq_num)
+            newsItem = self._format_item_set(article, item_set, "newsItem")
+            self._format_content(article, newsItem, nitf)
+        return item_set
+
     def _is_package(self, article):
         """Given an article returns if it is a none takes package or not
 
@@ -166,6 +166,8 @@ class NINJSFormatter(Formatter):
 
     author_user_fields: Sequence[AuthorFields] = ("facebook", "twitter", "instagram")
 
+    format_depends_on = frozenset(["destination"])
+
     def __init__(self):
         self.can_preview = True
         self.can_export = True
@@ -173,10 +175,15 @@ class NINJSFormatter(Formatter):
 
     def format(self, article, subscriber, codes=None):
         try:
-            pub_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
+            pub_seq_num = self.generate_sequence_number(subscriber)
 
-            ninjs = self._transform_to_ninjs(article, subscriber)
-            return [(pub_seq_num, json.dumps(ninjs, default=json_serialize_datetime_objectId))]
+            formatted = self.render_cached(
+                article,
+                lambda: json.dumps(
+                    self._transform_to_ninjs(article, subscriber), default=json_serialize_datetime_objectId
+                ),
+            )
+            return [(pub_seq_num, formatted)]
         except Exception as ex:
             raise FormatterError.ninjsFormatterError(ex, subscriber)
 
@@ -296,10 +303,10 @@ class NINJSFormatter(Formatter):
 
         if ninjs["type"] == CONTENT_TYPE.TEXT and ("body_html" in ninjs or "body_text" in ninjs):
             if "body_html" in ninjs:
-                body_html = ninjs["body_html"]
-                word_count = text_utils.get_word_count(body_html)
-                char_count = text_utils.get_char_count(body_html)
-                readtime = text_utils.get_reading_time(body_html, word_count, article.get("language"))
+                metrics = text_utils.get_text_metrics(ninjs["body_html"])
+                word_count = metrics.word_count
+                char_count = metrics.char_count
+                readtime = metrics.get_reading_time(article.get("language"))
             else:
                 body_text = ninjs["body_text"]
                 word_count = text_utils.get_text_word_count(body_text)
@@ -27,6 +27,8 @@ class FTPNinjsFormatter(NINJSFormatter):
     name = "NINJS FTP"
     type = "ftp ninjs"
 
+    format_depends_on = frozenset(["subscriber", "destination"])
+
     def __init__(self):
         super().__init__()
         self.internal_renditions = []
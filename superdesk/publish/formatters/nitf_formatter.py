@@ -35,6 +35,8 @@ class NITFFormatter(Formatter):
     type = "nitf"
     name = "NITF"
 
+    format_depends_on = frozenset(["destination"])
+
     _message_attrib = {"version": "-//IPTC//DTD NITF 3.6//EN"}
 
     _schema_uri = "http://www.iptc.org/std/NITF/3.6/specification"
@@ -137,16 +139,16 @@ class NITFFormatter(Formatter):
 
     def format(self, article, subscriber, codes=None):
         try:
-            pub_seq_num = superdesk.get_resource_service("subscribers").generate_sequence_number(subscriber)
-
-            nitf = self.get_nitf(article, subscriber, pub_seq_num)
-            return [
-                (
-                    pub_seq_num,
-                    self.XML_ROOT
-                    + etree.tostring(nitf, pretty_print=True, encoding=self.ENCODING).decode(self.ENCODING),
-                )
-            ]
+            pub_seq_num = self.generate_sequence_number(subscriber)
+
+            formatted = self.render_cached(
+                article,
+                lambda: self.XML_ROOT
+                + etree.tostring(
+                    self.get_nitf(article, subscriber, pub_seq_num), pretty_print=True, encoding=self.ENCODING
+                ).decode(self.ENCODING),
+            )
+            return [(pub_seq_num, formatted)]
         except Exception as ex:
             raise FormatterError.nitfFormatterError(ex, subscriber)
 
@@ -8,10 +8,13 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import json
 import logging
+import threading
 import superdesk
 import superdesk.publish
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from eve.utils import config, ParsedRequest
 from flask import current_app as app
@@ -30,6 +33,12 @@ UPDATE_SCHEDULE_DEFAULT = {"seconds": 10}
 PUBLISH_QUEUE = "publish_queue"
 STATE_PENDING = "pending"
 
+#: stop fetching more items for subscriber after this time, must be lower than task soft time limit
+TRANSMIT_TIME_LIMIT = timedelta(seconds=300)
+
+#: number of successfully transmitted items updated at once
+TRANSMIT_STATE_BATCH_SIZE = 50
+
 
 class PublishContent(superdesk.Command):
     """Deliver items from ``publish_queue to destinations.``
@@ -122,6 +131,10 @@ def transmit_subscriber_items(subscriber, retries=False, priority=None):
         return
 
     try:
+        if app.config.get("PUBLISH_TRANSMIT_WORKERS"):
+            transmit_items_concurrently(subscriber, ordered=not is_async, retries=retries, priority=priority)
+            return
+
         queue_items = get_queue_items(retries, subscriber, priority)
         for queue_item in queue_items:
             args = [queue_item[config.ID_FIELD]]
@@ -141,6 +154,136 @@ def transmit_subscriber_items(subscriber, retries=False, priority=None):
         unlock(lock_name)
 
 
+def transmit_items_concurrently(subscriber, ordered=True, retries=False, priority=None):
+    """Transmit queue items of a subscriber using a thread pool.
+
+    Items are split into lanes per destination, lanes are transmitted in parallel.
+    If ``ordered`` each destination gets single lane which is transmitted in order
+    and stops on first error, otherwise items are spread to multiple lanes
+    according to ``PUBLISH_TRANSMIT_DESTINATION_CONCURRENCY`` config.
+
+    It's called while holding the subscriber lock so there is no lock per item,
+    items are set to ``in-progress`` and ``success`` in batches.
+
+    :param subscriber: subscriber id
+    :param ordered: keep order of items per destination
+    :param retries: transmit items to be retried
+    :param priority: transmit high priority items
+    """
+    started = utcnow()
+    publish_queue_service = get_resource_service(PUBLISH_QUEUE)
+    limit = app.config.get("MAX_TRANSMIT_QUERY_LIMIT", 100)
+    while True:
+        queue_items = list(get_queue_items(retries, subscriber, priority))
+        claimed_ids = set(publish_queue_service.claim_for_transmit([item[config.ID_FIELD] for item in queue_items]))
+        queue_items = [item for item in queue_items if item[config.ID_FIELD] in claimed_ids]
+        if not queue_items:
+            return
+
+        lanes = _get_transmit_lanes(queue_items, ordered)
+        batch = _TransmitStateBatch(publish_queue_service)
+        stop = threading.Event()
+        workers = min(app.config["PUBLISH_TRANSMIT_WORKERS"], len(lanes))
+        logger.info("Transmitting %d items for subscriber %s using %d lanes", len(queue_items), subscriber, len(lanes))
+        flask_app = app._get_current_object()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_transmit_lane, flask_app, lane, ordered, batch, stop) for lane in lanes]
+                completed = all([future.result() for future in futures])
+        except BaseException:
+            # soft time limit or other error in main thread, let lanes put back items not started yet
+            stop.set()
+            raise
+        finally:
+            batch.flush()
+
+        if not completed or len(queue_items) < limit or utcnow() - started > TRANSMIT_TIME_LIMIT:
+            return
+
+
+def _get_transmit_lanes(queue_items, ordered):
+    destinations = {}
+    for queue_item in queue_items:
+        destination = queue_item.get("destination") or {}
+        key = json.dumps(destination, sort_keys=True, default=str)
+        destinations.setdefault(key, []).append(queue_item)
+
+    lanes = []
+    concurrency = app.config.get("PUBLISH_TRANSMIT_DESTINATION_CONCURRENCY") or {}
+    for items in destinations.values():
+        size = 1 if ordered else max(1, concurrency.get(items[0]["destination"].get("delivery_type"), 1))
+        lanes.extend([items[i::size] for i in range(min(size, len(items)))])
+    return lanes
+
+
+def _transmit_lane(flask_app, queue_items, ordered, batch, stop):
+    """Transmit items of a single lane, return ``False`` if it stopped before transmitting all."""
+    with flask_app.app_context():
+        for index, queue_item in enumerate(queue_items):
+            # items were set in-progress in advance, put back those which won't be transmitted
+            if stop.is_set():
+                batch.release(queue_items[index:])
+                return False
+            if not _transmit_queue_item(queue_item, batch) and ordered:
+                batch.release(queue_items[index + 1 :])
+                return False
+        return True
+
+
+def _transmit_queue_item(queue_item, batch):
+    log_msg = (
+        "_id: {_id}  item_id: {item_id}  state: {state} "
+        "item_version: {item_version} headline: {headline}".format(**queue_item)
+    )
+    logger.info("Transmitting queue item {}".format(log_msg))
+    try:
+        transmitter = superdesk.publish.registered_transmitters[queue_item["destination"].get("delivery_type")]
+        transmitter.transmit(queue_item, update_status=False)
+    except Exception as e:
+        logger.exception("Failed to transmit queue item {}".format(log_msg))
+        _set_transmit_failed(queue_item, e)
+        return False
+    logger.info("Transmitted queue item {}".format(log_msg))
+    batch.add(queue_item)
+    return True
+
+
+class _TransmitStateBatch:
+    """Collects state updates of transmitted items and writes them in batches."""
+
+    def __init__(self, publish_queue_service):
+        self.service = publish_queue_service
+        self.lock = threading.Lock()
+        self.updates = []
+
+    def add(self, queue_item):
+        with self.lock:
+            self.updates.append(
+                (queue_item[config.ID_FIELD], {"state": QueueState.SUCCESS.value, "completed_at": utcnow()})
+            )
+            if len(self.updates) < TRANSMIT_STATE_BATCH_SIZE:
+                return
+            updates, self.updates = self.updates, []
+        self._write(updates)
+
+    def release(self, queue_items):
+        self._write(
+            [(item[config.ID_FIELD], {"state": item["state"]}) for item in queue_items],
+            lookup={"state": QueueState.IN_PROGRESS.value},
+        )
+
+    def flush(self):
+        with self.lock:
+            updates, self.updates = self.updates, []
+        self._write(updates)
+
+    def _write(self, updates, lookup=None):
+        try:
+            self.service.bulk_update_state(updates, lookup=lookup)
+        except Exception:
+            logger.exception("Failed to update state of %d publish queue items.", len(updates))
+
+
 @celery.task(soft_time_limit=300)
 def transmit_item(queue_item_id, is_async=False):
     publish_queue_service = get_resource_service(PUBLISH_QUEUE)
@@ -180,25 +323,7 @@ def transmit_item(queue_item_id, is_async=False):
         return True
     except Exception as e:
         logger.exception("Failed to transmit queue item {}".format(log_msg))
-
-        max_retry_attempt = app.config.get("MAX_TRANSMIT_RETRY_ATTEMPT")
-        retry_attempt_delay = app.config.get("TRANSMIT_RETRY_ATTEMPT_DELAY_MINUTES")
-        try:
-            orig_item = publish_queue_service.find_one(req=None, _id=queue_item["_id"])
-            timeout = 2 ** min(6, orig_item.get("retry_attempt", retry_attempt_delay))
-            updates = {config.LAST_UPDATED: utcnow()}
-
-            if orig_item.get("retry_attempt", 0) < max_retry_attempt and not isinstance(e, PublishHTTPPushClientError):
-                updates["retry_attempt"] = orig_item.get("retry_attempt", 0) + 1
-                updates["state"] = QueueState.RETRYING.value
-                updates["next_retry_attempt_at"] = utcnow() + timedelta(minutes=timeout)
-            else:
-                # all retry attempts exhausted marking the item as failed.
-                updates["state"] = QueueState.FAILED.value
-
-            publish_queue_service.system_update(orig_item.get(config.ID_FIELD), updates, orig_item)
-        except Exception:
-            logger.error("Failed to set the state for failed publish queue item {}.".format(queue_item["_id"]))
+        _set_transmit_failed(queue_item, e)
 
         # raise to stop transmitting items and free worker, in case there is some error
         # it's probably network related so trying more items now will probably only block
@@ -211,4 +336,27 @@ def transmit_item(queue_item_id, is_async=False):
             unlock(lock_name, remove=True)
 
 
+def _set_transmit_failed(queue_item, error):
+    """Set queue item to be retried later or mark it as failed when out of retry attempts."""
+    publish_queue_service = get_resource_service(PUBLISH_QUEUE)
+    max_retry_attempt = app.config.get("MAX_TRANSMIT_RETRY_ATTEMPT")
+    retry_attempt_delay = app.config.get("TRANSMIT_RETRY_ATTEMPT_DELAY_MINUTES")
+    try:
+        orig_item = publish_queue_service.find_one(req=None, _id=queue_item["_id"])
+        timeout = 2 ** min(6, orig_item.get("retry_attempt", retry_attempt_delay))
+        updates = {config.LAST_UPDATED: utcnow()}
+
+        if orig_item.get("retry_attempt", 0) < max_retry_attempt and not isinstance(error, PublishHTTPPushClientError):
+            updates["retry_attempt"] = orig_item.get("retry_attempt", 0) + 1
+            updates["state"] = QueueState.RETRYING.value
+            updates["next_retry_attempt_at"] = utcnow() + timedelta(minutes=timeout)
+        else:
+            # all retry attempts exhausted marking the item as failed.
+            updates["state"] = QueueState.FAILED.value
+
+        publish_queue_service.system_update(orig_item.get(config.ID_FIELD), updates, orig_item)
+    except Exception:
+        logger.error("Failed to set the state for failed publish queue item {}.".format(queue_item["_id"]))
+
+
 superdesk.command("publish:transmit", PublishContent())
@@ -9,13 +9,16 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
+from eve.utils import config
+from pymongo import UpdateOne
 from superdesk import get_resource_service
 from superdesk.notification import push_notification
 from superdesk.resource import Resource
 from superdesk.services import BaseService
 from superdesk.utils import SuperdeskBaseEnum
+from superdesk.utc import utcnow
 from flask import current_app as app
 
 logger = logging.getLogger(__name__)
@@ -94,14 +97,21 @@ class PublishQueueResource(Resource):
 class PublishQueueService(BaseService):
     def on_create(self, docs):
         subscriber_service = get_resource_service("subscribers")
+        docs_without_seq_num = {}
 
         for doc in docs:
             self._set_queue_state(doc, {})
             doc["moved_to_legal"] = False
 
             if "published_seq_num" not in doc:
-                subscriber = subscriber_service.find_one(req=None, _id=doc["subscriber_id"])
-                doc["published_seq_num"] = subscriber_service.generate_sequence_number(subscriber)
+                docs_without_seq_num.setdefault(doc["subscriber_id"], []).append(doc)
+
+        # reserve sequence numbers for all docs of a subscriber at once
+        for subscriber_id, subscriber_docs in docs_without_seq_num.items():
+            subscriber = subscriber_service.find_one(req=None, _id=subscriber_id)
+            seq_nums = subscriber_service.generate_sequence_numbers(subscriber, len(subscriber_docs))
+            for doc, seq_num in zip(subscriber_docs, seq_nums):
+                doc["published_seq_num"] = seq_num
 
     def on_updated(self, updates, original):
         if updates.get("state", "") != original.get("state", ""):
@@ -114,6 +124,74 @@ class PublishQueueService(BaseService):
                 error_message=updates.get("error_message"),
             )
 
+    def claim_for_transmit(self, queue_ids) -> List[Any]:
+        """Set all pending/retrying items from given list to in-progress using single update.
+
+        Items which were already picked by other process are skipped.
+
+        :param queue_ids: list of queue item ids
+        :return: list of ids of items claimed
+        """
+        if not queue_ids:
+            return []
+        started_at = utcnow()
+        collection = app.data.get_mongo_collection(self.datasource)
+        collection.update_many(
+            {
+                config.ID_FIELD: {"$in": queue_ids},
+                "state": {"$in": [QueueState.PENDING.value, QueueState.RETRYING.value]},
+            },
+            {
+                "$set": {
+                    "state": QueueState.IN_PROGRESS.value,
+                    "transmit_started_at": started_at,
+                    config.LAST_UPDATED: started_at,
+                }
+            },
+        )
+        claimed = collection.find(
+            {
+                config.ID_FIELD: {"$in": queue_ids},
+                "state": QueueState.IN_PROGRESS.value,
+                "transmit_started_at": started_at,
+            },
+            {config.ID_FIELD: 1},
+        )
+        claimed_ids = [doc[config.ID_FIELD] for doc in claimed]
+        if claimed_ids:
+            push_notification(
+                "publish_queue:update",
+                queue_ids=[str(_id) for _id in claimed_ids],
+                state=QueueState.IN_PROGRESS.value,
+            )
+        return claimed_ids
+
+    def bulk_update_state(self, updates: List[Tuple[Any, Dict[str, Any]]], lookup: Optional[Dict] = None):
+        """Update state of multiple queue items using single bulk write.
+
+        :param updates: list of ``(queue_id, updates)`` pairs, each updates must contain ``state``
+        :param lookup: additional filter for every item, eg. ``{"state": "in-progress"}``
+        """
+        if not updates:
+            return
+        now = utcnow()
+        app.data.get_mongo_collection(self.datasource).bulk_write(
+            [
+                UpdateOne(
+                    dict(lookup or {}, **{config.ID_FIELD: _id}),
+                    {"$set": dict(item_updates, **{config.LAST_UPDATED: now})},
+                )
+                for _id, item_updates in updates
+            ],
+            ordered=False,
+        )
+        for state in {item_updates["state"] for _id, item_updates in updates}:
+            push_notification(
+                "publish_queue:update",
+                queue_ids=[str(_id) for _id, item_updates in updates if item_updates["state"] == state],
+                state=state,
+            )
+
     def _set_queue_state(self, updates, original):
         destination = updates.get("destination", original.get("destination")) or {}
         updates["state"] = (
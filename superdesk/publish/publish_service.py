@@ -43,7 +43,13 @@ class PublishServiceBase:
         """Transmit media file. Implement in subclass"""
         raise NotImplementedError()
 
-    def transmit(self, queue_item):
+    def transmit(self, queue_item, update_status=True):
+        """Transmit queue item to its destination.
+
+        :param queue_item: the queued item document
+        :param update_status: set item state to ``success`` when done, when ``False``
+            it's up to the caller, so it can update multiple items at once
+        """
         subscriber = get_resource_service("subscribers").find_one(req=None, _id=queue_item["subscriber_id"])
 
         if not subscriber.get("is_active"):
@@ -61,7 +67,8 @@ class PublishServiceBase:
                     encoding = queue_item.get("item_encoding", "utf-8")
                     queue_item["encoded_item"] = queue_item["formatted_item"].encode(encoding, errors="replace")
                 self._transmit(queue_item, subscriber) or []
-                self.update_item_status(queue_item, "success")
+                if update_status:
+                    self.update_item_status(queue_item, "success")
             except SuperdeskPublishError as error:
                 self.update_item_status(queue_item, "error", error)
                 self.close_transmitter(subscriber, error)
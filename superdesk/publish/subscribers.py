@@ -12,6 +12,7 @@ import json
 import logging
 
 from copy import deepcopy
+from typing import List
 
 from flask import current_app as app
 from superdesk import get_resource_service
@@ -298,6 +299,15 @@ class SubscribersService(CacheableService):
         """
         Generates Published Sequence Number for the passed subscriber
         """
+        return self.generate_sequence_numbers(subscriber, 1)[0]
+
+    def generate_sequence_numbers(self, subscriber, count) -> List[int]:
+        """
+        Generates block of Published Sequence Numbers for the passed subscriber
+
+        :param subscriber: subscriber
+        :param count: number of sequence numbers to generate
+        """
 
         assert subscriber is not None, "Subscriber can't be null"
         min_seq_number = 1
@@ -306,8 +316,9 @@ class SubscribersService(CacheableService):
             min_seq_number = subscriber["sequence_num_settings"]["min"]
             max_seq_number = subscriber["sequence_num_settings"]["max"]
 
-        return get_resource_service("sequences").get_next_sequence_number(
+        return get_resource_service("sequences").reserve_sequence_numbers(
             key_name="subscribers_{_id})".format(_id=subscriber[config.ID_FIELD]),
+            count=count,
             max_seq_number=max_seq_number,
             min_seq_number=min_seq_number,
         )
@@ -0,0 +1,112 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2021 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import json
+import time
+import logging
+import threading
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from flask import current_app as app
+
+logger = logging.getLogger(__name__)
+
+
+def get_destination_key(destination) -> str:
+    """Get key identifying connection settings of a destination."""
+    return json.dumps(
+        [destination.get("delivery_type"), destination.get("config") or {}],
+        sort_keys=True,
+        default=str,
+    )
+
+
+class ConnectionPool:
+    """Thread safe pool of connections keyed by destination.
+
+    Connection is checked out for exclusive use and returned to the pool when done,
+    so it can be used for next item transmitted to same destination. Connections idle
+    for longer than ``PUBLISH_CONNECTION_IDLE_TIMEOUT`` seconds are closed.
+
+    :param connect: function creating new connection for given destination
+    :param close: function closing connection
+    :param check: function returning ``True`` if idle connection can be still used
+    """
+
+    #: max number of idle connections kept per destination
+    max_idle = 4
+
+    def __init__(
+        self,
+        connect: Callable[[Dict], Any],
+        close: Callable[[Any], None],
+        check: Optional[Callable[[Any], bool]] = None,
+    ):
+        self._connect = connect
+        self._close = close
+        self._check = check
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[Tuple[float, Any]]] = {}
+
+    @contextmanager
+    def connection(self, destination):
+        """Get connection for given destination.
+
+        Use with ``with``, the connection is closed if there is an exception.
+
+        :param destination: queue item destination
+        """
+        key = get_destination_key(destination)
+        conn = self._get_idle(key) or self._connect(destination)
+        try:
+            yield conn
+        except BaseException:
+            self._safe_close(conn)
+            raise
+        else:
+            self._put_idle(key, conn)
+
+    def clear(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _released, conn in connections:
+                self._safe_close(conn)
+
+    def _get_idle(self, key):
+        timeout = app.config.get("PUBLISH_CONNECTION_IDLE_TIMEOUT", 60)
+        while True:
+            with self._lock:
+                try:
+                    released, conn = self._idle.get(key, []).pop()
+                except IndexError:
+                    return None
+            if time.monotonic() - released < timeout and (self._check is None or self._check(conn)):
+                return conn
+            self._safe_close(conn)
+
+    def _put_idle(self, key, conn):
+        if not app.config.get("PUBLISH_CONNECTION_IDLE_TIMEOUT", 60):
+            self._safe_close(conn)
+            return
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle:
+                connections.append((time.monotonic(), conn))
+                return
+        self._safe_close(conn)
+
+    def _safe_close(self, conn):
+        try:
+            self._close(conn)
+        except Exception:
+            logger.debug("Error when closing connection %s", conn, exc_info=True)
@@ -15,8 +15,9 @@ from urllib.parse import urlparse
 from io import BytesIO
 from flask import current_app as app
 
-from superdesk.ftp import ftp_connect
+from superdesk.ftp import get_ftp_connection
 from superdesk.publish import register_transmitter, registered_transmitter_file_providers
+from superdesk.publish.transmitters.connection_pool import ConnectionPool
 from superdesk.publish.publish_service import get_publish_service, PublishService
 from superdesk.errors import PublishFtpError
 from superdesk.media.renditions import get_rendition_file_name
@@ -26,6 +27,22 @@ errors = [PublishFtpError.ftpError().get_error_description()]
 logger = logging.getLogger(__name__)
 
 
+def _is_alive(ftp):
+    try:
+        ftp.voidcmd("NOOP")
+    except Exception:
+        return False
+    return True
+
+
+#: ftp connections reused for items sent to same destination, checked using ``NOOP`` before reuse
+connections = ConnectionPool(
+    connect=lambda destination: get_ftp_connection(destination.get("config", {})),
+    close=lambda ftp: ftp.close(),
+    check=_is_alive,
+)
+
+
 class FTPPublishService(PublishService):
     """FTP Publish Service.
 
@@ -67,7 +84,7 @@ class FTPPublishService(PublishService):
         config = queue_item.get("destination", {}).get("config", {})
 
         try:
-            with ftp_connect(config) as ftp:
+            with connections.connection(queue_item.get("destination", {})) as ftp:
                 if config.get("push_associated", False):
                     # Set the working directory for the associated files
                     if "associated_path" in config and config.get("associated_path"):
@@ -94,15 +111,25 @@ class FTPPublishService(PublishService):
         for get_files in registered_transmitter_file_providers:
             media.update(get_files(self.NAME, item))
 
-        # Retrieve the list of files that currently exist in the FTP server
-        remote_items = []
-        ftp.retrlines("LIST", remote_items.append)
+        if not media:
+            return
 
+        existing = self._get_existing_media(media, ftp)
         for media_id, rendition in media.items():
-            if not self._media_exists(rendition, remote_items):
+            if media_id not in existing:
                 binary = app.media.get(media_id, resource=rendition.get("resource", "upload"))
                 self._transmit_media(binary, rendition, ftp)
 
+    def _get_existing_media(self, media, ftp):
+        """Get set of media ids which already exist in current directory using single ``LIST`` command.
+
+        :param media: dict of renditions by media id
+        :param ftp: ftp connection
+        """
+        remote_items = []
+        ftp.retrlines("LIST", remote_items.append)
+        return {media_id for media_id, rendition in media.items() if self._media_exists(rendition, remote_items)}
+
     def _media_exists(self, rendition, items):
         for file in items:
             if get_rendition_file_name(rendition) in file:
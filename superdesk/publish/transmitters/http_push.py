@@ -13,8 +13,10 @@ import hmac
 import logging
 import requests
 
+from contextlib import contextmanager
 from flask import current_app as app
 from superdesk.publish import register_transmitter, registered_transmitter_file_providers
+from superdesk.publish.transmitters.connection_pool import ConnectionPool
 
 from superdesk.errors import PublishHTTPPushError, PublishHTTPPushServerError, PublishHTTPPushClientError
 from superdesk.publish.publish_queue import PUBLISHED_IN_PACKAGE
@@ -23,6 +25,9 @@ from superdesk.publish.publish_service import PublishService
 errors = [PublishHTTPPushError.httpPushError().get_error_description()]
 logger = logging.getLogger(__name__)
 
+#: keep-alive sessions reused for items pushed to same destination
+sessions = ConnectionPool(connect=lambda destination: requests.Session(), close=lambda session: session.close())
+
 
 class HTTPPushService(PublishService):
     """HTTP Publish Service.
@@ -84,15 +89,26 @@ class HTTPPushService(PublishService):
         item = json.loads(queue_item["formatted_item"])
         destination = queue_item.get("destination", {})
 
-        self._copy_published_media_files(json.loads(queue_item["formatted_item"]), destination)
+        with self._session(destination) as session:
+            self._copy_published_media_files(json.loads(queue_item["formatted_item"]), destination, session)
+
+            if not queue_item.get(PUBLISHED_IN_PACKAGE) or not destination.get("config", {}).get("packaged", False):
+                self._push_item(destination, json.dumps(item), session)
 
-        if not queue_item.get(PUBLISHED_IN_PACKAGE) or not destination.get("config", {}).get("packaged", False):
-            self._push_item(destination, json.dumps(item))
+    @contextmanager
+    def _session(self, destination, session=None):
+        """Get session for destination, reusing one from pool if not provided."""
+        if session is not None:
+            yield session
+            return
+        with sessions.connection(destination) as session:
+            yield session
 
-    def _push_item(self, destination, data):
+    def _push_item(self, destination, data, session=None):
         resource_url = self._get_resource_url(destination)
         headers = self._get_headers(data, destination, self.headers)
-        response = requests.post(resource_url, data=data, headers=headers, timeout=self._get_timeout())
+        with self._session(destination, session) as session:
+            response = session.post(resource_url, data=data, headers=headers, timeout=self._get_timeout())
 
         # need to rethrow exception as a superdesk exception for now for notifiers.
         try:
@@ -102,13 +118,13 @@ class HTTPPushService(PublishService):
             message = "Error pushing item %s: %s" % (response.status_code, response.text)
             self._raise_publish_error(response.status_code, Exception(message), destination)
 
-    def _copy_published_media_files(self, item, destination):
+    def _copy_published_media_files(self, item, destination, session=None):
         """Copy the media files for the given item to the publish_items endpoint
 
         @param item: the item object
         @type item: dict
-        @param assets_url: the url where the media can be uploaded
-        @type assets_url: string
+        @param destination: the destination with assets url where the media can be uploaded
+        @type destination: dict
         """
 
         assets_url = self._get_assets_url(destination)
@@ -120,27 +136,32 @@ class HTTPPushService(PublishService):
         for get_files in registered_transmitter_file_providers:
             media.update(get_files(self.NAME, item))
 
-        for media_id, rendition in media.items():
-            if not self._media_exists(media_id, destination):
-                binary = app.media.get(media_id, resource=rendition.get("resource", "upload"))
-                self._transmit_media(binary, destination, exists=False)
-
-    def _transmit_media(self, media, destination, exists=None):
-        if exists is None:
-            exists = self._media_exists(media._id, destination)
-        if exists:
+        if not media:
             return
-        mimetype = getattr(media, "content_type", "image/jpeg")
-        data = {"media_id": str(media._id)}
-        files = {"media": (str(media._id), media, mimetype)}
-        s = requests.Session()
-        assets_url = self._get_assets_url(destination)
-        request = requests.Request("POST", assets_url)
-        prepped = request.prepare()
-        prepped.prepare_body(data, files)
-        headers = self._get_headers(prepped.body, destination, prepped.headers)
-        prepped.prepare_headers(headers)
-        response = s.send(prepped, timeout=self._get_timeout())
+
+        with self._session(destination, session) as session:
+            existing = self._get_existing_media(media.keys(), destination, session)
+            for media_id, rendition in media.items():
+                if media_id not in existing:
+                    binary = app.media.get(media_id, resource=rendition.get("resource", "upload"))
+                    self._transmit_media(binary, destination, exists=False, session=session)
+
+    def _transmit_media(self, media, destination, exists=None, session=None):
+        with self._session(destination, session) as session:
+            if exists is None:
+                exists = self._media_exists(media._id, destination, session)
+            if exists:
+                return
+            mimetype = getattr(media, "content_type", "image/jpeg")
+            data = {"media_id": str(media._id)}
+            files = {"media": (str(media._id), media, mimetype)}
+            assets_url = self._get_assets_url(destination)
+            request = requests.Request("POST", assets_url)
+            prepped = request.prepare()
+            prepped.prepare_body(data, files)
+            headers = self._get_headers(prepped.body, destination, prepped.headers)
+            prepped.prepare_headers(headers)
+            response = session.send(prepped, timeout=self._get_timeout())
         if response.status_code not in (200, 201):
             self._raise_publish_error(
                 response.status_code,
@@ -148,19 +169,32 @@ class HTTPPushService(PublishService):
                 destination,
             )
 
-    def _media_exists(self, media_id, destination):
+    def _get_existing_media(self, media_ids, destination, session=None):
+        """Get set of media ids which already exist at the assets service.
+
+        All requests are done using single keep-alive session.
+
+        :param media_ids: media ids to check
+        :param destination: destination with assets url
+        :return: set of existing media ids
+        """
+        with self._session(destination, session) as session:
+            return {media_id for media_id in media_ids if self._media_exists(media_id, destination, session)}
+
+    def _media_exists(self, media_id, destination, session=None):
         """Returns true if the media with the given id exists at the service identified by assets_url.
 
         Returns false otherwise. Raises Exception if the error code was not 200 or 404
 
         @param media_id: the media identifier
         @type media_id: string
-        @param assets_url: the url of the assest service
-        @type assets_url: string
+        @param destination: the destination with url of the assets service
+        @type destination: dict
         @return: bool
         """
         assets_url = self._get_assets_url(destination, media_id)
-        response = requests.get(assets_url, timeout=self._get_timeout())
+        with self._session(destination, session) as session:
+            response = session.get(assets_url, timeout=self._get_timeout())
         if response.status_code not in (requests.codes.ok, requests.codes.not_found):  # @UndefinedVariable
             self._raise_publish_error(
                 response.status_code, Exception("Error querying the assets service %s" % assets_url), destination
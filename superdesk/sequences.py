@@ -1,5 +1,7 @@
 import superdesk
 import traceback
+
+from typing import List
 from superdesk import get_resource_service
 from .resource import Resource
 from .services import BaseService
@@ -40,21 +42,55 @@ class SequencesService(BaseService):
         :param min_seq_num: default 1, init value, sequence will start from the NEXT one
         :returns: sequence number
         """
+        numbers = self.reserve_sequence_numbers(
+            key_name, 1, max_seq_number=max_seq_number, min_seq_number=min_seq_number
+        )
+        return numbers[0]
+
+    def reserve_sequence_numbers(self, key_name, count, max_seq_number=None, min_seq_number=1) -> List[int]:
+        """
+        Reserve block of sequence numbers using single atomic update
+
+        Stored counter is allowed to get over ``max_seq_number`` and numbers
+        are wrapped into ``min_seq_number`` - ``max_seq_number`` range,
+        so there is no race when multiple processes wrap the sequence at once.
+        Counters below ``min_seq_number`` are used as they are till they get over ``max_seq_number``.
+
+        :param key_name: key to identify the sequence
+        :param count: how many numbers to reserve
+        :param max_seq_number: default None, maximal possible value, None means no upper limit
+        :param min_seq_number: default 1, init value, sequence will start from the NEXT one
+        :returns: list of sequence numbers
+        """
         if not key_name:
             logger.error("Empty sequence key is used: {}".format("\n".join(traceback.format_stack())))
             raise KeyError("Sequence key cannot be empty")
 
+        if count < 1:
+            return []
+
         target_resource = get_resource_service("sequences")
-        sequence_number = target_resource.find_and_modify(
-            query={"key": key_name}, update={"$inc": {"sequence_number": 1}}, upsert=True, new=True
+        last_number = target_resource.find_and_modify(
+            query={"key": key_name}, update={"$inc": {"sequence_number": count}}, upsert=True, new=True
         ).get("sequence_number")
 
-        if max_seq_number:
-            if sequence_number > max_seq_number:
-                target_resource.find_and_modify(
-                    query={"key": key_name}, update={"$set": {"sequence_number": min_seq_number}}
-                )
+        numbers = list(range(last_number - count + 1, last_number + 1))
+        if not max_seq_number:
+            return numbers
 
-                sequence_number = min_seq_number
+        size = max_seq_number - min_seq_number + 1
+        if last_number > max_seq_number:
+            # move the counter back by multiple of the range size, it doesn't change numbers
+            # generated later so it's safe even when other process did it already,
+            # the query makes sure it won't get below min_seq_number
+            times = (last_number - max_seq_number + size - 1) // size
+            target_resource.find_and_modify(
+                query={"key": key_name, "sequence_number": {"$gt": max_seq_number + (times - 1) * size}},
+                update={"$inc": {"sequence_number": -times * size}},
+            )
 
-        return sequence_number
+        # counters below min_seq_number are used as they are until they reach max_seq_number
+        return [
+            number if number < min_seq_number else min_seq_number + (number - min_seq_number) % size
+            for number in numbers
+        ]
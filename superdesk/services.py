@@ -18,7 +18,7 @@ from eve.utils import ParsedRequest, config
 from eve.methods.common import resolve_document_etag
 from superdesk.errors import SuperdeskApiError
 from superdesk.utc import utcnow
-from superdesk.cache import cache
+from superdesk.cache import cache, register_resource_tag
 
 
 logger = logging.getLogger(__name__)
@@ -283,6 +283,11 @@ class CacheableService(BaseService):
     datasource: str
     cache_lookup = {}
 
+    def __init__(self, datasource: Optional[str] = None, backend=None):
+        super().__init__(datasource, backend)
+        if datasource:
+            register_resource_tag(datasource)
+
     @property
     def cache_key(self) -> str:
         return "cached:{}".format(self.datasource)
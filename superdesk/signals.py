@@ -27,6 +27,8 @@ __all__ = [
     "archived_item_removed",
     "item_resend",
     "item_resent",
+    "lock_acquire",
+    "lock_release",
 ]
 
 signals = blinker.Namespace()
@@ -177,6 +179,28 @@ item_resend = signals.signal("item:resend")
 #: :param item: item that was resent
 item_resent = signals.signal("item:resent")
 
+#: Sent after trying to get a lock, use it to monitor lock contention
+#:
+#: .. versionadded:: 2.9
+#:
+#: :param sender: lock backend
+#: :param task: lock name
+#: :param host: lock owner
+#: :param acquired: ``True`` if lock was acquired
+#: :param waited: seconds spent waiting for the lock
+lock_acquire = signals.signal("lock:acquire")
+
+#: Sent after a lock is released, use it to monitor lock hold times
+#:
+#: .. versionadded:: 2.9
+#:
+#: :param sender: lock backend
+#: :param task: lock name
+#: :param host: lock owner
+#: :param held: seconds the lock was held, ``None`` if it was not acquired
+#:     by this process or there was no receiver when it was acquired
+lock_release = signals.signal("lock:release")
+
 
 def connect(signal, subscriber):
     """Connect to signal"""
@@ -18,6 +18,7 @@ import superdesk
 
 from typing import Callable, List, Tuple
 from flask import Blueprint, current_app as app
+from superdesk.cache import get_cache_stats
 
 
 bp = Blueprint("system", __name__)
@@ -77,5 +78,11 @@ def health():
     return output
 
 
+@bp.route("/system/cache", methods=["GET", "OPTIONS"])
+def cache_stats():
+    """Get cache hit/miss and invalidation statistics for the process handling the request."""
+    return get_cache_stats()
+
+
 def init_app(app) -> None:
     superdesk.blueprint(bp, app)
@@ -82,6 +82,7 @@ def update_config(conf):
     conf["VERSION"] = "_current_version"
     conf["SECRET_KEY"] = "test-secret"
     conf["JSON_SORT_KEYS"] = True
+    conf["NOTIFICATION_QUEUE_SIZE"] = 0
     conf["ELASTICSEARCH_INDEXES"] = {
         "archived": "sptest_archived",
         "archive": "sptest_archive",
@@ -487,7 +488,12 @@ class NotificationMock:
         self.open = True
 
     def send(self, message):
-        self.messages.append(message)
+        data = json.loads(message)
+        if isinstance(data, list):
+            # batch of notifications
+            self.messages.extend(json.dumps(item) for item in data)
+        else:
+            self.messages.append(message)
 
     def reset(self):
         self.messages = []
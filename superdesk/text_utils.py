@@ -10,7 +10,11 @@
 
 import re
 import regex
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from functools import cached_property
 from lxml import etree  # noqa
 from superdesk import etree as sd_etree
 from lxml import html as lxml_html
@@ -22,6 +26,19 @@ import html
 logger = logging.getLogger(__name__)
 
 
+# characters which can change the text when it is parsed as xml
+XML_SPECIAL_CHARS_RE = regex.compile("[<&\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+NUMBERS_SEPARATOR_RE = regex.compile(r"([0-9]) ([0-9])", regex.MULTILINE | regex.UNICODE)
+NOT_WORD_CHARS_RE = regex.compile(r"[^\p{L} 0-9]", regex.MULTILINE | regex.UNICODE)
+MULTIPLE_SPACES_RE = regex.compile(r" {2,}", regex.MULTILINE | regex.UNICODE)
+
+#: number of :class:`TextMetrics` kept by :func:`get_text_metrics`
+TEXT_METRICS_CACHE_SIZE = 100
+
+_text_metrics_cache = OrderedDict()  # type: OrderedDict[str, TextMetrics]
+_text_metrics_lock = threading.Lock()
+
+
 # KEEP CHANGES IN SYNC WITH CLIENT FUNCTION `countWords`
 # regex is used instead re to support unicode letter matching with \p{L}
 def get_text_word_count(text):
@@ -30,32 +47,111 @@ def get_text_word_count(text):
     :param str text: text string
     :return int: word count
     """
-
-    flags = regex.MULTILINE | regex.UNICODE
     initial_text_trimmed = text.strip()
 
     if len(initial_text_trimmed) < 1:
         return 0
 
-    r0 = get_text(initial_text_trimmed, space_on_elements=True)
+    if XML_SPECIAL_CHARS_RE.search(initial_text_trimmed):
+        r0 = get_text(initial_text_trimmed, space_on_elements=True)
+    else:
+        # there is no markup, avoid parsing it again
+        r0 = initial_text_trimmed
 
-    r1 = regex.sub(r"\n", " ", r0, flags=flags)
+    r1 = r0.replace("\n", " ")
 
     # Remove spaces between two numbers
     # 1 000 000 000 -> 1000000000
-    r2 = regex.sub(r"([0-9]) ([0-9])", "\\1\\2", r1, flags=flags)
+    r2 = NUMBERS_SEPARATOR_RE.sub("\\1\\2", r1)
 
     # remove anything that is not a unicode letter, a space or a number
-    r3 = regex.sub(r"[^\p{L} 0-9]", "", r2, flags=flags)
+    r3 = NOT_WORD_CHARS_RE.sub("", r2)
 
     # replace two or more spaces with one space
-    r4 = regex.sub(r" {2,}", " ", r3, flags=flags)
+    r4 = MULTIPLE_SPACES_RE.sub(" ", r3)
 
     result = len(r4.strip().split(" "))
 
     return result
 
 
+class TextMetrics:
+    """Word, character and paragraph counts of html content.
+
+    Counts are computed when first used and kept, html is parsed only once
+    for word and paragraph counts, and once for character count.
+    Use :func:`get_text_metrics` to get metrics shared for the same content.
+
+    :param str html: html content
+    """
+
+    def __init__(self, html):
+        if not isinstance(html, str):
+            raise ValueError("a string is expected")
+        self.html = html
+
+    @cached_property
+    def _html_counts(self):
+        try:
+            root = sd_etree.parse_html(self.html, content="html", lf_on_block=True)
+        except etree.ParseError:
+            return get_text_word_count(self.html), 0
+        # line feeds are only added to tails, so they don't affect paragraphs text
+        par_count = len([p for p in root.iterfind(".//p") if p.text and len(p.text.strip()) > 0])
+        text = etree.tostring(root, encoding="unicode", method="text")
+        return get_text_word_count(text), par_count
+
+    @cached_property
+    def _text(self):
+        return get_text(self.html)
+
+    @property
+    def word_count(self):
+        return self._html_counts[0]
+
+    @property
+    def par_count(self):
+        return self._html_counts[1]
+
+    @property
+    def char_count(self):
+        return len(self._text)
+
+    def get_reading_time(self, language=None):
+        """Get estimated number of minutes to read the text.
+
+        :param str language: language of the text
+        """
+        if language and language.startswith("ja"):
+            return round(len(re.sub(r"[\s]", "", self._text)) / app.config["JAPANESE_CHARACTERS_PER_MINUTE"])
+        return get_reading_time_from_word_count(self.word_count)
+
+
+def get_text_metrics(html):
+    """Get :class:`TextMetrics` for given html.
+
+    Metrics are cached by content hash, so counting words, characters
+    and paragraphs of the same content parses it only once.
+
+    :param str html: html content
+    :return TextMetrics: text metrics
+    """
+    if not isinstance(html, str):
+        raise ValueError("a string is expected")
+    key = hashlib.sha1(html.encode("utf-8", "surrogatepass")).hexdigest()
+    with _text_metrics_lock:
+        metrics = _text_metrics_cache.get(key)
+        if metrics is not None:
+            _text_metrics_cache.move_to_end(key)
+            return metrics
+    metrics = TextMetrics(html)
+    with _text_metrics_lock:
+        _text_metrics_cache[key] = metrics
+        while len(_text_metrics_cache) > TEXT_METRICS_CACHE_SIZE:
+            _text_metrics_cache.popitem(last=False)
+    return metrics
+
+
 def get_text(markup, content="xml", lf_on_block=False, space_on_elements=False, space=" "):
     """Get plain text version of (X)HTML or other XML element
 
@@ -91,7 +187,7 @@ def get_word_count(markup, no_html=False):
     if no_html:
         return get_text_word_count(get_text(markup, content="xml", space_on_elements=True))
     else:
-        return get_text_word_count(get_text(markup, content="html", lf_on_block=True))
+        return get_text_metrics(markup).word_count
 
 
 def update_word_count(update, original=None):
@@ -101,7 +197,7 @@ def update_word_count(update, original=None):
     :param original: original document if updated
     """
     if update.get("body_html"):
-        update.setdefault("word_count", get_word_count(update.get("body_html")))
+        update.setdefault("word_count", get_text_metrics(update["body_html"]).word_count)
     else:
         # If the body is removed then set the count to zero
         if original and "word_count" in original and "body_html" in update:
@@ -114,13 +210,12 @@ def get_char_count(html):
     :param html: html string to count
     :return int: count of chars inside the text
     """
-    return len(get_text(html))
+    return get_text_metrics(html).char_count
 
 
 def get_par_count(html):
     try:
-        elem = sd_etree.parse_html(html, content="html")
-        return len([p for p in elem.iterfind(".//p") if p.text and len(p.text.strip()) > 0])
+        return get_text_metrics(html).par_count
     except ValueError as e:
         logger.warning(e)
 
@@ -138,10 +233,17 @@ def get_reading_time(html, word_count=None, language=None):
     :param str language: language of the text
     :return int: estimated number of minute to read the text
     """
-    if language and language.startswith("ja"):
-        return round(len(re.sub(r"[\s]", "", get_text(html))) / app.config["JAPANESE_CHARACTERS_PER_MINUTE"])
-    if not word_count:
-        word_count = get_word_count(html)
+    if (language and language.startswith("ja")) or not word_count:
+        return get_text_metrics(html).get_reading_time(language)
+    return get_reading_time_from_word_count(word_count)
+
+
+def get_reading_time_from_word_count(word_count):
+    """Get estimated number of minutes to read a text with given number of words.
+
+    :param int word_count: number of words in the text
+    :return int: estimated number of minute to read the text
+    """
     reading_time_float = word_count / 250
     reading_time_minutes = int(reading_time_float)
     reading_time_rem_sec = int((reading_time_float - reading_time_minutes) * 60)
@@ -11,7 +11,13 @@
 import superdesk
 
 from superdesk.signals import item_published
-from .vocabularies import VocabulariesResource, VocabulariesService, is_related_content
+from .vocabularies import (  # noqa
+    VocabulariesResource,
+    VocabulariesService,
+    VocabularyLookup,
+    is_related_content,
+    get_vocabulary_lookup,
+)
 from .commands import UpdateVocabulariesInItemsCommand  # noqa
 from .keywords import add_missing_keywords
 from flask_babel import _, lazy_gettext
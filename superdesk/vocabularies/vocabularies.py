@@ -17,7 +17,7 @@ from flask import request, current_app as app
 from eve.utils import config
 from eve.methods.common import serialize_value
 from flask_babel import _, lazy_gettext
-from superdesk.cache import cache
+from superdesk.cache import cache, query_tags, document_tag, get_tags_version
 
 from superdesk import privilege, get_resource_service
 from superdesk.notification import push_notification
@@ -527,7 +527,7 @@ class VocabulariesService(BaseService):
         return cv and cv.get("field_options") or {}
 
 
-@cache(ttl=3600, tags=("vocabularies",))
+@cache(ttl=3600, tags=query_tags("vocabularies", ["field_type"]))
 def get_related_field_ids():
     return list(
         get_resource_service("vocabularies").get_from_mongo(
@@ -536,6 +536,82 @@ def get_related_field_ids():
     )
 
 
+class VocabularyLookup:
+    """Vocabulary items indexed by qcode.
+
+    Items are shared by all users of the lookup, so these must not be modified.
+
+    :param vocabulary: vocabulary document
+    """
+
+    def __init__(self, vocabulary):
+        self.items = vocabulary.get("items") or []  # type: List[Dict]
+        self._indexes = {}  # type: Dict[Any, List[int]]
+        self._lower_indexes = {}  # type: Dict[str, List[int]]
+        self._locale_items = {}  # type: Dict[str, List[Dict]]
+        for index, item in enumerate(self.items):
+            qcode = item.get("qcode")
+            if qcode is None:
+                continue
+            self._indexes.setdefault(qcode, []).append(index)
+            if isinstance(qcode, str):
+                self._lower_indexes.setdefault(qcode.lower(), []).append(index)
+
+    def get(self, qcode, language=None, ignore_case=False, active=True) -> Optional[Dict]:
+        """Get first item with given qcode.
+
+        :param qcode: item qcode
+        :param language: return item with fields translated to given language
+        :param ignore_case: compare qcodes case insensitive
+        :param active: return only active items
+        """
+        if ignore_case and isinstance(qcode, str):
+            indexes = self._lower_indexes.get(qcode.lower(), [])
+        else:
+            indexes = self._indexes.get(qcode, [])
+        items = self._get_items(language)
+        return next((items[index] for index in indexes if not active or items[index].get("is_active")), None)
+
+    def find(self, qcodes, language=None, active=True) -> List[Dict]:
+        """Get items with any of given qcodes, in vocabulary order.
+
+        :param qcodes: item qcodes
+        :param language: return items with fields translated to given language
+        :param active: return only active items
+        """
+        indexes = sorted({index for qcode in qcodes for index in self._indexes.get(qcode, [])})
+        items = self._get_items(language)
+        return [items[index] for index in indexes if not active or items[index].get("is_active")]
+
+    def _get_items(self, language):
+        if not language:
+            return self.items
+        if language not in self._locale_items:
+            self._locale_items[language] = get_resource_service("vocabularies").get_locale_vocabulary(
+                self.items, language
+            )
+        return self._locale_items[language]
+
+
+def get_vocabulary_lookup(_id) -> Optional[VocabularyLookup]:
+    """Get lookup for vocabulary with given id or ``None`` if there is no such vocabulary.
+
+    Lookups are kept in process memory, so these are shared by all tasks in a worker,
+    and rebuilt once vocabulary is updated.
+
+    :param _id: vocabulary id
+    """
+    version = get_tags_version([document_tag("vocabularies", _id)])
+    lookups = app.extensions.setdefault("superdesk_vocabulary_lookups", {})
+    cached = lookups.get(_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    vocabulary = get_resource_service("vocabularies").find_one(req=None, _id=_id)
+    lookup = VocabularyLookup(vocabulary) if vocabulary else None
+    lookups[_id] = (version, lookup)
+    return lookup
+
+
 def is_related_content(item_name, related_content=None):
     if related_content is None:
         related_content = get_related_field_ids()
@@ -14,17 +14,20 @@ import arrow
 import logging
 import asyncio
 import signal
+import threading
 import websockets
 
+from collections import deque
+from functools import partial
 from uuid import UUID
 from urllib.parse import urlparse, parse_qs
 from websockets.server import WebSocketServerProtocol
-from typing import Dict, Set, Optional, Union
+from typing import Deque, Dict, Iterable, List, Set, Optional, Tuple, Union
 from superdesk.types import WebsocketMessageData, WebsocketMessageFilterConditions
 
 from flask import json
 from datetime import timedelta, datetime
-from kombu import Queue, Exchange, Connection
+from kombu import Queue, Exchange, Connection, Message
 from kombu.mixins import ConsumerMixin
 from kombu.pools import producers
 from kombu.common import Broadcast
@@ -105,42 +108,95 @@ class SocketMessageConsumer(SocketBrokerClient, ConsumerMixin):
 
     queue: Queue
 
-    def __init__(self, url, callback, exchange_name):
+    def __init__(self, url, callback, exchange_name, loop=None, prefetch_count=100):
         """Create consumer.
 
+        When ``loop`` is set the callback is scheduled on that loop, so the consumer thread
+        can keep reading from broker while the server loop is sending messages. Number of
+        messages being processed is limited by ``prefetch_count``.
+
         :param string url: Broker URL
-        :param string host: host name running the websocket server
         :param callback: callback function to call on message arrival
+        :param string exchange_name: exchange name
+        :param loop: event loop running the callback
+        :param int prefetch_count: max number of messages fetched from broker and not processed yet
         """
         super().__init__(url, exchange_name)
         self.callback = callback
+        self.loop = loop
+        self.prefetch_count = max(1, prefetch_count)
+        self.ack_batch_size = max(1, self.prefetch_count // 2)
+        self.processing = threading.BoundedSemaphore(self.prefetch_count)
+        self.unacked: List[Message] = []
         self.queue = Broadcast(exchange=self.socket_exchange)
         logger.info("Websocket queue created %s", self.queue.name)
 
     def get_consumers(self, Consumer, channel):
-        return [Consumer(queues=[self.queue], callbacks=[self.on_message])]
+        return [Consumer(queues=[self.queue], callbacks=[self.on_message], prefetch_count=self.prefetch_count)]
 
     def on_message(self, body, message):
         """
         Event fired when message is received by the queue
 
+        Messages are acked in batches, see :meth:`ack_messages`.
+
         :param str body:
         :param kombu.Message message: Message object
         """
+        logger.debug("Queue: {}. Broadcasting message {}".format(self.queue.name, body))
+        if self.loop is None:
+            self._run_callback(body)
+        else:
+            self._schedule_callback(body)
+        self.unacked.append(message)
+        if len(self.unacked) >= self.ack_batch_size:
+            self.ack_messages()
+
+    def on_iteration(self):
+        # called before waiting for next messages, so there are no messages left unacked when idle
+        self.ack_messages()
+
+    def ack_messages(self):
+        """Ack messages received so far."""
+        messages, self.unacked = self.unacked, []
+        if not messages:
+            return
+        try:
+            if self.connection.transport.driver_type == "amqp":
+                messages[-1].ack(multiple=True)
+            else:
+                for message in messages:
+                    message.ack()
+        except Exception:
+            logger.exception("Failed to ack {} messages on queue {}.".format(len(messages), self.queue.name))
+
+    def _run_callback(self, body):
         try:
             try:
                 loop = asyncio.get_event_loop()
             except Exception:
                 loop = asyncio.new_event_loop()
-
-            logger.debug("Queue: {}. Broadcasting message {}".format(self.queue.name, body))
             loop.run_until_complete(self.callback(body))
         except Exception:
             logger.exception("Dropping event. Failed to send message {}.".format(body))
+
+    def _schedule_callback(self, body):
+        # wait if there are too many messages being processed by the loop
+        while not self.processing.acquire(timeout=1):
+            if self.should_stop:
+                return
         try:
-            message.ack()
+            future = asyncio.run_coroutine_threadsafe(self.callback(body), self.loop)
         except Exception:
-            logger.exception("Failed to ack message {} on queue {}.".format(body, self.queue.name))
+            self.processing.release()
+            logger.exception("Dropping event. Failed to send message {}.".format(body))
+        else:
+            future.add_done_callback(partial(self._on_callback_done, body))
+
+    def _on_callback_done(self, body, future):
+        self.processing.release()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Dropping event. Failed to send message {}.".format(body), exc_info=future.exception())
 
     def close(self):
         """
@@ -168,13 +224,30 @@ class SocketCommunication:
         broker_url: str,
         exchange_name: Optional[str] = None,
         subscribe_prefix: str = "/subscribe?",
+        send_queue_size: int = 100,
+        coalesce_interval: float = 0,
+        coalesce_events: Optional[Iterable[str]] = None,
+        broker_prefetch: int = 100,
     ):
         self.host = host
         self.port = port
         self.broker_url = broker_url
         self.exchange_name = exchange_name
         self.subscribe_prefix = subscribe_prefix
+        self.send_queue_size = send_queue_size
+        self.coalesce_interval = coalesce_interval
+        self.coalesce_events = set(coalesce_events if coalesce_events is not None else ["resource:updated"])
+        self.broker_prefetch = broker_prefetch
         self.client_url_args: Dict[UUID, Dict[str, str]] = {}
+        # clients by url arg name and value, used for message filters
+        self.client_index: Dict[str, Dict[str, Set[WebSocketServerProtocol]]] = {}
+        self.client_queues: Dict[UUID, Deque[str]] = {}
+        self.client_senders: Dict[UUID, asyncio.Future] = {}
+        self.dropped_messages = 0
+        # messages waiting to be merged with same event for same item
+        self.pending_messages: Dict[Tuple[str, str, str], WebsocketMessageData] = {}
+        self.pending_flush: Optional[asyncio.TimerHandle] = None
+        self.coalesced_messages = 0
         self.messages: Dict[str, datetime] = {}
         self.event_interval = {
             "ingest:update": 5,
@@ -194,9 +267,21 @@ class SocketCommunication:
             url_params = parse_qs(parsed_url.query)
             self.client_url_args[websocket.id] = {key: val[0] for key, val in url_params.items()}
 
+        for key, value in self.client_url_args[websocket.id].items():
+            self.client_index.setdefault(key, {}).setdefault(value, set()).add(websocket)
+
     def _remove_client(self, websocket: WebSocketServerProtocol):
         self.clients.remove(websocket)
-        self.client_url_args.pop(websocket.id, None)
+        for key, value in (self.client_url_args.pop(websocket.id, None) or {}).items():
+            clients = self.client_index.get(key, {}).get(value)
+            if clients is not None:
+                clients.discard(websocket)
+                if not clients:
+                    del self.client_index[key][value]
+        self.client_queues.pop(websocket.id, None)
+        sender = self.client_senders.pop(websocket.id, None)
+        if sender is not None:
+            sender.cancel()
 
     async def _client_loop(self, websocket):
         """Client loop - send it ping every `beat_delay` seconds to keep it alive.
@@ -225,50 +310,150 @@ class SocketCommunication:
         to determine which clients this ``message_data`` is to be sent to
         """
 
-        clients = self.clients.copy()
-
         if not message_data.get("filters"):
-            return clients
+            return self.clients.copy()
 
         filters: WebsocketMessageFilterConditions = message_data.pop("filters", {})
         filters.setdefault("include", {})
         filters.setdefault("exclude", {})
 
         if not filters["include"] and not filters["exclude"]:
+            return self.clients.copy()
+
+        try:
+            return self._get_indexed_recipients(filters)
+        except (TypeError, ValueError):
+            # filter values which can't be found using index
+            return set(filter(lambda websocket: self._filter_client(websocket, filters), self.clients))
+
+    def _get_indexed_recipients(self, filters: WebsocketMessageFilterConditions) -> Set[WebSocketServerProtocol]:
+        """Get recipients using client index, faster version of :meth:`_filter_client`.
+
+        :raises ValueError: if filter values are not a list of url arg values
+        """
+
+        def get_clients(key, values) -> Set[WebSocketServerProtocol]:
+            if not isinstance(values, (list, tuple, set)) or None in values:
+                raise ValueError("can't use index for filter values {}".format(values))
+            index = self.client_index.get(key, {})
+            clients: Set[WebSocketServerProtocol] = set()
+            for value in values:
+                clients.update(index.get(value, ()))
             return clients
 
-        def _filter(websocket: WebSocketServerProtocol) -> bool:
-            url_args = self.client_url_args.get(websocket.id) or {}
-            if filters["include"] and not url_args:
-                # If ``filter.include`` is defined, client must provide url args in websocket path
-                # as we're explicitly including only clients that have args in this list
-                return False
+        recipients: Optional[Set[WebSocketServerProtocol]] = None
+        for key, values in filters["include"].items():
+            clients = get_clients(key, values)
+            recipients = clients if recipients is None else recipients & clients
+        if recipients is None:
+            recipients = self.clients.copy()
+        else:
+            # client could be already removed from clients
+            recipients &= self.clients
 
-            try:
-                for key, values in filters["include"].items():
-                    if url_args.get(key) not in values:
-                        return False
+        for key, values in filters["exclude"].items():
+            recipients -= get_clients(key, values)
+
+        return recipients
+
+    def _filter_client(self, websocket: WebSocketServerProtocol, filters: WebsocketMessageFilterConditions) -> bool:
+        url_args = self.client_url_args.get(websocket.id) or {}
+        if filters["include"] and not url_args:
+            # If ``filter.include`` is defined, client must provide url args in websocket path
+            # as we're explicitly including only clients that have args in this list
+            return False
+
+        try:
+            for key, values in filters["include"].items():
+                if url_args.get(key) not in values:
+                    return False
 
-                for key, values in filters["exclude"].items():
-                    if url_args.get(key) in values:
-                        return False
-            except (KeyError, ValueError, IndexError):
-                return False
+            for key, values in filters["exclude"].items():
+                if url_args.get(key) in values:
+                    return False
+        except (KeyError, ValueError, IndexError):
+            return False
 
-            return True
+        return True
 
-        return set(filter(_filter, clients))
+    async def receive(self, message):
+        """Handle message from broker.
+
+        Events from `coalesce_events` for the same item are collected for `coalesce_interval` seconds
+        and sent as a single message, other messages are broadcasted right away.
+
+        Message can be a list of messages sent together by :func:`superdesk.notification.push_notification`.
+
+        :param message: message as it was received - no encoding/decoding.
+        """
+        data = json.loads(message)
+        for message_data in data if isinstance(data, list) else [data]:
+            await self._receive_data(message_data)
+
+    async def _receive_data(self, message_data: WebsocketMessageData):
+        extra = message_data.get("extra") or {}
+        if not self.coalesce_interval or message_data.get("filters") or not extra.get("_id"):
+            await self.broadcast_data(message_data)
+            return
+
+        item = (extra.get("resource") or "", str(extra["_id"]))
+        if message_data.get("event") not in self.coalesce_events:
+            # keep the order of events for an item
+            for event in self.coalesce_events:
+                pending = self.pending_messages.pop((event, *item), None)
+                if pending is not None:
+                    await self.broadcast_data(pending)
+            await self.broadcast_data(message_data)
+            return
+
+        key = (message_data["event"], *item)
+        pending = self.pending_messages.get(key)
+        if pending is None:
+            self.pending_messages[key] = message_data
+        else:
+            self.pending_messages[key] = self._merge_messages(pending, message_data)
+            self.coalesced_messages += 1
+        if self.pending_flush is None:
+            self.pending_flush = asyncio.get_running_loop().call_later(
+                self.coalesce_interval, lambda: asyncio.ensure_future(self.flush_pending())
+            )
+
+    def _merge_messages(self, previous: WebsocketMessageData, message_data: WebsocketMessageData):
+        previous_fields = (previous.get("extra") or {}).get("fields")
+        fields = message_data["extra"].get("fields")
+        if isinstance(previous_fields, dict) and isinstance(fields, dict):
+            message_data["extra"]["fields"] = {**previous_fields, **fields}
+        elif isinstance(previous_fields, list) and isinstance(fields, list):
+            message_data["extra"]["fields"] = previous_fields + [
+                field for field in fields if field not in previous_fields
+            ]
+        return message_data
+
+    async def flush_pending(self):
+        """Broadcast all messages waiting for coalescing."""
+        if self.pending_flush is not None:
+            self.pending_flush.cancel()
+            self.pending_flush = None
+        messages, self.pending_messages = self.pending_messages, {}
+        for message_data in messages.values():
+            await self.broadcast_data(message_data)
 
     async def broadcast(self, message):
         """Broadcast message to all clients.
 
+        :param message: message as it was received - no encoding/decoding.
+        """
+        await self.broadcast_data(json.loads(message))
+
+    async def broadcast_data(self, message_data: WebsocketMessageData):
+        """Broadcast parsed message to all clients.
+
         If event is in `event_interval` it will only send such event every x seconds.
 
-        :param message: message as it was received - no encoding/decoding.
+        :param message_data: message data
         """
-        message_data = json.loads(message)
         message_id = message_data.get("event", "")
-        message_created = arrow.get(message_data.get("_created", utcnow()))
+        message_created = arrow.get(message_data.get("_created", utcnow())).datetime
         last_created = self.messages.get(message_id)
         ttl = self.event_interval.get(message_id, 0)
 
@@ -279,15 +464,50 @@ class SocketCommunication:
         if ttl:
             self.messages[message_id] = message_created
 
-        logger.debug("broadcast %s" % message)
-        for websocket in self.get_message_recipients(message_data):
-            try:
-                if websocket.open:
-                    # Reconstruct the message string
-                    # as not to send the ``message.filter`` dictionary to clients
-                    await websocket.send(json.dumps(message_data, default=json_serialize_datetime_objectId))
-            except Exception:
-                pass
+        logger.debug("broadcast %s" % message_data)
+        recipients = self.get_message_recipients(message_data)
+        if not recipients:
+            return
+
+        # Reconstruct the message string
+        # as not to send the ``message.filter`` dictionary to clients
+        client_message = json.dumps(message_data, default=json_serialize_datetime_objectId)
+        for websocket in recipients:
+            if websocket.open:
+                self._queue_message(websocket, client_message)
+
+        # let clients start sending before handling next message
+        await asyncio.sleep(0)
+
+    def _queue_message(self, websocket: WebSocketServerProtocol, message: str):
+        """Add message to client send queue.
+
+        Each client has its own queue, so slow clients don't block others.
+        If the queue is full the message is dropped for that client.
+        """
+        queue = self.client_queues.setdefault(websocket.id, deque())
+        if len(queue) >= self.send_queue_size:
+            self.dropped_messages += 1
+            logger.debug("Dropping message, send queue is full for client %s", websocket.id)
+            return
+        queue.append(message)
+        if websocket.id not in self.client_senders:
+            self.client_senders[websocket.id] = asyncio.ensure_future(self._send_queued(websocket, queue))
+
+    async def _send_queued(self, websocket: WebSocketServerProtocol, queue: Deque[str]):
+        try:
+            while queue:
+                message = queue.popleft()
+                try:
+                    if websocket.open:
+                        await websocket.send(message)
+                except Exception:
+                    pass
+        finally:
+            if self.client_senders.get(websocket.id) is asyncio.current_task():
+                del self.client_senders[websocket.id]
+            if not queue and self.client_queues.get(websocket.id) is queue:
+                del self.client_queues[websocket.id]
 
     async def _server_loop(self, websocket):
         """Server loop - wait for message and broadcast it.
@@ -339,7 +559,9 @@ class SocketCommunication:
             logger.info("listening on %s:%s" % (self.host, self.port))
             consumer = None
             # create socket message consumer
-            consumer = SocketMessageConsumer(self.broker_url, self.broadcast, self.exchange_name)
+            consumer = SocketMessageConsumer(
+                self.broker_url, self.receive, self.exchange_name, loop=loop, prefetch_count=self.broker_prefetch
+            )
             loop.run_in_executor(None, consumer.run)
             loop.run_forever()
         except KeyboardInterrupt:
@@ -30,7 +30,16 @@ def create_server(config):
         port = int(config["WS_PORT"])
         broker_url = config["BROKER_URL"]
         exchange_name = config.get("WEBSOCKET_EXCHANGE", "superdesk_notification")
-        comms = SocketCommunication(host, port, broker_url, exchange_name)
+        comms = SocketCommunication(
+            host,
+            port,
+            broker_url,
+            exchange_name,
+            send_queue_size=int(config.get("WS_SEND_QUEUE_SIZE", 100)),
+            coalesce_interval=float(config.get("WS_COALESCE_INTERVAL", 0)),
+            coalesce_events=config.get("WS_COALESCE_EVENTS"),
+            broker_prefetch=int(config.get("WS_BROKER_PREFETCH", 100)),
+        )
         comms.run_server()
     except Exception:
         logger.exception("Failed to start the WebSocket server.")
@@ -1,7 +1,9 @@
 from bson import ObjectId
+from unittest.mock import patch
 from datetime import datetime, timedelta
+from flask import g
 from superdesk.tests import TestCase
-from superdesk.audit import PurgeAudit
+from superdesk.audit import PurgeAudit, audit
 from superdesk import get_resource_service
 
 
@@ -31,3 +33,29 @@ class AuditTestCase(TestCase):
         self.app.config["AUDIT_EXPIRY_MINUTES"] = 5
         PurgeAudit().run()
         self.assertEqual(get_resource_service("audit").find({}).count(), 1)
+
+    def test_audit_records_saved_when_app_context_ends(self):
+        service = get_resource_service("audit")
+        with self.app.app_context():
+            g.user = {"_id": ObjectId()}
+            service.on_generic_inserted("archive", [{"_id": "foo", "headline": "foo"}])
+            service.on_generic_updated("archive", {"headline": "bar"}, {"_id": "foo"})
+            self.assertEqual(0, service.find({}).count())
+        self.assertEqual(2, service.find({}).count())
+        self.assertEqual(["created", "updated"], [audit["action"] for audit in service.find({}).sort("_id", 1)])
+
+        self.app.config["AUDIT_BATCH_SIZE"] = 2
+        with self.app.app_context():
+            g.user = {"_id": ObjectId()}
+            service.on_generic_deleted("archive", {"_id": "foo"})
+            service.on_generic_deleted("archive", {"_id": "bar"})
+            self.assertEqual(4, service.find({}).count())
+
+    def test_audit_records_saved_when_async_fails(self):
+        service = get_resource_service("audit")
+        self.app.config["AUDIT_ASYNC"] = True
+        with patch.object(audit.save_audit, "delay", side_effect=OSError("broker down")):
+            with self.app.app_context():
+                g.user = {"_id": ObjectId()}
+                service.on_generic_inserted("archive", [{"_id": "foo", "headline": "foo"}])
+        self.assertEqual(1, service.find({}).count())
@@ -7,6 +7,7 @@ from superdesk.utc import utcnow
 from superdesk.tests import TestCase
 from apps.auth.session_purge import RemoveExpiredSessions
 from apps.auth import is_current_user_admin
+from apps.auth.auth import add_session_activity, get_auth_data
 
 
 class AuthTestCase(TestCase):
@@ -120,3 +121,78 @@ class AuthTestCase(TestCase):
             response = client.get("/api/users", headers=headers)
             self.assertEqual(200, response.status_code)
             assert session["session_token"] == "foo"
+
+    def test_auth_data_cache(self):
+        user_ids = self.app.data.insert("users", [{"username": "foo", "user_type": "user", "privileges": {"users": 1}}])
+        self.app.data.insert("auth", [{"user": user_ids[0], "_updated": utcnow(), "token": "foo"}])
+
+        auth_token, user, _role = get_auth_data("foo")
+        self.assertEqual(1, user["active_privileges"]["users"])
+
+        # returns copies
+        user["active_privileges"]["users"] = 0
+        self.assertEqual(1, get_auth_data("foo")[1]["active_privileges"]["users"])
+
+        # invalidated on user update
+        original = self.app.data.find_one("users", None, _id=user_ids[0])
+        self.app.data.update("users", user_ids[0], {"privileges": {"users": 0}}, original)
+        self.assertEqual(0, get_auth_data("foo")[1]["active_privileges"]["users"])
+
+        # invalidated on logout
+        self.app.data.remove("auth", {"_id": auth_token["_id"]})
+        self.assertIsNone(get_auth_data("foo"))
+
+    def test_session_activity_is_updated_in_batches(self):
+        user_ids = self.app.data.insert("users", [{"username": "foo"}, {"username": "bar"}])
+        updated = utcnow() - timedelta(minutes=5)
+        auth_ids = self.app.data.insert(
+            "auth",
+            [
+                {"user": user_ids[0], "_updated": updated, "token": "foo"},
+                {"user": user_ids[1], "_updated": updated, "token": "bar"},
+            ],
+        )
+
+        # first one is saved right away, next waits for SESSION_UPDATE_SECONDS
+        add_session_activity(auth_ids[0])
+        add_session_activity(auth_ids[1])
+        self.assertGreater(
+            self.app.data.find_one("auth", None, token="foo")["_updated"], utcnow() - timedelta(minutes=1)
+        )
+        self.assertLess(self.app.data.find_one("auth", None, token="bar")["_updated"], utcnow() - timedelta(minutes=1))
+
+        with patch.dict(self.app.config, {"SESSION_UPDATE_SECONDS": 0}):
+            add_session_activity(auth_ids[0])
+        sessions = list(self.app.data.find_all("auth"))
+        self.assertEqual(2, len(sessions))
+        self.assertEqual(sessions[0]["_updated"], sessions[1]["_updated"])
+        self.assertGreater(sessions[0]["_updated"], utcnow() - timedelta(minutes=1))
+        users = self.app.data.find_list_of_ids("users", user_ids)
+        self.assertEqual(sessions[0]["_updated"], users[0]["last_activity_at"])
+        self.assertEqual(sessions[0]["_updated"], users[1]["last_activity_at"])
+
+    def test_pending_session_activity_is_saved_by_timer(self):
+        user_ids = self.app.data.insert("users", [{"username": "foo"}, {"username": "bar"}])
+        updated = utcnow() - timedelta(minutes=5)
+        auth_ids = self.app.data.insert(
+            "auth",
+            [
+                {"user": user_ids[0], "_updated": updated, "token": "foo"},
+                {"user": user_ids[1], "_updated": updated, "token": "bar"},
+            ],
+        )
+
+        add_session_activity(auth_ids[0])
+        with patch.dict(self.app.config, {"SESSION_UPDATE_SECONDS": 0.5}):
+            add_session_activity(auth_ids[1])
+        self.assertLess(self.app.data.find_one("auth", None, token="bar")["_updated"], utcnow() - timedelta(minutes=1))
+        self.app.extensions["superdesk_session_activity"]["timer"].join(5)
+        self.assertGreater(
+            self.app.data.find_one("auth", None, token="bar")["_updated"], utcnow() - timedelta(minutes=1)
+        )
+
+        # forced when user has no activity yet
+        add_session_activity(auth_ids[0])
+        add_session_activity(auth_ids[1], force=True)
+        self.assertIsNone(self.app.extensions["superdesk_session_activity"]["timer"])
+        self.assertFalse(self.app.extensions["superdesk_session_activity"]["sessions"])
@@ -1,7 +1,17 @@
 import random
+import unittest
 from time import sleep
+from unittest import mock
 
-from superdesk.cache import cache
+from superdesk.cache import (
+    cache,
+    LocalCache,
+    document_tag,
+    query_tags,
+    invalidate_cache,
+    get_cache_stats,
+    register_resource_tag,
+)
 from superdesk.tests import TestCase
 from bson import ObjectId
 
@@ -9,6 +19,7 @@ from bson import ObjectId
 class Foo:
     def __init__(self):
         self.test_calls = 0
+        self.items_calls = 0
 
     @cache(ttl=1, tags=("count",))
     def count_calls(self):
@@ -19,6 +30,11 @@ class Foo:
     def random(self):
         return random.random()
 
+    @cache(ttl=10, tags=("local",))
+    def items(self):
+        self.items_calls += 1
+        return [{"calls": self.items_calls}]
+
     @cache(ttl=1)
     def identity(self, identity):
         return identity
@@ -57,3 +73,109 @@ class CacheTestCase(TestCase):
 
         users = get_users()
         self.assertEqual(users, get_users())
+
+    def test_cache_local(self):
+        items = foo.items()
+        calls = items[0]["calls"]
+        items[0]["calls"] = "changed"
+        self.assertEqual([{"calls": calls}], foo.items(), "loaded from shared cache")
+        self.assertNotEqual("changed", foo.items()[0]["calls"], "changes don't leak to local cache")
+
+        calls = foo.items_calls
+        cache.clean(["local"])
+        self.assertEqual([{"calls": calls + 1}], foo.items(), "tag cleaned")
+
+    def test_cache_local_tags(self):
+        calls = []
+
+        @cache(tags=(document_tag("resource", "local"),))
+        def get_doc():
+            calls.append("doc")
+            return ["doc"]
+
+        get_doc()
+        get_doc()
+        backend = self.app.extensions["superdesk_cache"]
+        with mock.patch.object(backend, "load", wraps=backend.load) as load:
+            self.assertEqual(["doc"], get_doc())
+            self.assertEqual(0, load.call_count, "tags and entry loaded locally")
+
+        invalidate_cache("resource", ids=["local"])
+        self.assertEqual(["doc"], get_doc())
+        self.assertEqual(["doc", "doc"], calls, "tags cleaned locally")
+
+    def test_invalidate_cache(self):
+        register_resource_tag("resource")
+        calls = []
+
+        @cache(tags=("resource",))
+        def get_all():
+            calls.append("all")
+            return ["all"]
+
+        @cache(tags=(document_tag("resource", 1),))
+        def get_doc():
+            calls.append("doc")
+            return ["doc"]
+
+        @cache(tags=query_tags("resource", ["name"]))
+        def get_names():
+            calls.append("names")
+            return ["names"]
+
+        def get_calls():
+            calls.clear()
+            get_all()
+            get_doc()
+            get_names()
+            return sorted(calls)
+
+        self.assertEqual(["all", "doc", "names"], get_calls())
+        self.assertEqual([], get_calls())
+
+        invalidate_cache("resource", ids=[2], fields=["state"])
+        self.assertEqual(["all"], get_calls())
+
+        invalidate_cache("resource", ids=[1], fields=["state"])
+        self.assertEqual(["all", "doc"], get_calls())
+
+        invalidate_cache("resource", ids=[2], fields=["name.first"])
+        self.assertEqual(["all", "names"], get_calls())
+
+        invalidate_cache("resource", ids=[3])
+        self.assertEqual(["all", "names"], get_calls())
+
+        stats = get_cache_stats()
+        self.assertEqual(4, stats["invalidations"]["resource"])
+        self.assertEqual(3, stats["misses"][get_names.__qualname__])
+
+    def test_invalidate_cache_not_registered_resource_tag(self):
+        calls = []
+
+        @cache(tags=("other",))
+        def get_all():
+            calls.append("all")
+            return ["all"]
+
+        get_all()
+        invalidate_cache("other", ids=[1], fields=["name"])
+        get_all()
+        self.assertEqual(["all"], calls)
+
+
+class LocalCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        local_cache = LocalCache(size=2, ttl=10)
+        local_cache.set("a", 1)
+        local_cache.set("b", 2)
+        self.assertEqual(1, local_cache.get("a"))
+        local_cache.set("c", 3)
+        self.assertIsNone(local_cache.get("b"), "least recently used entry removed")
+        self.assertEqual(1, local_cache.get("a"))
+        self.assertEqual(3, local_cache.get("c"))
+
+    def test_ttl(self):
+        local_cache = LocalCache(size=2, ttl=10)
+        local_cache.set("a", 1, ttl=0.1)
+        sleep(0.2)
+        self.assertIsNone(local_cache.get("a"))
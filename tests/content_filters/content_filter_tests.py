@@ -11,9 +11,11 @@
 import os
 import json
 
+from unittest import mock
 from eve.utils import ParsedRequest
 
 from apps.content_filters.content_filter.content_filter_service import ContentFilterService
+from apps.content_filters.filter_condition.filter_condition import FilterCondition
 from apps.prepopulate.app_populate import AppPopulateCommand
 from superdesk import get_backend, get_resource_service
 from superdesk.errors import SuperdeskApiError
@@ -428,6 +430,29 @@ class FilteringDataTests(ContentFilterTests):
             self.assertFalse(self.f.does_match(doc, self.articles[4]))
             self.assertFalse(self.f.does_match(doc, self.articles[5]))
 
+    def test_does_match_filters(self):
+        docs = [
+            {"_id": "f1", "content_filter": [{"expression": {"fc": [1]}}], "name": "f1"},
+            {"_id": "f2", "content_filter": [{"expression": {"fc": [3, 4]}}], "name": "f2"},
+        ]
+        with self.app.app_context():
+            self.assertEqual({"f1": True, "f2": False}, self.f.does_match_filters(docs, self.articles[0]))
+            self.assertEqual({"f1": True, "f2": True}, self.f.does_match_filters(docs, self.articles[2]))
+
+    def test_does_match_filters_evaluates_conditions_once(self):
+        docs = [
+            {"_id": "f1", "content_filter": [{"expression": {"fc": [1]}}], "name": "f1"},
+            {"_id": "f2", "content_filter": [{"expression": {"fc": [3, 1]}}], "name": "f2"},
+            {"_id": "f3", "content_filter": [{"expression": {"pf": [1], "fc": [3]}}], "name": "f3"},
+        ]
+        does_match = FilterCondition.does_match
+        with self.app.app_context():
+            with mock.patch.object(FilterCondition, "does_match", autospec=True, side_effect=does_match) as fc_match:
+                self.assertEqual(
+                    {"f1": True, "f2": True, "f3": True}, self.f.does_match_filters(docs, self.articles[2])
+                )
+        self.assertEqual(2, fc_match.call_count)
+
     def test_if_pf_is_used(self):
         with self.app.app_context():
             self.assertTrue(self.f._get_content_filters_by_content_filter(1).count() == 1)
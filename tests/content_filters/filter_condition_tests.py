@@ -816,3 +816,24 @@ class FilterConditionTests(TestCase):
         field = FilterConditionDeskField("")
         value = FilterConditionValue(FilterConditionOperator.factory("in"), desk_id)
         self.assertEqual([str(desk_id)], value._get_value(field))
+
+    def test_get_compiled(self):
+        with self.app.app_context():
+            f1 = FilterCondition.get_compiled({"_id": 1, "field": "urgency", "operator": "in", "value": "1,2"})
+            f2 = FilterCondition.get_compiled({"_id": 2, "field": "urgency", "operator": "in", "value": "1,2"})
+            f3 = FilterCondition.get_compiled({"_id": 1, "field": "urgency", "operator": "in", "value": "3"})
+            self.assertIs(f1, f2)
+            self.assertIsNot(f1, f3)
+            self.assertEqual(frozenset(["1", "2"]), f1.get_filter_value())
+            self.assertTrue(f1.does_match({"urgency": 2}))
+            self.assertFalse(f3.does_match({"urgency": 2}))
+
+    def test_cost(self):
+        with self.app.app_context():
+            self.assertLess(FilterCondition("desk", "in", "1").cost, FilterCondition("headline", "in", "foo").cost)
+            self.assertLess(
+                FilterCondition("headline", "in", "foo").cost, FilterCondition("body_html", "in", "foo").cost
+            )
+            self.assertLess(
+                FilterCondition("headline", "in", "foo").cost, FilterCondition("headline", "like", "foo").cost
+            )
@@ -78,6 +78,20 @@ class WordsTestCase(TestCase):
         self.assertEqual(json.dumps({"foo": 1}), updates["content"])
         self.assertIsNone(self.app.storage.get(file_id))
 
+    def test_get_model_for_lang(self):
+        service = get_resource_service("dictionaries")
+        service.patch("2", {"content": {"foo": 1, "bar": 2}})
+        model = service.get_model_for_lang("en-AU")
+        self.assertIn("foo", model)
+        self.assertEqual(2, model.get("bar"))
+        self.assertNotIn("baz", model)
+        self.assertIs(model, service.get_model_for_lang("en-AU"))
+
+        service.patch("2", {"content": {"baz": 1}})
+        model = service.get_model_for_lang("en-AU")
+        self.assertIn("baz", model)
+        self.assertIs(model, service.get_model_for_lang("en-AU"))
+
     def _get_big_dict(self):
         word = "".join([random.choice(string.ascii_letters) for i in range(1000000)])
         return {word: 1}
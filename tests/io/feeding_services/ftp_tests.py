@@ -169,6 +169,51 @@ class FTPTestCase(TestCase):
         for i, call in enumerate(mock_ftp.rename.call_args_list):
             self.assertEqual(call[0], (FakeFTP.files[i][0], "dest_move/{}".format(FakeFTP.files[i][0])))
 
+    @mock.patch.object(os.path, "getsize", return_value=3)
+    @mock.patch.object(ftp, "get_ftp_connection")
+    @mock.patch.object(ftp, "ftp_connect", new_callable=FakeFTP)
+    @mock.patch.object(ftp.FTPFeedingService, "get_feed_parser", FakeFeedParser())
+    @mock.patch("builtins.open", mock.mock_open())
+    def test_move_ingested_with_parallel_downloads(self, ftp_connect, get_ftp_connection, *args):
+        self.app.config["FTP_INGEST_WORKERS"] = 3
+        provider = copy.deepcopy(PROVIDER)
+        service = ftp.FTPFeedingService()
+        service._is_empty = mock.MagicMock(return_value=False)
+        update = {}
+        ingest_items(service.update(provider, update))
+
+        mock_ftp = ftp_connect.return_value.__enter__.return_value
+        self.assertEqual(0, mock_ftp.retrbinary.call_count)
+        self.assertLessEqual(get_ftp_connection.call_count, 3)
+        self.assertEqual(len(FakeFTP.files), get_ftp_connection.return_value.retrbinary.call_count)
+        self.assertEqual(mock_ftp.rename.call_count, len(FakeFTP.files))
+        for i, call in enumerate(mock_ftp.rename.call_args_list):
+            self.assertEqual(call[0], (FakeFTP.files[i][0], "dest_move/{}".format(FakeFTP.files[i][0])))
+        self.assertEqual(
+            datetime.datetime.strptime("20170517164756", "%Y%m%d%H%M%S").replace(tzinfo=utc),
+            update["private"]["last_processed_file_modify"],
+        )
+
+    @mock.patch.object(os, "remove")
+    @mock.patch.object(ftp, "get_ftp_connection")
+    @mock.patch("builtins.open", mock.mock_open())
+    def test_parallel_download_retry_with_new_connection(self, get_ftp_connection, *args):
+        dead_ftp = mock.MagicMock()
+        dead_ftp.retrbinary.side_effect = ftp.ftplib.error_temp("421 Timeout")
+        new_ftp = mock.MagicMock()
+        get_ftp_connection.side_effect = [dead_ftp, new_ftp]
+        service = ftp.FTPFeedingService()
+        files = [("foo.xml", utcnow()), ("bar.xml", utcnow())]
+
+        with service._downloads({"dest_path": "/tmp"}, files, 1) as downloads:
+            for download in downloads:
+                download.result()
+
+        self.assertEqual(2, get_ftp_connection.call_count)
+        self.assertEqual(1, dead_ftp.retrbinary.call_count)
+        self.assertTrue(dead_ftp.close.called)
+        self.assertEqual(2, new_ftp.retrbinary.call_count)
+
     @mock.patch.object(os.path, "getsize", return_value=3)
     @mock.patch.object(ftp, "ftp_connect", new_callable=FakeFTP)
     @mock.patch.object(ftp.FTPFeedingService, "get_feed_parser", FakeFeedParser())
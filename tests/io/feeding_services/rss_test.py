@@ -356,6 +356,41 @@ class FetchDataMethodTestCase(RssIngestServiceTest):
         self.assertIs(ex.provider, self.fake_provider)
 
 
+class ConditionalFetchTestCase(RssIngestServiceTest):
+    """Tests for conditional requests done by update."""
+
+    def setUp(self):
+        self.instance.session.get = MagicMock()
+        self.provider = {"_id": "rss", "name": "rss", "config": {"url": "http://news.com/rss", "auth_required": False}}
+
+    def test_stores_validators_and_sends_them_on_next_update(self):
+        self.instance.session.get.return_value = MagicMock(
+            ok=True,
+            status_code=200,
+            content=nrk_xml,
+            headers={"ETag": '"abc"', "Last-Modified": "Mon, 06 Feb 2017 10:51:00 GMT"},
+        )
+        update = {}
+        items = self.instance.update(self.provider, update)
+        self.assertEqual(1, len(items[0]))
+        self.assertEqual(
+            {"etag": '"abc"', "last_modified": "Mon, 06 Feb 2017 10:51:00 GMT"},
+            update["private"]["http_validators"]["http://news.com/rss"],
+        )
+        self.assertNotIn("If-None-Match", self.instance.session.get.call_args[1]["headers"])
+
+        self.provider.update(update)
+        self.instance.session.get.return_value = MagicMock(ok=True, status_code=304, content=b"", headers={})
+        update = {}
+        with mock.patch("superdesk.io.feeding_services.rss.feedparser.parse") as parse:
+            self.assertEqual([], self.instance.update(self.provider, update))
+            parse.assert_not_called()
+        headers = self.instance.session.get.call_args[1]["headers"]
+        self.assertEqual('"abc"', headers["If-None-Match"])
+        self.assertEqual("Mon, 06 Feb 2017 10:51:00 GMT", headers["If-Modified-Since"])
+        self.assertNotIn("private", update)
+
+
 class ExtractImageLinksMethodTestCase(RssIngestServiceTest):
     """Tests for the _extract_image_links() method."""
 
@@ -34,6 +34,9 @@ from superdesk.io.commands.update_ingest import (
     get_task_id,
     get_is_idle,
     ingest_item,
+    update_providers,
+    backoff,
+    IngestBatch,
 )
 import flask
 
@@ -81,6 +84,19 @@ class UpdateIngestTest(TestCase):
         self.assertEqual(12, len(items))
         self.ingest_items(items, provider, provider_service)
 
+    def test_ingest_items_saves_new_items_at_once(self):
+        provider, provider_service = self.setup_reuters_provider()
+        items = provider_service.fetch_ingest(reuters_guid)
+        ingest_service = get_resource_service("ingest")
+        with patch.object(ingest_service, "post_in_mongo", wraps=ingest_service.post_in_mongo) as post_mock:
+            failed = self.ingest_items(items, provider, provider_service)
+        self.assertEqual(set(), failed)
+        saved = [doc for call in post_mock.call_args_list for doc in call[0][0]]
+        self.assertEqual(len(items), len(saved))
+        self.assertLessEqual(post_mock.call_count, 2)  # items and packages
+        for item in items:
+            self.assertIsNotNone(ingest_service.find_one(req=None, guid=item["guid"]))
+
     def test_ingest_item_expiry(self):
         provider, provider_service = self.setup_reuters_provider()
         items = provider_service.fetch_ingest(reuters_guid)
@@ -306,6 +322,20 @@ class UpdateIngestTest(TestCase):
         provider["idle_time"] = dict(hours=0, minutes=0)
         self.assertEqual(get_is_idle(provider), False)
 
+    def test_update_providers_backs_off_failing_provider(self):
+        provider, provider_service = self.setup_reuters_provider()
+        with patch.dict(self.app.config, {"INGEST_UPDATE_WORKERS": 2}), patch(
+            "superdesk.io.commands.update_ingest.update_provider", side_effect=Exception("error")
+        ) as update_mock:
+            update_providers([provider["_id"]])
+            self.assertEqual(1, update_mock.call_count)
+            update_providers([provider["_id"]])
+            self.assertEqual(1, update_mock.call_count)
+            backoff.succeeded(provider)
+            update_providers([provider["_id"]])
+            self.assertEqual(2, update_mock.call_count)
+        backoff.succeeded(provider)
+
     def test_files_dont_duplicate_ingest(self):
         provider, provider_service = self.setup_reuters_provider()
         items = provider_service.fetch_ingest(reuters_guid)
@@ -786,3 +816,36 @@ class UpdateIngestTest(TestCase):
         ingested, ids = ingest_item(item, provider=provider, feeding_service={})
         self.assertFalse(ingested)
         self.assertEqual([], ids)
+
+    def test_ingest_batch_find_one_not_fetched(self):
+        self.app.data.insert("ingest", [{"guid": "foo", "type": "text"}, {"guid": "bar", "type": "text"}])
+        batch = IngestBatch({}, [{"guid": "foo", "type": "text"}])
+        self.assertEqual("foo", batch.find_one("ingest", "foo")["guid"])
+        self.assertEqual("bar", batch.find_one("ingest", "bar")["guid"])
+        self.assertIsNone(batch.find_one("ingest", "baz"))
+
+        batch = IngestBatch({}, [])
+        self.assertEqual("foo", batch.find_one("ingest", "foo")["guid"])
+        self.assertEqual("bar", batch.find_one("ingest", "bar")["guid"])
+
+    def test_ingest_batch_item_with_failed_association_is_failed(self):
+        assoc = {"_id": "assoc-id", "guid": "assoc", "type": "picture"}
+        item = {"_id": "item-id", "guid": "item", "type": "text", "associations": {"featuremedia": {"_id": "assoc-id"}}}
+        batch = IngestBatch({}, [])
+        batch.add("ingest", assoc)
+        batch.add("ingest", item, depends_on=["assoc"])
+
+        service = get_resource_service("ingest")
+        post_in_mongo = service.post_in_mongo
+
+        def post_without_assoc(docs):
+            if any(doc["guid"] == "assoc" for doc in docs):
+                raise ValueError("insert failed")
+            return post_in_mongo(docs)
+
+        with patch.object(service, "post_in_mongo", side_effect=post_without_assoc):
+            batch.flush()
+
+        self.assertEqual({"assoc", "item"}, batch.failed_guids)
+        self.assertEqual({"assoc-id", "item-id"}, batch.failed_ids)
+        self.assertIsNone(service.find_one(req=None, guid="item"))
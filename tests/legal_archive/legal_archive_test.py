@@ -10,7 +10,8 @@
 
 import json
 
-from unittest.mock import MagicMock
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
 from datetime import timedelta
 
 from eve.versioning import resolve_document_version
@@ -59,6 +60,21 @@ class LegalArchiveTestCase(TestCase):
         self.assertEqual(task.get("stage"), "dddd")
         self.assertEqual(task.get("user"), "")
 
+    def test_denormalize_fetches_each_resource_once(self):
+        docs = deepcopy(self.archive)
+        history = {"item_id": "1", "version": 1, "user_id": "123", "update": {"task": {"desk": "123"}}}
+        legal_archive = LegalArchiveImport()
+        desks_service = get_resource_service("desks")
+        with patch.object(desks_service, "get_from_mongo", wraps=desks_service.get_from_mongo) as get_mock:
+            legal_archive._load_names(docs, [history])
+            for doc in docs:
+                legal_archive._denormalize_user_desk(doc, "")
+            legal_archive._denormalize_history(history)
+        self.assertEqual(1, get_mock.call_count)
+        self.assertEqual(["Sports", "1234", "1234"], [doc["task"]["desk"] for doc in docs])
+        self.assertEqual("test user", history["user_id"])
+        self.assertEqual("Sports", history["update"]["task"]["desk"])
+
 
 class ImportLegalArchiveCommandTestCase(TestCase):
     desks = [{"name": "Sports"}]
@@ -1,7 +1,9 @@
 import time
+import unittest
 
+from superdesk import signals
 from superdesk.tests import TestCase
-from superdesk.lock import lock, unlock, touch
+from superdesk.lock import lock, unlock, touch, MemoryLockBackend
 
 
 class LockTestCase(TestCase):
@@ -32,3 +34,48 @@ class LockTestCase(TestCase):
 
         # locking after unlocking
         self.assertTrue(lock(task, expire=1))
+
+    def test_lock_signals(self):
+        acquired = []
+        released = []
+
+        def on_acquire(sender, **kwargs):
+            acquired.append(kwargs)
+
+        def on_release(sender, **kwargs):
+            released.append(kwargs)
+
+        signals.lock_acquire.connect(on_acquire)
+        signals.lock_release.connect(on_release)
+        try:
+            self.assertTrue(lock("signals", expire=10))
+            self.assertFalse(lock("signals", timeout=0.2))
+            unlock("signals")
+        finally:
+            signals.lock_acquire.disconnect(on_acquire)
+            signals.lock_release.disconnect(on_release)
+
+        self.assertEqual([True, False], [info["acquired"] for info in acquired])
+        self.assertGreaterEqual(acquired[1]["waited"], 0.2)
+        self.assertEqual(1, len(released))
+        self.assertIsNotNone(released[0]["held"])
+
+
+class MemoryLockBackendTestCase(unittest.TestCase):
+    def test_lock(self):
+        backend = MemoryLockBackend()
+
+        self.assertTrue(backend.lock("test", "foo", expire=0.1))
+        self.assertFalse(backend.lock("test", "bar"))
+        self.assertTrue(backend.is_locked("test"))
+
+        # lock expired
+        self.assertTrue(backend.lock("test", "bar", expire=10, timeout=1))
+        self.assertFalse(backend.touch("test", "foo", 10))
+        self.assertTrue(backend.touch("test", "bar", 10))
+
+        # only owner can release lock
+        backend.release("test", "foo")
+        self.assertTrue(backend.is_locked("test"))
+        backend.release("test", "bar")
+        self.assertFalse(backend.is_locked("test"))
@@ -88,3 +88,28 @@ class GenerateRenditionsTestCase(TestCase):
         self.assertEqual(1200, landscape["CropRight"])
         self.assertEqual(500, landscape["CropTop"])
         self.assertEqual(1100, landscape["CropBottom"])
+
+    def test_generate_renditions_in_parallel(self):
+        inserted = []
+        renditions = get_renditions_spec()
+        with open(BIG_IMG_PATH, "rb") as original:
+            generated = generate_renditions(
+                original, "id", inserted, "image", "image/jpeg", renditions, self.app.media.url_for_media
+            )
+
+        self.app.config["RENDITIONS_WORKERS"] = 4
+        parallel_inserted = []
+        renditions = get_renditions_spec()
+        with open(BIG_IMG_PATH, "rb") as original:
+            parallel = generate_renditions(
+                original, "id", parallel_inserted, "image", "image/jpeg", renditions, self.app.media.url_for_media
+            )
+
+        self.assertEqual(list(generated.keys()), list(parallel.keys()))
+        self.assertEqual([rendition["media"] for rendition in list(parallel.values())[1:]], parallel_inserted)
+        for name, rendition in generated.items():
+            self.assertEqual(rendition["width"], parallel[name]["width"])
+            self.assertEqual(rendition["height"], parallel[name]["height"])
+            if name != "original":
+                image = Image.open(self.app.media.get(parallel[name]["media"]))
+                self.assertEqual((rendition["width"], rendition["height"]), image.size)
@@ -0,0 +1,71 @@
+import flask
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from superdesk import notification
+from superdesk.tests import NotificationMock
+
+
+class NotificationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        self.app.config.update(
+            BROKER_URL="memory://", WEBSOCKET_EXCHANGE="test", NOTIFICATION_BATCH_SIZE=10, NOTIFICATION_QUEUE_SIZE=0
+        )
+        with patch.object(notification, "SocketMessageProducer"):
+            notification.init_app(self.app)
+        self.app.notification_client = NotificationMock()
+
+    def get_messages(self):
+        return [flask.json.loads(message) for message in self.app.notification_client.messages]
+
+    def test_notifications_are_sent_when_app_context_ends(self):
+        with self.app.app_context():
+            notification.push_notification("resource:updated", resource="archive", _id="foo", fields={"headline": 1})
+            notification.push_notification("item:lock", item="foo")
+            notification.push_notification("resource:updated", resource="archive", _id="foo", fields={"slugline": 1})
+            notification.push_notification("resource:updated", resource="archive", _id="bar", fields={"headline": 1})
+            self.assertEqual([], self.app.notification_client.messages)
+
+        messages = self.get_messages()
+        self.assertEqual(["resource:updated", "item:lock", "resource:updated"], [m["event"] for m in messages])
+        self.assertEqual({"headline": 1, "slugline": 1}, messages[0]["extra"]["fields"])
+        self.assertEqual("bar", messages[2]["extra"]["_id"])
+
+    def test_batch_size(self):
+        self.app.config["NOTIFICATION_BATCH_SIZE"] = 2
+        with self.app.app_context():
+            for i in range(3):
+                notification.push_notification("foo", i=i)
+            self.assertEqual(2, len(self.app.notification_client.messages))
+        self.assertEqual([0, 1, 2], [m["extra"]["i"] for m in self.get_messages()])
+
+    def test_notifications_are_sent_after_flush_interval(self):
+        self.app.config["NOTIFICATION_FLUSH_INTERVAL"] = 0.05
+        self.app.extensions["superdesk_notification_flusher"] = notification.NotificationFlusher(self.app, 0.05)
+        with self.app.app_context():
+            notification.push_notification("foo", i=1)
+            for _ in range(100):
+                if self.app.notification_client.messages:
+                    break
+                time.sleep(0.01)
+            self.assertEqual([1], [m["extra"]["i"] for m in self.get_messages()])
+
+    def test_queue_drops_messages_when_full(self):
+        queue = notification.NotificationQueue(self.app, 1)
+        broker_ready = threading.Event()
+        sent = []
+
+        def send(message):
+            broker_ready.wait(5)
+            sent.append(message)
+
+        with patch.object(notification, "_send_message", side_effect=send):
+            for message in ("foo", "bar", "baz"):
+                queue.put(message)
+            broker_ready.set()
+            queue.close()
+        self.assertGreaterEqual(queue.dropped, 1)
+        self.assertEqual(3, len(sent) + queue.dropped)
+        self.assertEqual("foo", sent[0])
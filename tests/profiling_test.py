@@ -0,0 +1,90 @@
+import flask
+import threading
+import unittest
+from superdesk.profiling import metrics
+from superdesk.profiling.sampler import SamplingProfiler
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.metrics = metrics.Metrics()
+        self.original_metrics = metrics.metrics
+        metrics.metrics = self.metrics
+
+    def tearDown(self):
+        metrics.metrics = self.original_metrics
+
+    def test_request_metrics(self):
+        app = flask.Flask(__name__)
+        app.config.update(METRICS_SAVE_INTERVAL=60, CLIENT_URL="http://localhost", X_HEADERS=[])
+        app.before_request(metrics._on_request_started)
+        app.teardown_request(metrics._on_request_finished)
+
+        @app.route("/items")
+        def items():
+            metrics.count_call("mongo")
+            metrics.count_call("mongo")
+            metrics.count_call("elastic")
+            return "ok"
+
+        client = app.test_client()
+        client.get("/items")
+        client.get("/items")
+        client.get("/missing")
+        metrics.count_call("mongo")  # outside of request
+
+        self.assertEqual(2, self.metrics.histograms[("request", "GET items")].count)
+        self.assertEqual(1, self.metrics.histograms[("request", "GET not_found")].count)
+        self.assertEqual(4, self.metrics.calls[("request", "GET items", "mongo")])
+        self.assertEqual(2, self.metrics.calls[("request", "GET items", "elastic")])
+
+        data, _stacks = metrics.load_metrics(app)
+        output = metrics.render_prometheus(data)
+        self.assertIn('superdesk_request_duration_seconds_count{endpoint="GET items"} 2', output)
+        self.assertIn('superdesk_request_duration_seconds_bucket{endpoint="GET items",le="+Inf"} 2', output)
+        self.assertIn('superdesk_request_backend_calls_total{endpoint="GET items",backend="mongo"} 4', output)
+
+    def test_task_metrics(self):
+        class Task:
+            name = "superdesk.foo"
+
+        metrics._on_task_prerun("1", Task())
+        metrics.count_call("elastic")
+        metrics._on_task_postrun("1", Task())
+        self.assertEqual(1, self.metrics.histograms[("task", "superdesk.foo")].count)
+        self.assertEqual(1, self.metrics.calls[("task", "superdesk.foo", "elastic")])
+
+    def test_merge(self):
+        self.metrics.observe("request", "GET items", 0.002)
+        self.metrics.observe("request", "GET items", 0.2, {"mongo": 3})
+        merged = metrics.Metrics.from_dict(self.metrics.to_dict())
+        merged.merge(self.metrics)
+        histogram = merged.histograms[("request", "GET items")]
+        self.assertEqual(4, histogram.count)
+        self.assertEqual(2, histogram.counts[0])
+        self.assertEqual(6, merged.calls[("request", "GET items", "mongo")])
+
+
+class SamplingProfilerTestCase(unittest.TestCase):
+    def test_sample(self):
+        profiler = SamplingProfiler(max_stacks=10)
+        ready = threading.Event()
+        done = threading.Event()
+
+        def busy_function():
+            ready.set()
+            done.wait(5)
+
+        thread = threading.Thread(target=busy_function)
+        thread.start()
+        ready.wait(5)
+        profiler.sample()
+        profiler.sample()
+        done.set()
+        thread.join()
+
+        self.assertEqual(2, profiler.samples)
+        stacks = [stack for stack, count in profiler.get_stacks() if "busy_function" in stack]
+        self.assertEqual(1, len(stacks))
+        self.assertIn("tests.profiling_test:busy_function;threading:wait", stacks[0])
+        self.assertEqual(2, dict(profiler.get_stacks())[stacks[0]])
@@ -234,3 +234,27 @@ class EnqueueServiceTest(TestCase):
         # Mock.assert_called_once is only available in Python 3.6
         # so we emulate it by counting the number of calls
         assert content_api_publish.call_count == 1
+
+    def test_filter_subscribers_checks_products_once(self):
+        self.app.data.insert(
+            "products",
+            [
+                {"_id": "p1", "name": "p1", "codes": "a,b"},
+                {"_id": "p2", "name": "p2", "codes": "c"},
+            ],
+        )
+        subscribers = [
+            {"_id": "s1", "subscriber_type": "wire", "products": ["p1", "p2"], "codes": "x"},
+            {"_id": "s2", "subscriber_type": "wire", "products": ["p1", "p2"]},
+            {"_id": "s3", "subscriber_type": "wire", "products": ["p2"]},
+        ]
+        service = EnqueueService()
+        service.filters = {"content_filters": {}, "filter_conditions": {}}
+        with mock.patch.object(
+            EnqueueService, "conforms_content_filter", side_effect=lambda product, doc: product["_id"] == "p1"
+        ) as conforms:
+            filtered, codes = service.filter_subscribers({"_id": "foo", "type": "text"}, subscribers, "wire")
+        self.assertEqual(2, conforms.call_count)
+        self.assertEqual(["s1", "s2"], [s["_id"] for s in filtered])
+        self.assertEqual(["a", "b", "x"], sorted(codes["s1"]))
+        self.assertEqual(["a", "b"], sorted(codes["s2"]))
@@ -1784,6 +1784,43 @@ class NinjsFormatterTest(TestCase):
             ],
         )
 
+    def test_format_cache(self):
+        article = {"_id": "foo", "guid": "foo", "type": "text", "headline": "Foo", "_current_version": 1}
+        format_cache = {}
+        destination = {"name": "test", "format": "ninjs", "delivery_type": "ftp", "config": {}}
+        with mock.patch.object(self.formatter, "_transform_to_ninjs", return_value={"guid": "foo"}) as transform:
+            for subscriber_id in ("sub1", "sub2"):
+                self.formatter.set_destination(destination, {"_id": subscriber_id})
+                self.formatter.set_format_cache(format_cache)
+                seq, doc = self.formatter.format(article, {"_id": subscriber_id})[0]
+                self.assertEqual({"guid": "foo"}, json.loads(doc))
+            self.assertEqual(1, transform.call_count)
+
+            self.formatter.set_destination({**destination, "config": {"host": "other"}}, {"_id": "sub3"})
+            self.formatter.format(article, {"_id": "sub3"})
+            self.assertEqual(2, transform.call_count)
+
+            self.formatter.set_format_cache(None)
+            self.formatter.format(article, {"_id": "sub1"})
+            self.assertEqual(3, transform.call_count)
+
+    def test_reserved_sequence_numbers(self):
+        article = {"_id": "foo", "guid": "foo", "type": "text", "headline": "Foo", "_current_version": 1}
+        sequence_numbers = [5, 6]
+        self.formatter.set_sequence_numbers(sequence_numbers)
+        seq, doc = self.formatter.format(article, {"_id": "sub1"})[0]
+        self.assertEqual(5, seq)
+        self.assertEqual([6], sequence_numbers)
+
+    def test_format_cache_not_inherited(self):
+        class CustomNinjsFormatter(NINJSFormatter):
+            pass
+
+        formatter = CustomNinjsFormatter()
+        formatter.set_destination({"format": "ninjs", "config": {}}, {"_id": "sub1"})
+        formatter.set_format_cache({})
+        self.assertIsNone(formatter.get_format_cache_key({"_id": "foo", "_current_version": 1}))
+
 
 @mock.patch("superdesk.publish.subscribers.SubscribersService.generate_sequence_number", lambda self, subscriber: 1)
 class Ninjs2FormatterTest(TestCase):
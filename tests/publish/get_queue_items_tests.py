@@ -162,6 +162,112 @@ class QueueItemsTestCase(TestCase):
         # because the tuple should be in (published_seq_num, formatted_item) format
         self.assertFalse(fake_post.called)
 
+    @mock.patch.object(enqueue_service, "ObjectId")
+    @mock.patch.object(enqueue_service, "get_utc_schedule")
+    @mock.patch.object(enqueue_service, "get_resource_service")
+    @mock.patch.object(enqueue_service, "get_formatter")
+    def test_enqueue_bulk_insert(self, *mocks):
+        get_formatter, get_resource_service, _, _ = mocks
+        publish_queue = get_resource_service.return_value
+        service = enqueue_service.EnqueueService()
+        get_formatter.return_value.format.side_effect = lambda *args: [(1, "formatted")]
+        doc = {ITEM_TYPE: CONTENT_TYPE.TEXT, "item_id": "foo", "_current_version": 1}
+        subscribers = [
+            {"_id": "sub1", "destinations": [{"format": "ninjs"}, {"format": "nitf"}]},
+            {"_id": "sub2", "destinations": [{"format": "ninjs"}]},
+        ]
+
+        self.app.config["PUBLISH_QUEUE_BULK_INSERT"] = True
+        self.assertTrue(service.queue_transmission(doc, subscribers))
+        self.assertEqual(1, publish_queue.post.call_count)
+        queue_items = publish_queue.post.call_args[0][0]
+        self.assertEqual(3, len(queue_items))
+        self.assertEqual(["sub1", "sub1", "sub2"], [item["subscriber_id"] for item in queue_items])
+
+        publish_queue.post.reset_mock()
+        self.app.config["PUBLISH_QUEUE_BULK_INSERT"] = False
+        self.assertTrue(service.queue_transmission(doc, subscribers))
+        self.assertEqual(3, publish_queue.post.call_count)
+
+    @mock.patch.object(enqueue_service, "get_utc_schedule")
+    @mock.patch.object(enqueue_service, "get_resource_service")
+    @mock.patch.object(enqueue_service, "get_formatter")
+    def test_enqueue_reserves_sequence_numbers_per_subscriber(self, *mocks):
+        get_formatter, get_resource_service, _ = mocks
+        subscribers_service = get_resource_service.return_value
+        subscribers_service.generate_sequence_numbers.side_effect = lambda subscriber, count: list(range(count))
+        service = enqueue_service.EnqueueService()
+        get_formatter.return_value.format.side_effect = lambda *args: [(1, "formatted")]
+        doc = {ITEM_TYPE: CONTENT_TYPE.TEXT, "item_id": "foo", "_current_version": 1}
+        subscribers = [
+            {"_id": "sub1", "destinations": [{"format": "ninjs"}, {"format": "nitf"}]},
+            {"_id": "sub2", "destinations": [{"format": "ninjs"}]},
+        ]
+
+        self.assertTrue(service.queue_transmission(doc, subscribers))
+        self.assertEqual(
+            [mock.call(subscribers[0], 2), mock.call(subscribers[1], 1)],
+            subscribers_service.generate_sequence_numbers.call_args_list,
+        )
+        self.assertEqual(
+            [mock.call([0, 1]), mock.call([0, 1]), mock.call([0])],
+            get_formatter.return_value.set_sequence_numbers.call_args_list,
+        )
+
+    @mock.patch.object(enqueue_service, "push_notification")
+    @mock.patch.object(enqueue_service, "get_utc_schedule")
+    @mock.patch.object(enqueue_service, "get_resource_service")
+    @mock.patch.object(enqueue_service, "get_formatter")
+    def test_enqueue_bulk_insert_fallback_skips_saved(self, *mocks):
+        get_formatter, get_resource_service, _, _ = mocks
+        publish_queue = get_resource_service.return_value
+
+        def post(queue_items):
+            # saved in mongo, failed in elastic
+            for i, item in enumerate(queue_items):
+                item["_id"] = "queue{}".format(i)
+            raise ValueError("elastic error")
+
+        publish_queue.post.side_effect = post
+        publish_queue.get_from_mongo.return_value = [{"_id": "queue0"}, {"_id": "queue1"}]
+        service = enqueue_service.EnqueueService()
+        get_formatter.return_value.format.side_effect = lambda *args: [(1, "formatted")]
+        doc = {ITEM_TYPE: CONTENT_TYPE.TEXT, "item_id": "foo", "_current_version": 1}
+        subscribers = [{"_id": "sub1", "destinations": [{"format": "ninjs"}, {"format": "nitf"}]}]
+
+        self.app.config["PUBLISH_QUEUE_BULK_INSERT"] = True
+        self.assertTrue(service.queue_transmission(doc, subscribers))
+        self.assertEqual(1, publish_queue.post.call_count)
+
+    @mock.patch.object(enqueue_service, "push_notification")
+    @mock.patch.object(enqueue_service, "get_utc_schedule")
+    @mock.patch.object(enqueue_service, "get_resource_service")
+    @mock.patch.object(enqueue_service, "get_formatter")
+    def test_enqueue_bulk_insert_fallback_per_subscriber(self, *mocks):
+        get_formatter, get_resource_service, _, _ = mocks
+        publish_queue = get_resource_service.return_value
+
+        def post(queue_items):
+            if any(item["subscriber_id"] == "sub1" for item in queue_items):
+                raise ValueError("subscriber not found")
+            return ["id"] * len(queue_items)
+
+        publish_queue.post.side_effect = post
+        service = enqueue_service.EnqueueService()
+        get_formatter.return_value.format.side_effect = lambda *args: [(1, "formatted")]
+        doc = {ITEM_TYPE: CONTENT_TYPE.TEXT, "item_id": "foo", "_current_version": 1}
+        subscribers = [
+            {"_id": "sub1", "destinations": [{"format": "ninjs"}]},
+            {"_id": "sub2", "destinations": [{"format": "ninjs"}, {"format": "nitf"}]},
+        ]
+
+        self.app.config["PUBLISH_QUEUE_BULK_INSERT"] = True
+        self.assertTrue(service.queue_transmission(doc, subscribers))
+        self.assertEqual(3, publish_queue.post.call_count)
+        self.assertEqual(
+            ["sub2", "sub2"], [item["subscriber_id"] for item in publish_queue.post.call_args_list[-1][0][0]]
+        )
+
     @mock.patch.object(publish_queue, "app")
     def test_delete_encoded_item(self, fake_app):
         fake_storage = fake_app.storage
@@ -16,7 +16,7 @@ from datetime import timedelta
 from superdesk.tests import AppTestCase
 from superdesk.utc import utcnow
 from superdesk.errors import PublishHTTPPushServerError, PublishHTTPPushClientError
-from superdesk.publish.publish_content import transmit_item
+from superdesk.publish.publish_content import transmit_item, transmit_subscriber_items
 
 
 class TransmitItemTestCase(AppTestCase):
@@ -224,3 +224,47 @@ class TransmitItemTestCase(AppTestCase):
             {"_updated": ANY, "retry_attempt": 1, "state": "retrying", "next_retry_attempt_at": ANY},
             orig_item,
         )
+
+    @mock.patch("superdesk.publish.registered_transmitters")
+    def test_transmit_subscriber_items_concurrently(self, *mocks):
+        self.app.config["PUBLISH_TRANSMIT_WORKERS"] = 2
+        subscriber = {
+            "_id": ObjectId("56c11bd78b84bb00b0a1905e"),
+            "sequence_num_settings": {"max": 9999, "min": 1},
+            "is_active": True,
+            "destinations": [{"delivery_type": "email"}, {"delivery_type": "ftp"}],
+            "email": "test@test.com",
+            "subscriber_type": "digital",
+            "name": "Test",
+        }
+        self.app.data.insert("subscribers", [subscriber])
+
+        items = [
+            {
+                "_id": ObjectId(),
+                "state": "pending",
+                "item_id": "item_{}".format(i),
+                "item_version": 1,
+                "headline": "headline {}".format(i),
+                "destination": {"name": delivery_type, "delivery_type": delivery_type, "format": "ninjs"},
+                "subscriber_id": subscriber["_id"],
+                "formatted_item": "test",
+            }
+            for i, delivery_type in enumerate(["email", "email", "email", "ftp", "ftp"])
+        ]
+        self.app.data.insert("publish_queue", items)
+
+        def transmit(queue_item, update_status=True):
+            if queue_item["item_id"] == "item_1":
+                raise PublishHTTPPushServerError.httpPushError(Exception("server 5xx"))
+
+        fake_transmitter = MagicMock()
+        fake_transmitter.transmit.side_effect = transmit
+        mocks[0].__getitem__.return_value = fake_transmitter
+
+        transmit_subscriber_items(subscriber["_id"])
+
+        # destination is transmitted in order and stops on error, other destination is not affected
+        states = [self.app.data.find_one("publish_queue", req=None, _id=item["_id"])["state"] for item in items]
+        self.assertEqual(["success", "retrying", "pending", "success", "success"], states)
+        self.assertEqual(4, fake_transmitter.transmit.call_count)
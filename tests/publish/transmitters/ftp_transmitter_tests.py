@@ -14,7 +14,7 @@ from unittest.mock import create_autospec
 from superdesk.tests import TestCase
 import ftplib
 from apps.publish import init_app
-from superdesk.publish.transmitters.ftp import FTPPublishService
+from superdesk.publish.transmitters.ftp import FTPPublishService, connections
 from superdesk.publish.transmitters.file_providers import *  # NOQA
 import io
 from unittest import mock
@@ -168,7 +168,7 @@ class FTPPublishServiceTestCase(TestCase):
         mock_ftp_constructor.storbinary.assert_any_call("STOR 5e448dd1016d1f63a92f0398.png", b"binary")
         mock_ftp_constructor.storbinary.assert_any_call("STOR 5e448dd1016d1f63a92f039e.png", b"binary")
 
-    @mock.patch("superdesk.publish.transmitters.ftp.ftp_connect")
+    @mock.patch("superdesk.publish.transmitters.ftp.get_ftp_connection")
     @mock.patch("superdesk.storage.ProxyMediaStorage.get", mockGet)
     def test_publish_non_ninjs_item_assoc(self, ftp_connect_mock, *args):
         service = FTPPublishService()
@@ -180,10 +180,7 @@ class FTPPublishServiceTestCase(TestCase):
         }
 
         ftp_mock = create_autospec(ftplib.FTP)()
-        context_mock = mock.Mock()
-        context_mock.__enter__ = mock.Mock(return_value=ftp_mock)
-        context_mock.__exit__ = mock.Mock(return_value=None)
-        ftp_connect_mock.return_value = context_mock
+        ftp_connect_mock.return_value = ftp_mock
 
         self.app.data.insert(
             "published",
@@ -201,3 +198,28 @@ class FTPPublishServiceTestCase(TestCase):
 
         ftp_mock.storbinary.assert_any_call("STOR 5e448e47016d1f63a92f03b8.jpg", b"binary")
         ftp_mock.storbinary.assert_any_call("STOR 5e448dd1016d1f63a92f0393.png", b"binary")
+        connections.clear()
+
+    @mock.patch("superdesk.publish.transmitters.ftp.get_ftp_connection")
+    def test_reuse_connection(self, ftp_connect_mock):
+        service = FTPPublishService()
+        ftp_mock = create_autospec(ftplib.FTP)()
+        ftp_connect_mock.return_value = ftp_mock
+        queue_item = {
+            "item_id": "reused",
+            "item_version": 1,
+            "formatted_item": "foo",
+            "destination": {"delivery_type": "ftp", "config": {"host": "reused"}},
+        }
+
+        service._transmit(queue_item, {})
+        service._transmit(queue_item, {})
+
+        ftp_connect_mock.assert_called_once_with({"host": "reused"})
+        ftp_mock.voidcmd.assert_called_once_with("NOOP")
+        self.assertEqual(2, ftp_mock.storbinary.call_count)
+
+        ftp_mock.voidcmd.side_effect = ftplib.error_temp("421 timeout")
+        service._transmit(queue_item, {})
+        self.assertEqual(2, ftp_connect_mock.call_count)
+        connections.clear()
@@ -167,7 +167,7 @@ class HTTPPushServiceTestCase(AppTestCase):
         self.assertEqual(item["version"], 2)
 
     @mock.patch("superdesk.errors.notifiers")
-    @mock.patch("requests.post")
+    @mock.patch("requests.Session.post")
     def test_client_publish_error_thrown(self, fake_post, fake_notifiers):
         with self.app.app_context():
             raise_http_exception = Mock(side_effect=PublishHTTPPushClientError.httpPushError(Exception("client 4xx")))
@@ -184,7 +184,7 @@ class HTTPPushServiceTestCase(AppTestCase):
                 service._push_item(self.destination, json.dumps(self.item))
 
     @mock.patch("superdesk.errors.notifiers")
-    @mock.patch("requests.post")
+    @mock.patch("requests.Session.post")
     def test_server_publish_error_thrown(self, fake_post, fake_notifiers):
         with self.app.app_context():
             raise_http_exception = Mock(side_effect=PublishHTTPPushServerError.httpPushError(Exception("server 5xx")))
@@ -201,7 +201,7 @@ class HTTPPushServiceTestCase(AppTestCase):
                 service._push_item(self.destination, json.dumps(self.item))
 
     @mock.patch("superdesk.publish.transmitters.http_push.requests.Session.send", return_value=CreatedResponse)
-    @mock.patch("requests.get", return_value=NotFoundResponse)
+    @mock.patch("requests.Session.get", return_value=NotFoundResponse)
     def test_push_associated_assets(self, get_mock, send_mock):
         with mock.patch.object(self.app.media, "get", return_value=TestMedia(b"bin")):
             dest = {"config": {"assets_url": "http://example.com"}}
@@ -229,7 +229,7 @@ class HTTPPushServiceTestCase(AppTestCase):
 
     @mock.patch("superdesk.publish.transmitters.http_push.app")
     @mock.patch("superdesk.publish.transmitters.http_push.requests.Session.send", return_value=CreatedResponse)
-    @mock.patch("requests.get", return_value=NotFoundResponse)
+    @mock.patch("requests.Session.get", return_value=NotFoundResponse)
     def test_push_attachments(self, get_mock, send_mock, app_mock):
         app_mock.config = {}
         app_mock.media.get.return_value = TestMedia(b"bin")
@@ -260,7 +260,7 @@ class HTTPPushServiceTestCase(AppTestCase):
 
     @mock.patch("superdesk.publish.transmitters.http_push.app")
     @mock.patch("superdesk.publish.transmitters.http_push.requests.Session.send", return_value=CreatedResponse)
-    @mock.patch("requests.get", return_value=NotFoundResponse)
+    @mock.patch("requests.Session.get", return_value=NotFoundResponse)
     def test_push_binaries(self, get_mock, send_mock, app_mock):
         app_mock.config = {}
         media = TestMedia(b"content")
@@ -46,3 +46,55 @@ class SequencesTestCase(TestCase):
                     "test_sequence_1", max_seq_number=self.max_seq_number, min_seq_number=self.min_seq_number
                 )
                 self.assertEqual(last_sequence_number, self.min_seq_number + i, "failed for i={}".format(i))
+
+    def test_reserve_sequence_numbers(self):
+        with self.app.app_context():
+            numbers = self.service.reserve_sequence_numbers("test_sequence_2", 3)
+            self.assertEqual([1, 2, 3], numbers)
+            self.assertEqual(4, self.service.get_next_sequence_number("test_sequence_2"))
+            self.assertEqual([], self.service.reserve_sequence_numbers("test_sequence_2", 0))
+
+    def test_reserve_sequence_numbers_rotate(self):
+        with self.app.app_context():
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_3", 8, max_seq_number=self.max_seq_number, min_seq_number=self.min_seq_number
+            )
+            self.assertEqual(list(range(1, 9)), numbers)
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_3", 5, max_seq_number=self.max_seq_number, min_seq_number=self.min_seq_number
+            )
+            self.assertEqual([9, 10, 1, 2, 3], numbers)
+            self.assertEqual(
+                4,
+                self.service.get_next_sequence_number(
+                    "test_sequence_3", max_seq_number=self.max_seq_number, min_seq_number=self.min_seq_number
+                ),
+            )
+
+    def test_reserve_sequence_numbers_below_min(self):
+        with self.app.app_context():
+            # counters created before min was set keep counting up to max
+            self.service.post([{"key": "test_sequence_4", "sequence_number": 198}])
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_4", 1, max_seq_number=200, min_seq_number=100
+            )
+            self.assertEqual([199], numbers)
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_4", 3, max_seq_number=200, min_seq_number=100
+            )
+            self.assertEqual([200, 100, 101], numbers)
+
+            self.service.post([{"key": "test_sequence_5", "sequence_number": 0}])
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_5", 2, max_seq_number=200, min_seq_number=100
+            )
+            self.assertEqual([1, 2], numbers)
+
+    def test_reserve_sequence_numbers_over_range_size(self):
+        with self.app.app_context():
+            numbers = self.service.reserve_sequence_numbers(
+                "test_sequence_6", 25, max_seq_number=self.max_seq_number, min_seq_number=self.min_seq_number
+            )
+            self.assertEqual(list(range(1, 11)) * 2 + list(range(1, 6)), numbers)
+            sequence = self.service.find_one(req=None, key="test_sequence_6")
+            self.assertEqual(5, sequence["sequence_number"])
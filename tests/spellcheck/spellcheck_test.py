@@ -1,5 +1,6 @@
 import unittest
 
+from apps.dictionaries.service import DictionaryModel
 from apps.spellcheck.spellcheck import norvig_suggest
 
 
@@ -22,3 +23,12 @@ class SpellcheckTestCase(unittest.TestCase):
 
         name_suggestion_2 = norvig_suggest("Fooe", model)
         self.assertEqual(["Foe"], name_suggestion_2)
+
+    def test_dictionary_model_suggestions(self):
+        model = DictionaryModel({"foe": 3, "fox": 5, "übel": 2})
+        self.assertIn("fox", model)
+        self.assertNotIn("fo", model)
+        self.assertTrue(model.has_prefix("ü"))
+        self.assertFalse(model.has_prefix("x"))
+        self.assertEqual(["fox", "Fox", "foe", "Foe"], norvig_suggest("foo", model))
+        self.assertEqual(["übel", "Übel"], norvig_suggest("übell", model))
@@ -137,6 +137,18 @@ class WordCountTestCase(unittest.TestCase):
 
         self.assertEqual(0, text_utils.get_par_count(None))
 
+    def test_get_text_metrics(self):
+        html = "<p>foo <strong>bar</strong></p><p>1 000 words</p><p> </p>"
+        metrics = text_utils.get_text_metrics(html)
+        self.assertEqual(4, metrics.word_count)
+        self.assertEqual(19, metrics.char_count)
+        self.assertEqual(2, metrics.par_count)
+        self.assertEqual(0, metrics.get_reading_time())
+        self.assertEqual(text_utils.get_word_count(html), metrics.word_count)
+        self.assertEqual(text_utils.get_char_count(html), metrics.char_count)
+        self.assertIs(metrics, text_utils.get_text_metrics(html))
+        self.assertIsNot(metrics, text_utils.get_text_metrics(html + "<p>more</p>"))
+
     def test_convert_plain_text_to_html(self):
         test_strings = [
             ["plain text", "<p>plain text</p>"],
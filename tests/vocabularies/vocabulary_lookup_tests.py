@@ -0,0 +1,53 @@
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+from superdesk.vocabularies import get_vocabulary_lookup
+
+
+class VocabularyLookupTestCase(TestCase):
+    def setUp(self):
+        self.app.data.insert(
+            "vocabularies",
+            [
+                {
+                    "_id": "categories",
+                    "items": [
+                        {"name": "Inactive", "qcode": "a", "is_active": False},
+                        {
+                            "name": "Australian General News",
+                            "qcode": "a",
+                            "is_active": True,
+                            "translations": {"name": {"de": "Allgemeine Nachrichten"}},
+                        },
+                        {"name": "Finance", "qcode": "f", "is_active": True},
+                        {"name": "Sport", "qcode": "S", "is_active": True},
+                    ],
+                }
+            ],
+        )
+
+    def test_get(self):
+        lookup = get_vocabulary_lookup("categories")
+        self.assertEqual("Australian General News", lookup.get("a")["name"])
+        self.assertEqual("Inactive", lookup.get("a", active=False)["name"])
+        self.assertEqual("Allgemeine Nachrichten", lookup.get("a", language="de")["name"])
+        self.assertIsNone(lookup.get("s"))
+        self.assertEqual("S", lookup.get("s", ignore_case=True)["qcode"])
+        self.assertIsNone(lookup.get("x"))
+
+    def test_find(self):
+        lookup = get_vocabulary_lookup("categories")
+        self.assertEqual(["a", "f"], [item["qcode"] for item in lookup.find(["f", "a", "x"])])
+        self.assertEqual(3, len(lookup.find(["f", "a"], active=False)))
+
+    def test_lookup_is_shared_until_vocabulary_is_updated(self):
+        lookup = get_vocabulary_lookup("categories")
+        self.assertIs(lookup, get_vocabulary_lookup("categories"))
+        self.assertIsNone(get_vocabulary_lookup("missing"))
+
+        original = get_resource_service("vocabularies").find_one(req=None, _id="categories")
+        items = original["items"] + [{"name": "Entertainment", "qcode": "e", "is_active": True}]
+        get_resource_service("vocabularies").patch("categories", {"items": items})
+
+        updated = get_vocabulary_lookup("categories")
+        self.assertIsNot(lookup, updated)
+        self.assertEqual("Entertainment", updated.get("e")["name"])
@@ -1,5 +1,6 @@
 from typing import List
 import asyncio
+import json
 import unittest
 from json import dumps
 from datetime import datetime, timedelta
@@ -19,6 +20,16 @@ class TestClient:
         self.messages.append(message)
 
 
+class SlowTestClient(TestClient):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.ready = asyncio.Event()
+
+    async def send(self, message):
+        await self.ready.wait()
+        self.messages.append(message)
+
+
 class WebsocketsTestCase(unittest.TestCase):
     def test_broadcast(self):
         loop = asyncio.new_event_loop()
@@ -144,3 +155,101 @@ class WebsocketsTestCase(unittest.TestCase):
         self.assertEqual(3, len(client_user_abc123_sess_12345.messages))
         self.assertEqual(4, len(client_user_abc123_sess_67890.messages))
         self.assertEqual(3, len(client_user_def456.messages))
+
+    def test_recipients_index(self):
+        com = SocketCommunication("host", "port", "url")
+        com.clients = set()
+        clients = [
+            TestClient(""),
+            TestClient("/ws/subscribe?user=abc&desk=1"),
+            TestClient("/ws/subscribe?user=abc&desk=2"),
+            TestClient("/ws/subscribe?user=def&desk=1&company=x"),
+        ]
+        for client in clients:
+            com._add_client(client)
+
+        filters = [
+            dict(include={"user": ["abc"]}),
+            dict(include={"user": ["abc", "def"], "desk": ["1"]}),
+            dict(include={"company": ["x"]}, exclude={"user": ["def"]}),
+            dict(exclude={"desk": ["1"]}),
+            dict(include={"user": "abc"}),
+            dict(include={"user": ["abc", None]}),
+        ]
+        for _filter in filters:
+            expected = {
+                client for client in clients if com._filter_client(client, {"include": {}, "exclude": {}, **_filter})
+            }
+            self.assertEqual(expected, com.get_message_recipients(WebsocketMessageData(filters=_filter)), _filter)
+
+        com._remove_client(clients[1])
+        self.assertEqual(
+            {clients[2]}, com.get_message_recipients(WebsocketMessageData(filters=dict(include={"user": ["abc"]})))
+        )
+
+    def test_slow_client_send_queue(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        com = SocketCommunication("host", "port", "url", send_queue_size=2)
+        com.clients = set()
+        slow_client = SlowTestClient("")
+        client = TestClient("")
+        com._add_client(slow_client)
+        com._add_client(client)
+
+        for i in range(4):
+            loop.run_until_complete(com.broadcast(dumps({"event": "foo", "i": i})))
+
+        self.assertEqual(4, len(client.messages))
+        self.assertEqual(0, len(slow_client.messages))
+        self.assertEqual(1, com.dropped_messages)
+
+        slow_client.ready.set()
+        loop.run_until_complete(com.client_senders[slow_client.id])
+        self.assertEqual([0, 1, 2], [json.loads(message)["i"] for message in slow_client.messages])
+        self.assertNotIn(slow_client.id, com.client_queues)
+
+    def test_coalesce_resource_updated(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        com = SocketCommunication("host", "port", "url", coalesce_interval=0.01)
+        com.clients = set()
+        client = TestClient("")
+        com._add_client(client)
+
+        def updated(_id, fields):
+            return dumps({"event": "resource:updated", "extra": {"resource": "archive", "_id": _id, "fields": fields}})
+
+        async def receive():
+            await com.receive(updated("foo", {"headline": 1}))
+            await com.receive(updated("bar", {"slugline": 1}))
+            await com.receive(updated("foo", {"body_html": 1}))
+            await com.receive(dumps({"event": "foo"}))
+            self.assertEqual(["foo"], [json.loads(message)["event"] for message in client.messages])
+            await asyncio.sleep(0.05)
+
+        loop.run_until_complete(receive())
+        messages = [json.loads(message) for message in client.messages]
+        self.assertEqual(3, len(messages))
+        self.assertEqual({"headline": 1, "body_html": 1}, messages[1]["extra"]["fields"])
+        self.assertEqual("bar", messages[2]["extra"]["_id"])
+        self.assertEqual(1, com.coalesced_messages)
+
+        # other event for the item sends pending update first
+        loop.run_until_complete(com.receive(updated("foo", {"headline": 1})))
+        loop.run_until_complete(
+            com.receive(dumps({"event": "resource:deleted", "extra": {"resource": "archive", "_id": "foo"}}))
+        )
+        self.assertEqual(
+            ["resource:updated", "resource:deleted"], [json.loads(message)["event"] for message in client.messages[3:]]
+        )
+
+    def test_receive_batch(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        com = SocketCommunication("host", "port", "url")
+        com.clients = set()
+        client = TestClient("")
+        com._add_client(client)
+        loop.run_until_complete(com.receive(dumps([{"event": "foo"}, {"event": "bar"}])))
+        self.assertEqual(["foo", "bar"], [json.loads(message)["event"] for message in client.messages])